@@ -0,0 +1,378 @@
+"""TODOリスト/TODO項目の読み込みキャッシュ.
+
+CRUDの読み込みの手前に置き、更新・削除のCRUDで該当するキーを消す.
+値はレスポンススキーマをJSONにしたバイト列で持つので、どのバックエンドでも同じように扱える.
+
+"todo_item:1#2" のように GROUP_SEPARATOR を含むキーは、前半部分のグループごとに delete_group でまとめて消せる.
+Redis ではグループを1つのハッシュにするので、まとめて消すのもキー1つの削除で済む.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import anyio.to_thread
+from pydantic import ValidationError
+
+from app import const
+
+logger = logging.getLogger(__name__)
+
+# グループとグループ内のキーの区切り
+GROUP_SEPARATOR = "#"
+
+
+class NullCache:
+    """何もキャッシュしないバックエンド (CACHE_BACKEND=none)."""
+
+    enabled = False
+    # 呼び出しがI/Oで待つかどうか (待たないのでイベントループからそのまま呼べる)
+    blocking = False
+
+    def get(self, key: str) -> bytes | None:  # noqa: D102
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:  # noqa: D102
+        pass
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:  # noqa: D102
+        return True
+
+    def delete(self, key: str) -> None:  # noqa: D102
+        pass
+
+    def delete_group(self, group: str) -> None:  # noqa: D102
+        pass
+
+    def delete_prefix(self, prefix: str) -> None:  # noqa: D102
+        pass
+
+    def stats(self) -> dict:  # noqa: D102
+        return {"backend": "none"}
+
+
+class LRUCache:
+    """プロセス内のLRUキャッシュ. 有効期限と最大バイト数で追い出す."""
+
+    enabled = True
+    blocking = False
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (有効期限, 値) 末尾ほど最近使ったもの
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        # ルーターの同期関数はスレッドプールから呼ばれるのでロックする
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> bytes | None:
+        """キャッシュから値を取り出す. 無い/期限切れの時はNone"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        """値を保存する. 最大バイト数を超えたら古いものから追い出す (ttlを省略するとキャッシュのttl)"""
+        if len(key) + len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """キーが無い(期限切れを含む)時だけ保存し、保存したかどうかを返す"""
+        if len(key) + len(value) > self.max_bytes:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        """キーを消す"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def delete_group(self, group: str) -> None:
+        """グループのキーをまとめて消す (プロセス内なので全件なめる)"""
+        self.delete_prefix(group + GROUP_SEPARATOR)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """prefixで始まるキーをまとめて消す (全件なめるので頻繁に呼ばないこと)"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """全て消す"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """ヒット/ミス/追い出しの件数を返す"""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _set(self, key: str, value: bytes, ttl: float | None) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._bytes += len(key) + len(value)
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+
+
+class RedisCache:
+    """Redis互換サーバーを使うキャッシュ. 複数プロセスで共有できる.
+
+    client には redis.Redis と同じ get/set/delete/scan_iter/hget/hset/hdel/pipeline を持つオブジェクトを渡す.
+    追い出しはRedis側 (maxmemory-policy) に任せる.
+    グループのキーは1つのハッシュに入れる. 有効期限はハッシュ全体に付け、グループのどれかを保存するたびに延びる.
+
+    サーバーに繋がらない時 (errors の例外) はログに出してミスとして扱い、DBを読む
+    (キャッシュが止まってもAPIはエラーにしない).
+    """
+
+    enabled = True
+    # サーバーとの往復を待つので、イベントループからはスレッドで呼ぶ
+    blocking = True
+
+    def __init__(self, client, ttl: float, namespace: str = "todo:", errors: tuple = (ConnectionError, TimeoutError)) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+        # redis.RedisError など、サーバーとのやり取りの失敗として扱う例外
+        self.errors = errors
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def get(self, key: str) -> bytes | None:  # noqa: D102
+        group, _, field = key.rpartition(GROUP_SEPARATOR)
+        try:
+            if group:
+                value = self.client.hget(self.namespace + group, field)
+            else:
+                value = self.client.get(self.namespace + key)
+        except self.errors:
+            self._failed("get", key)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:  # noqa: D102
+        px = int((self.ttl if ttl is None else ttl) * 1000)
+        group, _, field = key.rpartition(GROUP_SEPARATOR)
+        try:
+            if group:
+                # 保存と有効期限の設定を1往復で送る
+                pipeline = self.client.pipeline(transaction=False)
+                pipeline.hset(self.namespace + group, field, value)
+                pipeline.pexpire(self.namespace + group, px)
+                pipeline.execute()
+            else:
+                self.client.set(self.namespace + key, value, px=px)
+        except self.errors:
+            self._failed("set", key)
+
+    def add(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """キーが無い時だけ保存する (グループのキーには使えない)
+
+        サーバーに繋がらない時は保存できたものとして True を返す (重複を防げない代わりにエラーにしない)
+        """
+        try:
+            # SET NX なので、複数のワーカーから同時に呼ばれても1つだけが保存できる
+            return bool(self.client.set(self.namespace + key, value, px=int((self.ttl if ttl is None else ttl) * 1000), nx=True))
+        except self.errors:
+            self._failed("add", key)
+            return True
+
+    def delete(self, key: str) -> None:  # noqa: D102
+        group, _, field = key.rpartition(GROUP_SEPARATOR)
+        try:
+            if group:
+                self.client.hdel(self.namespace + group, field)
+            else:
+                self.client.delete(self.namespace + key)
+        except self.errors:
+            # 消せなかった値は有効期限が切れるまで残る
+            self._failed("delete", key)
+
+    def delete_group(self, group: str) -> None:
+        """グループのキーをまとめて消す (ハッシュ1つを消すだけなので、キャッシュの件数によらない)"""
+        self.delete(group)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """prefixで始まるキーをまとめて消す (キー全体をSCANするので頻繁に呼ばないこと)"""
+        try:
+            keys = list(self.client.scan_iter(match=self.namespace + prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except self.errors:
+            self._failed("delete_prefix", prefix)
+
+    def stats(self) -> dict:  # noqa: D102
+        with self._lock:
+            return {"backend": "redis", "hits": self.hits, "misses": self.misses, "failures": self.failures}
+
+    def _failed(self, operation: str, key: str) -> None:
+        with self._lock:
+            self.failures += 1
+        logger.warning("redis cache %s failed: %s%s", operation, self.namespace, key, exc_info=True)
+
+
+def _redis_cache(ttl: float, namespace: str) -> RedisCache:
+    """REDIS_URL に繋ぐ RedisCache を作る"""
+    # redis パッケージは Redis を使う設定の時だけ必要
+    import redis
+
+    return RedisCache(redis.Redis.from_url(const.REDIS_URL), ttl=ttl, namespace=namespace, errors=(redis.RedisError,))
+
+
+def build_cache():
+    """CACHE_BACKENDの設定からキャッシュを作る"""
+    if const.CACHE_BACKEND == "memory":
+        return LRUCache(max_bytes=const.CACHE_MAX_BYTES, ttl=const.CACHE_TTL)
+    if const.CACHE_BACKEND == "redis":
+        return _redis_cache(ttl=const.CACHE_TTL, namespace="todo:")
+    return NullCache()
+
+
+todo_cache = build_cache()
+
+# 集計APIのキャッシュに保持する最大バイト数 (1件が小さいので少なくてよい)
+STATS_CACHE_MAX_BYTES = 1024 * 1024
+
+
+def build_stats_cache():
+    """集計APIのキャッシュを作る. 書き込みでは消さずに STATS_CACHE_TTL で期限切れにする
+
+    CACHE_BACKEND=none でもプロセス内にキャッシュする (ダッシュボードの再読み込みでDBを集計し直さない)
+    """
+    if const.STATS_CACHE_TTL <= 0:
+        return NullCache()
+    if const.CACHE_BACKEND == "redis":
+        return _redis_cache(ttl=const.STATS_CACHE_TTL, namespace="todo_stats:")
+    return LRUCache(max_bytes=STATS_CACHE_MAX_BYTES, ttl=const.STATS_CACHE_TTL)
+
+
+stats_cache = build_stats_cache()
+
+
+# 冪等キーの保存先に保持する最大バイト数 (レスポンス1件分ずつ持つ)
+IDEMPOTENCY_MAX_BYTES = 16 * 1024 * 1024
+
+
+def build_idempotency_store():
+    """冪等キー (Idempotency-Key) とレスポンスの保存先を作る
+
+    CACHE_BACKEND=none でもプロセス内に保存する. 複数ワーカーでは CACHE_BACKEND=redis にしてワーカー間で共有する
+    """
+    if const.CACHE_BACKEND == "redis":
+        return _redis_cache(ttl=const.IDEMPOTENCY_TTL, namespace="todo_idempotency:")
+    return LRUCache(max_bytes=IDEMPOTENCY_MAX_BYTES, ttl=const.IDEMPOTENCY_TTL)
+
+
+idempotency_store = build_idempotency_store()
+
+
+def list_key(todo_list_id: int) -> str:
+    """TODOリストのキャッシュキー"""
+    return f"todo_list:{todo_list_id}"
+
+
+def item_key(todo_list_id: int, todo_item_id: int) -> str:
+    """TODO項目のキャッシュキー"""
+    return f"{item_group(todo_list_id)}{GROUP_SEPARATOR}{todo_item_id}"
+
+
+def item_group(todo_list_id: int) -> str:
+    """TODOリストに含まれるTODO項目のキャッシュのグループ (delete_group でまとめて消す)"""
+    return f"todo_item:{todo_list_id}"
+
+
+def stats_key(todo_list_id: int | None, days: int) -> str:
+    """集計のキャッシュキー (todo_list_id が None の時は全てのTODOリストの集計)"""
+    return f"stats:{'all' if todo_list_id is None else todo_list_id}:{days}"
+
+
+def load_cached(backend, key: str, schema):
+    """キャッシュの値をスキーマに戻す. 無い時と、今のスキーマに合わない時 (スキーマを変えた前のデプロイで保存された値) はNone"""
+    cached = backend.get(key)
+    if cached is None:
+        return None
+    try:
+        return schema.model_validate_json(cached)
+    except ValidationError:
+        # 古い形の値はミスとして扱い、DBから読み直した値で上書きする
+        logger.info("discarding cached value that does not match %s: %s", schema.__name__, key)
+        return None
+
+
+def invalidate(keys: tuple[str, ...] = (), groups: tuple[str, ...] = ()) -> None:
+    """書き込みの commit の後に todo_cache のキーとグループを消す"""
+    for key in keys:
+        todo_cache.delete(key)
+    for group in groups:
+        todo_cache.delete_group(group)
+
+
+async def invalidate_async(keys: tuple[str, ...] = (), groups: tuple[str, ...] = ()) -> None:
+    """invalidate の非同期版 (非同期のCRUDから呼ぶ). Redisの時はスレッドで呼び、イベントループを止めない"""
+    if todo_cache.blocking:
+        await anyio.to_thread.run_sync(invalidate, keys, groups)
+    else:
+        invalidate(keys, groups)
+
+
+def read_through(key: str, schema, load):
+    """キャッシュにあればスキーマに戻して返し、無ければloadの結果を保存して返す"""
+    if not todo_cache.enabled:
+        return load()
+    cached = load_cached(todo_cache, key, schema)
+    if cached is not None:
+        return cached
+    db_item = load()
+    if db_item is not None:
+        todo_cache.set(key, schema.model_validate(db_item, from_attributes=True).model_dump_json().encode())
+    return db_item
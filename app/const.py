@@ -8,6 +8,78 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
 
+# コネクションプールの設定
+# プール内に保持しておく接続数
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# プールが足りない時に一時的に追加で作ってよい接続数
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# 空き接続を待つ最大秒数 (超えると QueuePool limit ... のエラーになる)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# この秒数より古い接続は作り直す MySQLの wait_timeout より短くすること
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+# 接続を貸し出す前に生きているか確認する ("server has gone away" 対策)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true") == "true"
+
+# 読み込みキャッシュの設定
+# none: キャッシュしない / memory: プロセス内のLRU / redis: Redis互換サーバー
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "none")
+# キャッシュの有効期限(秒)
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+# memory の時にキャッシュに保持する最大バイト数
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# redis の時の接続先
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# 集計API (/stats) の結果をキャッシュする秒数. 書き込みでは消さないので短くしておく (0でキャッシュしない)
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "5"))
+
+# POST の Idempotency-Key で保存したレスポンスを再送に返す秒数
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+# 同じキーのリクエストを処理中として他を 409 にする最大秒数 (処理中に落ちてもこの秒数でやり直せる)
+IDEMPOTENCY_LOCK_TTL = float(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))
+
+# 変更イベント (GET /lists/{todo_list_id}/events) の設定
+# memory: 同じプロセスの購読者だけに配る / redis: Redis互換サーバーの Pub/Sub で全てのワーカーに配る
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory")
+# 購読者ごとに溜めておけるイベントの数 (溢れたら溜まった分を捨てて resync を送る)
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+# イベントが無い時にコメント行を送る間隔(秒) (プロキシにアイドルの接続を切られないように)
+EVENTS_KEEPALIVE = float(os.getenv("EVENTS_KEEPALIVE", "15"))
+
+# レート制限 (クライアントとルートごとのトークンバケット)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true") == "true"
+# 1秒あたりに使えるリクエスト数と、連続して送れるリクエスト数
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "20"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "40"))
+# ルートごとの設定 (例: "GET /lists=5:10;POST /lists/{id}/items=10:20" ルート=rate:burst)
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "")
+# memory: ワーカーごとに数える / redis: Redis互換サーバーで全てのワーカーの合計を数える
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# リクエストごとのSQL発行回数とDB時間を計測して Server-Timing ヘッダーで返す
+DB_INSTRUMENTATION = os.getenv("DB_INSTRUMENTATION", "true") == "true"
+# この時間(ミリ秒)以上かかったリクエストをログに出す
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+# true の時は読み込み系のAPIでレスポンスの再検証を省き、事前にJSONにしたバイト列を返す
+FAST_JSON_RESPONSE = os.getenv("FAST_JSON_RESPONSE", "") == "true"
+
+# true の時は asyncio ネイティブなDBアクセス(aiomysql)のルーターを使う
+ASYNC_DB = os.getenv("ASYNC_DB", "") == "true"
+
+
+# 本番用の起動 (python -m app.server) の設定
+# 待ち受けるホストとポート
+APP_HOST = os.getenv("APP_HOST", "0.0.0.0")  # noqa: S104
+APP_PORT = int(os.getenv("APP_PORT", "18008"))
+# X-Forwarded-For / X-Forwarded-Proto を信用するプロキシのIPアドレス (カンマ区切り)
+# これ以外から来たリクエストのヘッダーは無視して、接続元のアドレスをクライアントのアドレスにする
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+# ワーカープロセスの数 (0の時はこのプロセスが使えるCPUのコア数)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or "0")
+# 同期(def)のルートを実行するスレッドプールのスレッド数 (ワーカーごと. anyioの既定値は40)
+# DB_POOL_SIZE + DB_MAX_OVERFLOW より多いと、スレッドがDB接続の空きを待つことになる
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
 
 class TodoItemStatusCode(Enum):
     """TODO項目のステータス."""
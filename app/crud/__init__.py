@@ -0,0 +1,6 @@
+class VersionConflictError(Exception):
+    """If-Match で指定した version と現在の version が違う (ルーターで 412 Precondition Failed にする)."""
+
+
+class BulkReadBackError(Exception):
+    """一括作成で INSERT した行を読み直せなかった (ロールバック済みで何も作成されていない)."""
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import cache, events
+from . import VersionConflictError
+from .item_crud import after_cursor, counter_values, filter_todo_items, item_event, order_todo_items
+from ..schemas.item_schema import NewTodoItem, UpdateTodoItem
+from ..models.item_model import ItemModel
+from ..models.list_model import ListModel
+from app.const import TodoItemStatusCode
+
+# item_crud の非同期版
+
+async def _update_counters(db: AsyncSession, todo_list_id: int, item_count: int = 0, completed_count: int = 0) -> int:
+    """TODOリストの件数カウンターを増減し、更新件数を返す (リストが無ければ0)"""
+    result = await db.execute(
+        update(ListModel)
+        .filter_by(id=todo_list_id)
+        .values(counter_values(item_count, completed_count))
+        .execution_options(synchronize_session=False),
+    )
+    return result.rowcount
+
+async def create_todo_item(db: AsyncSession, todo_list_id: int, new_todo_item: NewTodoItem):
+    """新しいTodo項目を作成する"""
+    if await _update_counters(db, todo_list_id, item_count=1) == 0:
+        return None
+
+    todo_item = ItemModel(
+        title=new_todo_item.title,
+        description=new_todo_item.description,
+        due_at=new_todo_item.due_at,
+        status_code=TodoItemStatusCode.NOT_COMPLETED.value,
+        todo_list_id=todo_list_id,
+    )
+    db.add(todo_item)
+    await db.commit()
+    await db.refresh(todo_item)
+    # item_crud と同じキャッシュを消す (同期版のルーターやワーカーとキャッシュを共有している)
+    await cache.invalidate_async(keys=(cache.list_key(todo_list_id),))
+    await events.publish_async(todo_list_id, "item_created", item_event(todo_item))
+    return todo_item
+
+async def get_todo_item(db: AsyncSession, todo_list_id: int, todo_item_id: int):
+    """指定したTodoリスト内のTodo項目を取得する"""
+    return await db.scalar(select(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id))
+
+async def get_todo_items(
+    db: AsyncSession,
+    todo_list_id: int,
+    offset: int,
+    limit: int,
+    status: TodoItemStatusCode | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    sort: str = "id",
+    order: str = "asc",
+):
+    """offsetとlimitを元に指定したTodoリスト内の全てのTodo項目を取得する (絞り込みと並び替えは item_crud と同じ)"""
+    query = filter_todo_items(select(ItemModel).filter_by(todo_list_id=todo_list_id), status, due_before, due_after)
+    result = await db.scalars(order_todo_items(query, sort, order).offset(offset).limit(limit))
+    return result.all()
+
+async def get_todo_items_after(
+    db: AsyncSession,
+    todo_list_id: int,
+    after_id: int,
+    limit: int,
+    after_key: datetime | None = None,
+    status: TodoItemStatusCode | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    sort: str = "id",
+    order: str = "asc",
+):
+    """並び順で (after_key, after_id) より後ろのTodo項目をlimit件取得する(キーセットページネーション)"""
+    query = filter_todo_items(select(ItemModel).filter_by(todo_list_id=todo_list_id), status, due_before, due_after)
+    query = query.filter(after_cursor(sort, order, after_key, after_id))
+    result = await db.scalars(order_todo_items(query, sort, order).limit(limit))
+    return result.all()
+
+async def update_todo_item(
+    db: AsyncSession,
+    todo_list_id: int,
+    todo_item_id: int,
+    update_todo_item: UpdateTodoItem,
+    expected_versions: list[int] | None = None,
+):
+    """指定したTodo項目を更新する (expected_versions は item_crud.update_todo_item と同じ)"""
+    values = {}
+    if update_todo_item.title is not None:
+        values["title"] = update_todo_item.title
+    if update_todo_item.description is not None:
+        values["description"] = update_todo_item.description
+    if update_todo_item.due_at is not None:
+        values["due_at"] = update_todo_item.due_at
+    if update_todo_item.complete is not None:
+        values["status_code"] = TodoItemStatusCode.COMPLETED.value if update_todo_item.complete else TodoItemStatusCode.NOT_COMPLETED.value
+
+    if values:
+        values["version"] = ItemModel.version + 1
+        guarded = update(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id)
+        if expected_versions is not None:
+            guarded = guarded.where(ItemModel.version.in_(expected_versions))
+        flipped = 0
+        if "status_code" in values:
+            result = await db.execute(
+                guarded
+                .where(ItemModel.status_code != values["status_code"])
+                .values(values)
+                .execution_options(synchronize_session=False),
+            )
+            flipped = result.rowcount
+            if flipped:
+                completed = 1 if values["status_code"] == TodoItemStatusCode.COMPLETED.value else -1
+                await _update_counters(db, todo_list_id, completed_count=completed)
+        if not flipped:
+            result = await db.execute(guarded.values(values).execution_options(synchronize_session=False))
+            if result.rowcount == 0:
+                exists = select(ItemModel.id).filter_by(id=todo_item_id, todo_list_id=todo_list_id).exists()
+                if expected_versions is not None and await db.scalar(select(exists)):
+                    raise VersionConflictError
+                return None
+            await _update_counters(db, todo_list_id)
+        await db.commit()
+        invalidated = (cache.item_key(todo_list_id, todo_item_id),)
+        if flipped:
+            invalidated += (cache.list_key(todo_list_id),)
+        await cache.invalidate_async(keys=invalidated)
+    todo_item = await db.scalar(select(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id))
+    if values:
+        await events.publish_async(todo_list_id, "item_updated", item_event(todo_item))
+    elif todo_item is not None and expected_versions is not None and todo_item.version not in expected_versions:
+        raise VersionConflictError
+    return todo_item
+
+async def delete_todo_item(db: AsyncSession, todo_list_id: int, todo_item_id: int):
+    """指定したTodo項目を削除する"""
+    result = await db.execute(
+        delete(ItemModel)
+        .filter_by(id=todo_item_id, todo_list_id=todo_list_id, status_code=TodoItemStatusCode.COMPLETED.value)
+        .execution_options(synchronize_session=False),
+    )
+    completed = result.rowcount
+    deleted = completed
+    if not deleted:
+        result = await db.execute(
+            delete(ItemModel)
+            .filter_by(id=todo_item_id, todo_list_id=todo_list_id)
+            .execution_options(synchronize_session=False),
+        )
+        deleted = result.rowcount
+    if deleted == 0:
+        return False
+    await _update_counters(db, todo_list_id, item_count=-1, completed_count=-completed)
+    await db.commit()
+    await cache.invalidate_async(keys=(cache.item_key(todo_list_id, todo_item_id), cache.list_key(todo_list_id)))
+    await events.publish_async(todo_list_id, "item_deleted", {"id": todo_item_id})
+    return True
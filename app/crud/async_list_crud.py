@@ -0,0 +1,82 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import cache, events
+from . import VersionConflictError
+from .list_crud import list_event
+from ..schemas.list_schema import NewTodoList, UpdateTodoList
+from ..models.list_model import ListModel
+
+# list_crud の非同期版
+# AsyncSession では db.query() が使えないので select() で書く
+
+async def create_todo_post(db: AsyncSession, new_todo_list: NewTodoList):
+    """新しいTodoリストを作成する"""
+    db_item = ListModel(title=new_todo_list.title, description=new_todo_list.description)
+    db.add(db_item)
+    await db.commit()
+    await db.refresh(db_item)
+    return db_item
+
+async def get_todo_list(db: AsyncSession, todo_list_id: int):
+    """指定したIDのTodoリストを取得する"""
+    return await db.scalar(select(ListModel).where(ListModel.id == todo_list_id))
+
+async def get_todo_lists(db: AsyncSession, offset: int, limit: int):
+    """offsetとlimitを元に全てのTodoリストを取得する"""
+    result = await db.scalars(select(ListModel).order_by(ListModel.id).offset(offset).limit(limit))
+    return result.all()
+
+async def get_todo_lists_after(db: AsyncSession, after_id: int, limit: int):
+    """after_idより後ろのTodoリストをlimit件取得する(キーセットページネーション)"""
+    result = await db.scalars(select(ListModel).where(ListModel.id > after_id).order_by(ListModel.id).limit(limit))
+    return result.all()
+
+
+async def update_todo_list(
+    db: AsyncSession,
+    todo_list_id: int,
+    update_todo_list: UpdateTodoList,
+    expected_versions: list[int] | None = None,
+):
+    """指定したIDのTodoリストを更新する (expected_versions は list_crud.update_todo_list と同じ)"""
+    values = {}
+    if update_todo_list.title is not None:
+        values["title"] = update_todo_list.title
+    if update_todo_list.description is not None:
+        values["description"] = update_todo_list.description
+
+    if values:
+        values["version"] = ListModel.version + 1
+        guarded = update(ListModel).where(ListModel.id == todo_list_id)
+        if expected_versions is not None:
+            guarded = guarded.where(ListModel.version.in_(expected_versions))
+        result = await db.execute(guarded.values(values).execution_options(synchronize_session=False))
+        if result.rowcount == 0:
+            exists = select(ListModel.id).where(ListModel.id == todo_list_id).exists()
+            if expected_versions is not None and await db.scalar(select(exists)):
+                raise VersionConflictError
+            return None
+        await db.commit()
+        # list_crud と同じキャッシュを消す (同期版のルーターやワーカーとキャッシュを共有している)
+        await cache.invalidate_async(keys=(cache.list_key(todo_list_id),))
+    todo_list = await db.scalar(select(ListModel).where(ListModel.id == todo_list_id))
+    if values:
+        await events.publish_async(todo_list_id, "list_updated", list_event(todo_list))
+    elif todo_list is not None and expected_versions is not None and todo_list.version not in expected_versions:
+        raise VersionConflictError
+    return todo_list
+
+async def delete_todo_list(db: AsyncSession, todo_list_id: int):
+    """指定したIDのTodoリストを削除する"""
+    # TODO項目は外部キーの ON DELETE CASCADE でDB側が消す
+    result = await db.execute(
+        delete(ListModel)
+        .where(ListModel.id == todo_list_id)
+        .execution_options(synchronize_session=False),
+    )
+    if result.rowcount == 0:
+        return False
+    await db.commit()
+    await cache.invalidate_async(keys=(cache.list_key(todo_list_id),), groups=(cache.item_group(todo_list_id),))
+    await events.publish_async(todo_list_id, events.LIST_DELETED, {"id": todo_list_id})
+    return True
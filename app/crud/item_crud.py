@@ -1,15 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import and_, insert, or_, select
 from sqlalchemy.orm import Session
-from ..schemas.item_schema import NewTodoItem, UpdateTodoItem
+from .. import cache, events
+from . import BulkReadBackError, VersionConflictError
+from ..schemas.item_schema import NewTodoItem, ResponseTodoItem, UpdateTodoItem
 from ..models.item_model import ItemModel
 from ..models.list_model import ListModel
 from app.const import TodoItemStatusCode
 
+# 一括作成時に1回のINSERT文に入れる行数
+BULK_INSERT_CHUNK_SIZE = 1000
+# エクスポート時にDBから1回に読み込む行数
+EXPORT_CHUNK_SIZE = 1000
+# 一括取得時に1回の IN (...) に入れるidの数
+BATCH_GET_CHUNK_SIZE = 500
+
+# 一覧の並び替えに使える列 (どれも todo_list_id から始まるインデックスがある)
+SORT_COLUMNS = {
+    "id": ItemModel.id,
+    "due_at": ItemModel.due_at,
+    "created_at": ItemModel.created_at,
+}
+
+def counter_values(item_count: int = 0, completed_count: int = 0) -> dict:
+    """TODOリストの件数カウンターを差分だけ増減するUPDATE文の値 (項目一覧のバージョンも1増やす)"""
+    values = {"items_version": ListModel.items_version + 1}
+    if item_count:
+        values["item_count"] = ListModel.item_count + item_count
+    if completed_count:
+        values["completed_count"] = ListModel.completed_count + completed_count
+    # カウンターの更新ではリストの updated_at を変えない (ON UPDATE CURRENT_TIMESTAMP を発火させない)
+    values["updated_at"] = ListModel.updated_at
+    return values
+
+def item_event(todo_item) -> dict:
+    """TODO項目の変更イベントのデータ (レスポンスと同じJSON)"""
+    return ResponseTodoItem.model_validate(todo_item).model_dump(mode="json")
+
+def publish_item(event_type: str, todo_item) -> None:
+    """TODO項目の変更イベントを送る (commit した後に呼ぶ)"""
+    events.publish(todo_item.todo_list_id, event_type, item_event(todo_item))
+
+def _update_counters(db: Session, todo_list_id: int, item_count: int = 0, completed_count: int = 0) -> int:
+    """TODOリストの件数カウンターを増減し、更新件数を返す (リストが無ければ0)"""
+    return (
+        db.query(ListModel)
+        .filter_by(id=todo_list_id)
+        .update(counter_values(item_count, completed_count), synchronize_session=False)
+    )
+
 def create_todo_item(db: Session, todo_list_id: int, new_todo_item: NewTodoItem):
     """新しいTodo項目を作成する"""
-    todo_list = db.query(ListModel).filter_by(id=todo_list_id).first()
-    if todo_list is None:
+    # 親のTodoリストのカウンターを先に増やし、更新件数で存在チェックをする
+    if _update_counters(db, todo_list_id, item_count=1) == 0:
         return None
-    
+
     todo_item = ItemModel(
         title=new_todo_item.title,
         description=new_todo_item.description,
@@ -20,44 +66,232 @@ def create_todo_item(db: Session, todo_list_id: int, new_todo_item: NewTodoItem)
     db.add(todo_item)
     db.commit()
     db.refresh(todo_item)
+    cache.todo_cache.delete(cache.list_key(todo_list_id))
+    publish_item("item_created", todo_item)
     return todo_item
 
+def create_todo_items(db: Session, todo_list_id: int, new_todo_items: list[NewTodoItem]):
+    """複数のTodo項目を1トランザクションでまとめて作成する"""
+    # 親のTodoリストのカウンターを件数分まとめて増やし、更新件数で存在チェックをする
+    if _update_counters(db, todo_list_id, item_count=len(new_todo_items)) == 0:
+        return None
+
+    first_id = None
+    for start in range(0, len(new_todo_items), BULK_INSERT_CHUNK_SIZE):
+        chunk = new_todo_items[start:start + BULK_INSERT_CHUNK_SIZE]
+        # 複数行の INSERT ... VALUES (...), (...) を1文で発行する
+        result = db.execute(insert(ItemModel).values([
+            {
+                "title": new_todo_item.title,
+                "description": new_todo_item.description,
+                "due_at": new_todo_item.due_at,
+                "status_code": TodoItemStatusCode.NOT_COMPLETED.value,
+                "todo_list_id": todo_list_id,
+            }
+            for new_todo_item in chunk
+        ]))
+        # MySQLは複数行INSERTの時に先頭行のidを返す
+        if first_id is None:
+            first_id = result.lastrowid
+
+    # created_at などDBが作る値があるので、commit する前に読み直す
+    # idは auto_increment_increment 飛ばしで採番されることがあるので、範囲ではなく先頭のid以降を件数分読む.
+    # 親のTodoリストの行ロックを持っているので、このリストに他のトランザクションの項目が増えることはない
+    todo_items = (
+        db.query(ItemModel)
+        .filter_by(todo_list_id=todo_list_id)
+        .filter(ItemModel.id >= first_id)
+        .order_by(ItemModel.id)
+        .limit(len(new_todo_items))
+        .all()
+    )
+    if [todo_item.title for todo_item in todo_items] != [new_todo_item.title for new_todo_item in new_todo_items]:
+        # 作成した行と違う行を返さないよう、何も作らずにエラーにする
+        db.rollback()
+        raise BulkReadBackError
+    db.commit()
+    cache.todo_cache.delete(cache.list_key(todo_list_id))
+
+    # 1件ずつ送ると購読者のキューがすぐ溢れるので、まとめて1件のイベントにする
+    events.publish(todo_list_id, "items_created", {"ids": [todo_item.id for todo_item in todo_items]})
+    return todo_items
+
+def get_items_version(db: Session, todo_list_id: int):
+    """TODOリストの項目一覧のバージョンだけを主キーで引く (リストが無ければNone)"""
+    return db.query(ListModel.items_version).filter_by(id=todo_list_id).scalar()
+
 def get_todo_item(db: Session, todo_list_id: int, todo_item_id: int):
-    """指定したTodoリスト内のTodo項目を取得する"""
-    return db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id).first()
+    """指定したTodoリスト内のTodo項目を取得する (キャッシュがあればDBを読まない)"""
+    return cache.read_through(
+        cache.item_key(todo_list_id, todo_item_id),
+        ResponseTodoItem,
+        lambda: db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id).first(),
+    )
+
+def get_todo_items_by_ids(db: Session, todo_list_id: int, todo_item_ids: list[int]):
+    """指定したTodoリスト内のTodo項目をidでまとめて取得する
 
-def get_todo_items(db: Session, todo_list_id: int, offset: int, limit: int):
+    (見つかった項目をidの指定順に並べたリスト, 見つからなかったidのリスト) を返す
+    """
+    # 重複したidは1回だけ返す
+    todo_item_ids = list(dict.fromkeys(todo_item_ids))
+    found = {}
+    for start in range(0, len(todo_item_ids), BATCH_GET_CHUNK_SIZE):
+        chunk = todo_item_ids[start:start + BATCH_GET_CHUNK_SIZE]
+        # 主キーの IN (...) なので、idの数だけ主キーを引くのと同じで読み飛ばす行は無い
+        for todo_item in db.query(ItemModel).filter_by(todo_list_id=todo_list_id).filter(ItemModel.id.in_(chunk)):
+            found[todo_item.id] = todo_item
+    todo_items = [found[todo_item_id] for todo_item_id in todo_item_ids if todo_item_id in found]
+    missing_ids = [todo_item_id for todo_item_id in todo_item_ids if todo_item_id not in found]
+    return todo_items, missing_ids
+
+def filter_todo_items(
+    query,
+    status: TodoItemStatusCode | None,
+    due_before: datetime | None,
+    due_after: datetime | None,
+):
+    """絞り込み条件をWHERE句にする (インデックスに乗るよう列を加工せずに比較する)"""
+    if status is not None:
+        query = query.filter(ItemModel.status_code == status.value)
+    if due_after is not None:
+        query = query.filter(ItemModel.due_at >= due_after)
+    if due_before is not None:
+        query = query.filter(ItemModel.due_at < due_before)
+    return query
+
+def order_todo_items(query, sort: str, order: str):
+    """sortの列で並び替える 同じ値の行はidで順番を決める"""
+    columns = [SORT_COLUMNS[sort]] if sort == "id" else [SORT_COLUMNS[sort], ItemModel.id]
+    if order == "desc":
+        return query.order_by(*[column.desc() for column in columns])
+    return query.order_by(*[column.asc() for column in columns])
+
+def after_cursor(sort: str, order: str, after_key: datetime | None, after_id: int):
+    """並び順で (after_key, after_id) より後ろにある行の条件"""
+    if sort == "id":
+        return ItemModel.id < after_id if order == "desc" else ItemModel.id > after_id
+    column = SORT_COLUMNS[sort]
+    # MySQLはNULLを最小値として並べる (昇順だと先頭、降順だと末尾)
+    if order == "asc":
+        if after_key is None:
+            return or_(and_(column.is_(None), ItemModel.id > after_id), column.is_not(None))
+        return or_(column > after_key, and_(column == after_key, ItemModel.id > after_id))
+    if after_key is None:
+        return and_(column.is_(None), ItemModel.id < after_id)
+    return or_(column < after_key, and_(column == after_key, ItemModel.id < after_id), column.is_(None))
+
+def get_todo_items(
+    db: Session,
+    todo_list_id: int,
+    offset: int,
+    limit: int,
+    status: TodoItemStatusCode | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    sort: str = "id",
+    order: str = "asc",
+):
     """offsetとlimitを元に指定したTodoリスト内の全てのTodo項目を取得する"""
-    return db.query(ItemModel).filter_by(todo_list_id=todo_list_id).offset(offset).limit(limit).all()
+    query = filter_todo_items(db.query(ItemModel).filter_by(todo_list_id=todo_list_id), status, due_before, due_after)
+    return order_todo_items(query, sort, order).offset(offset).limit(limit).all()
+
+def get_todo_items_after(
+    db: Session,
+    todo_list_id: int,
+    after_id: int,
+    limit: int,
+    after_key: datetime | None = None,
+    status: TodoItemStatusCode | None = None,
+    due_before: datetime | None = None,
+    due_after: datetime | None = None,
+    sort: str = "id",
+    order: str = "asc",
+):
+    """並び順で (after_key, after_id) より後ろのTodo項目をlimit件取得する(キーセットページネーション)"""
+    query = filter_todo_items(db.query(ItemModel).filter_by(todo_list_id=todo_list_id), status, due_before, due_after)
+    query = query.filter(after_cursor(sort, order, after_key, after_id))
+    return order_todo_items(query, sort, order).limit(limit).all()
+
+def iter_todo_items(db: Session, todo_list_id: int, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """指定したTodoリスト内の全てのTodo項目をchunk_size件ずつ返すジェネレーター"""
+    # yield_per を指定するとサーバーサイドカーソルで読むので、全件をメモリに載せない
+    result = db.execute(
+        select(ItemModel)
+        .filter_by(todo_list_id=todo_list_id)
+        .order_by(ItemModel.id)
+        .execution_options(yield_per=chunk_size),
+    )
+    yield from result.scalars().partitions()
 
 def update_todo_item(
     db: Session,
     todo_list_id: int,
     todo_item_id: int,
     update_todo_item: UpdateTodoItem,
+    expected_versions: list[int] | None = None,
 ):
-    """指定したTodo項目を更新する"""
-    todo_item = db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id).first()
-    if todo_item is None:
-        return None
-    
+    """指定したTodo項目を更新する
+
+    expected_versions を渡すと、version がそのどれかの時だけ更新する (違えば VersionConflictError)
+    """
+    values = {}
     if update_todo_item.title is not None:
-        todo_item.title = update_todo_item.title
+        values["title"] = update_todo_item.title
     if update_todo_item.description is not None:
-        todo_item.description = update_todo_item.description
+        values["description"] = update_todo_item.description
     if update_todo_item.due_at is not None:
-        todo_item.due_at = update_todo_item.due_at
+        values["due_at"] = update_todo_item.due_at
     if update_todo_item.complete is not None:
-        todo_item.status_code = TodoItemStatusCode.COMPLETED.value if update_todo_item.complete else TodoItemStatusCode.NOT_COMPLETED.value
-    db.commit()
-    db.refresh(todo_item)
+        values["status_code"] = TodoItemStatusCode.COMPLETED.value if update_todo_item.complete else TodoItemStatusCode.NOT_COMPLETED.value
+
+    query = db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id)
+    if values:
+        values["version"] = ItemModel.version + 1
+        # 読んでから比べずに、version の比較と更新を1文のUPDATEで行う (行ロックはこの文の間だけ)
+        guarded = query if expected_versions is None else query.filter(ItemModel.version.in_(expected_versions))
+        # SELECTせずにUPDATE文で更新し、更新件数で存在チェックをする
+        flipped = 0
+        if "status_code" in values:
+            # ステータスが変わる時だけ更新されるUPDATEを先に試す
+            # 行ロックを取るので、同時に同じ切り替えをしてもカウンターは1回しか動かない
+            flipped = guarded.filter(ItemModel.status_code != values["status_code"]).update(values, synchronize_session=False)
+            if flipped:
+                completed = 1 if values["status_code"] == TodoItemStatusCode.COMPLETED.value else -1
+                _update_counters(db, todo_list_id, completed_count=completed)
+        if not flipped:
+            if guarded.update(values, synchronize_session=False) == 0:
+                # 更新できなかった時だけ、無いのか version が違うのかを調べる
+                if expected_versions is not None and db.query(query.exists()).scalar():
+                    raise VersionConflictError
+                return None
+            # 件数は変わらないが、項目一覧のバージョンは上げる
+            _update_counters(db, todo_list_id)
+        db.commit()
+        cache.todo_cache.delete(cache.item_key(todo_list_id, todo_item_id))
+        if flipped:
+            cache.todo_cache.delete(cache.list_key(todo_list_id))
+    # レスポンスに必要な created_at/updated_at はDBが作る値なのでここで1回だけ読み直す
+    todo_item = query.first()
+    if values:
+        publish_item("item_updated", todo_item)
+    elif todo_item is not None and expected_versions is not None and todo_item.version not in expected_versions:
+        # 何も更新しない時も If-Match の条件は守る
+        raise VersionConflictError
     return todo_item
 
 def delete_todo_item(db: Session, todo_list_id: int, todo_item_id: int):
     """指定したTodo項目を削除する"""
-    todo_item = db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id).first()
-    if todo_item is None:
+    query = db.query(ItemModel).filter_by(id=todo_item_id, todo_list_id=todo_list_id)
+    # 完了済みとして消せたかどうかで、完了件数のカウンターを減らすか決める
+    # SELECTせずにDELETE文の削除件数で存在チェックをする
+    completed = query.filter(ItemModel.status_code == TodoItemStatusCode.COMPLETED.value).delete(synchronize_session=False)
+    deleted = completed or query.delete(synchronize_session=False)
+    if deleted == 0:
         return False
-    db.delete(todo_item)
+    _update_counters(db, todo_list_id, item_count=-1, completed_count=-completed)
     db.commit()
-    return True
\ No newline at end of file
+    cache.todo_cache.delete(cache.item_key(todo_list_id, todo_item_id))
+    cache.todo_cache.delete(cache.list_key(todo_list_id))
+    events.publish(todo_list_id, "item_deleted", {"id": todo_item_id})
+    return True
@@ -1,6 +1,11 @@
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
-from ..schemas.list_schema import NewTodoList, UpdateTodoList
+from .. import cache, events
+from . import VersionConflictError
+from ..schemas.list_schema import NewTodoList, ResponseTodoList, UpdateTodoList
+from ..models.item_model import ItemModel
 from ..models.list_model import ListModel
+from app.const import TodoItemStatusCode
 
 # ↑ __init__.py があるフォルダは、まとめてモジュールとしてimportできる
 
@@ -16,33 +21,134 @@ def create_todo_post(db: Session, new_todo_list: NewTodoList):
     return db_item
 
 def get_todo_list(db: Session, todo_list_id: int):
-    """指定したIDのTodoリストを取得する"""
-    return db.query(ListModel).filter(ListModel.id == todo_list_id).first()
+    """指定したIDのTodoリストを取得する (キャッシュがあればDBを読まない)"""
+    return cache.read_through(
+        cache.list_key(todo_list_id),
+        ResponseTodoList,
+        lambda: db.query(ListModel).filter(ListModel.id == todo_list_id).first(),
+    )
 
 def get_todo_lists(db: Session, offset: int, limit: int):
     """offsetとlimitを元に全てのTodoリストを取得する"""
-    return db.query(ListModel).offset(offset).limit(limit).all()
+    return db.query(ListModel).order_by(ListModel.id).offset(offset).limit(limit).all()
 
+def get_todo_lists_after(db: Session, after_id: int, limit: int):
+    """after_idより後ろのTodoリストをlimit件取得する(キーセットページネーション)"""
+    # 主キーの範囲検索になるので、何ページ目でも読み飛ばす行が発生しない
+    return db.query(ListModel).filter(ListModel.id > after_id).order_by(ListModel.id).limit(limit).all()
 
-def update_todo_list(db: Session, todo_list_id: int, update_todo_list: UpdateTodoList):
-    """指定したIDのTodoリストを更新する"""
-    todo_list = db.query(ListModel).filter_by(id=todo_list_id).first()
-    if todo_list is None:
-        return None
-    
+
+def list_event(todo_list) -> dict:
+    """TODOリストの更新イベントのデータ (レスポンスと同じJSON)"""
+    return ResponseTodoList.model_validate(todo_list).model_dump(mode="json")
+
+def publish_list_updated(todo_list) -> None:
+    """TODOリストの更新イベントを送る (commit した後に呼ぶ)"""
+    events.publish(todo_list.id, "list_updated", list_event(todo_list))
+
+def update_todo_list(
+    db: Session,
+    todo_list_id: int,
+    update_todo_list: UpdateTodoList,
+    expected_versions: list[int] | None = None,
+):
+    """指定したIDのTodoリストを更新する
+
+    expected_versions を渡すと、version がそのどれかの時だけ更新する (違えば VersionConflictError)
+    """
+    values = {}
     if update_todo_list.title is not None:
-        todo_list.title = update_todo_list.title
+        values["title"] = update_todo_list.title
     if update_todo_list.description is not None:
-        todo_list.description = update_todo_list.description
-    db.commit()
-    db.refresh(todo_list)
+        values["description"] = update_todo_list.description
+
+    query = db.query(ListModel).filter_by(id=todo_list_id)
+    if values:
+        values["version"] = ListModel.version + 1
+        # 読んでから比べずに、version の比較と更新を1文のUPDATEで行う (行ロックはこの文の間だけ)
+        guarded = query if expected_versions is None else query.filter(ListModel.version.in_(expected_versions))
+        # SELECTせずにUPDATE文を1回だけ発行し、更新件数で存在チェックをする
+        if guarded.update(values, synchronize_session=False) == 0:
+            # 更新できなかった時だけ、無いのか version が違うのかを調べる
+            if expected_versions is not None and db.query(query.exists()).scalar():
+                raise VersionConflictError
+            return None
+        db.commit()
+        cache.todo_cache.delete(cache.list_key(todo_list_id))
+    # updated_at はDBが作る値なのでレスポンス用に1回だけ読み直す
+    todo_list = query.first()
+    if values:
+        publish_list_updated(todo_list)
+    elif todo_list is not None and expected_versions is not None and todo_list.version not in expected_versions:
+        # 何も更新しない時も If-Match の条件は守る
+        raise VersionConflictError
     return todo_list
 
 def delete_todo_list(db: Session, todo_list_id: int):
     """指定したIDのTodoリストを削除する"""
-    todo_list = db.query(ListModel).filter_by(id=todo_list_id).first()
-    if todo_list is None:
+    # TODO項目は外部キーの ON DELETE CASCADE でDB側が消す
+    deleted = db.query(ListModel).filter_by(id=todo_list_id).delete(synchronize_session=False)
+    if deleted == 0:
         return False
-    db.delete(todo_list)
     db.commit()
+    cache.todo_cache.delete(cache.list_key(todo_list_id))
+    cache.todo_cache.delete_group(cache.item_group(todo_list_id))
+    events.publish(todo_list_id, events.LIST_DELETED, {"id": todo_list_id})
     return True
+
+
+def _actual_item_count():
+    """TODOリストごとの実際のTODO項目の件数 (ListModelと相関させるスカラーサブクエリ)"""
+    return select(func.count(ItemModel.id)).where(ItemModel.todo_list_id == ListModel.id).scalar_subquery()
+
+def _actual_completed_count():
+    """TODOリストごとの実際の完了済みTODO項目の件数 (ListModelと相関させるスカラーサブクエリ)"""
+    return (
+        select(func.count(ItemModel.id))
+        .where(ItemModel.todo_list_id == ListModel.id, ItemModel.status_code == TodoItemStatusCode.COMPLETED.value)
+        .scalar_subquery()
+    )
+
+def find_counter_drift(db: Session):
+    """件数カウンターが実際の件数とずれているTodoリストを探す
+
+    (id, item_count, 実際の件数, completed_count, 実際の完了件数) の行を返す
+    """
+    actual_item_count = _actual_item_count()
+    actual_completed_count = _actual_completed_count()
+    return db.execute(
+        select(
+            ListModel.id,
+            ListModel.item_count,
+            actual_item_count,
+            ListModel.completed_count,
+            actual_completed_count,
+        )
+        .where(or_(ListModel.item_count != actual_item_count, ListModel.completed_count != actual_completed_count))
+        .order_by(ListModel.id),
+    ).all()
+
+def repair_counters(db: Session, todo_list_ids: list[int] | None = None) -> int:
+    """件数カウンターを集計し直して1回のUPDATE文で直す. 直したリストの件数を返す
+
+    todo_list_ids を省略すると、ずれているリストを全て直す
+    """
+    query = db.query(ListModel)
+    if todo_list_ids is not None:
+        query = query.filter(ListModel.id.in_(todo_list_ids))
+    repaired = query.filter(
+        or_(ListModel.item_count != _actual_item_count(), ListModel.completed_count != _actual_completed_count()),
+    ).update(
+        {
+            "item_count": _actual_item_count(),
+            "completed_count": _actual_completed_count(),
+            # 集計し直してもリストの updated_at は変えない
+            "updated_at": ListModel.updated_at,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    if repaired:
+        # どのリストを直したかはUPDATE文からは分からないので、リストのキャッシュはまとめて捨てる
+        cache.todo_cache.delete_prefix(cache.list_key(""))
+    return repaired
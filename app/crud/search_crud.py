@@ -0,0 +1,65 @@
+import re
+
+from sqlalchemy import and_, literal, or_, select, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+from ..models.item_model import ItemModel
+from ..models.list_model import ListModel
+
+# TODOリストとTODO項目のタイトル・説明を FULLTEXT インデックスで検索する
+# どちらのテーブルも全文検索のインデックスから一致した行だけを読むので、
+# 全体の件数ではなく一致した件数に比例した時間で済む
+
+# 検索結果の種類 (同じスコアの時はこの文字列の順に並べる)
+KIND_ITEM = "item"
+KIND_LIST = "list"
+
+# BOOLEAN MODE で演算子として扱われる文字
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+def boolean_query(q: str) -> str:
+    """空白で区切った語を全て含む行を探す BOOLEAN MODE の検索文字列にする
+
+    語は "..." のフレーズ検索にするので、ngram で分割されても語の中の文字の並びが一致する
+    """
+    terms = [BOOLEAN_OPERATORS.sub(" ", term).strip() for term in q.split()]
+    return " ".join(f'+"{term}"' for term in terms if term)
+
+def _search_table(model, kind: str, todo_list_id_column, against: str, limit: int, after: tuple[float, str, int] | None):
+    """1つのテーブルからスコアの高い順にlimit件選ぶSELECT文"""
+    score = match(model.title, model.description, against=against).in_boolean_mode()
+    query = select(
+        literal(kind).label("kind"),
+        model.id.label("id"),
+        todo_list_id_column.label("todo_list_id"),
+        model.title.label("title"),
+        model.description.label("description"),
+        score.label("score"),
+    ).where(score > 0)
+    if after is not None:
+        after_score, after_kind, after_id = after
+        # 並び順 (score DESC, kind, id) で after より後ろの行. kind はテーブルごとに決まっているので先に比べる
+        if kind > after_kind:
+            query = query.where(score <= after_score)
+        elif kind == after_kind:
+            query = query.where(or_(score < after_score, and_(score == after_score, model.id > after_id)))
+        else:
+            query = query.where(score < after_score)
+    # 両方のテーブルから上位limit件ずつ取ってから混ぜれば、全体の上位limit件が揃う
+    return query.order_by(score.desc(), model.id).limit(limit)
+
+def search(db: Session, q: str, limit: int, after: tuple[float, str, int] | None = None):
+    """TODOリストとTODO項目をスコアの高い順にlimit件検索する
+
+    after には前のページの最後の行の (score, kind, id) を渡す
+    """
+    against = boolean_query(q)
+    if not against:
+        return []
+    results = union_all(
+        _search_table(ListModel, KIND_LIST, ListModel.id, against, limit, after),
+        _search_table(ItemModel, KIND_ITEM, ItemModel.todo_list_id, against, limit, after),
+    ).subquery()
+    return db.execute(
+        select(results).order_by(results.c.score.desc(), results.c.kind, results.c.id).limit(limit),
+    ).all()
@@ -0,0 +1,90 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from .. import cache
+from ..schemas.stats_schema import ResponseTodoListStats, ResponseTodoStats
+from ..models.item_model import ItemModel
+from ..models.list_model import ListModel
+from app.const import TodoItemStatusCode
+
+# 項目を全件読んでアプリで数えずに、GROUP BY と COUNT をDBで実行する
+# どのSELECTも todo_items のインデックスだけで数えられる (item_model.py のインデックスを参照)
+
+def _aggregate(db: Session, todo_list_id: int | None, days: int, now: datetime) -> dict:
+    """TODO項目の集計 (todo_list_id が None の時は全てのTODOリスト)"""
+    def scoped(query):
+        if todo_list_id is None:
+            return query
+        return query.filter(ItemModel.todo_list_id == todo_list_id)
+
+    # ステータスごとの件数
+    by_status = dict(
+        scoped(db.query(ItemModel.status_code, func.count(ItemModel.id)))
+        .group_by(ItemModel.status_code)
+        .all(),
+    )
+
+    # 期限を過ぎた未完了の件数
+    overdue_count = scoped(db.query(func.count(ItemModel.id))).filter(
+        ItemModel.status_code == TodoItemStatusCode.NOT_COMPLETED.value,
+        ItemModel.due_at < now,
+    ).scalar()
+
+    # 日別の完了件数. 完了日時は持っていないので、完了済みの項目を最後に更新した日で数える
+    first_day = now.date() - timedelta(days=days - 1)
+    updated_day = func.date(ItemModel.updated_at)
+    per_day = dict(
+        scoped(db.query(updated_day, func.count(ItemModel.id)))
+        .filter(
+            ItemModel.status_code == TodoItemStatusCode.COMPLETED.value,
+            ItemModel.updated_at >= datetime.combine(first_day, time.min),
+        )
+        .group_by(updated_day)
+        .all(),
+    )
+
+    return {
+        "item_count": sum(by_status.values()),
+        # 0件のステータスと日も返す (グラフにそのまま使えるように)
+        "items_by_status": [
+            {"status_code": status, "count": by_status.get(status.value, 0)} for status in TodoItemStatusCode
+        ],
+        "overdue_count": overdue_count,
+        "completed_per_day": [
+            {"day": day, "count": per_day.get(day, 0)}
+            for day in (first_day + timedelta(days=i) for i in range(days))
+        ],
+    }
+
+def _read_through(key: str, schema, load):
+    """集計の結果を STATS_CACHE_TTL の間キャッシュする (書き込みでは消さない)"""
+    cached = cache.load_cached(cache.stats_cache, key, schema)
+    if cached is not None:
+        return cached
+    stats = load()
+    if stats is not None:
+        cache.stats_cache.set(key, stats.model_dump_json().encode())
+    return stats
+
+def get_todo_list_stats(db: Session, todo_list_id: int, days: int, now: datetime | None = None):
+    """指定したIDのTodoリストのTODO項目を集計する (リストが無ければNone)"""
+    def load():
+        if db.query(ListModel.id).filter_by(id=todo_list_id).first() is None:
+            return None
+        return ResponseTodoListStats(
+            todo_list_id=todo_list_id,
+            **_aggregate(db, todo_list_id, days, now or datetime.now()),
+        )
+
+    return _read_through(cache.stats_key(todo_list_id, days), ResponseTodoListStats, load)
+
+def get_stats(db: Session, days: int, now: datetime | None = None):
+    """全てのTodoリストのTODO項目を集計する"""
+    def load():
+        return ResponseTodoStats(
+            list_count=db.query(func.count(ListModel.id)).scalar(),
+            **_aggregate(db, None, days, now or datetime.now()),
+        )
+
+    return _read_through(cache.stats_key(None, days), ResponseTodoStats, load)
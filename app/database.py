@@ -1,30 +1,123 @@
-"""SQLAlchemy用."""
+"""SQLAlchemy用.
+
+エンジン(コネクションプール)は import 時には作らず、最初に使う時に作る.
+通常は app.main の lifespan で起動時に作り、ワーカーの import を軽くしておく.
+"""
+
+import os
+import threading
 
-from debug_toolbar.panels.sqlalchemy import SQLAlchemyPanel as BasePanel
-from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, scoped_session, sessionmaker
 
-from app import const
+from app import const, instrumentation
+from app.pool_metrics import MeteredAsyncAdaptedQueuePool, MeteredQueuePool
 
 # データベースのURL
 DATABASE_URL = f"mysql+pymysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_HOST}/{const.DB_NAME}?charset=utf8"
+# 非同期用のDB接続のURL (ASYNC_DB=true の時だけ使う)
+# aiomysql はスレッドプールを使わずにイベントループ上でI/O待ちをする
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_HOST}/{const.DB_NAME}?charset=utf8"
+
+_engine = None
+_async_engine = None
+_async_session_factory = None
+# 複数のスレッドから同時に最初の get_engine() が呼ばれても1つだけ作る
+_lock = threading.Lock()
+
+
+def get_engine():
+    """DB接続のエンジンを返す. 初めて呼ばれた時に作る"""
+    global _engine  # noqa: PLW0603
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                # SQLAlchemyでDB接続するための設定
+                # engine はDB接続のインターフェースとして使われる
+                engine = create_engine(
+                    DATABASE_URL,
+                    echo=False, # SQLのコンソールを非表示
+                    poolclass=MeteredQueuePool, # 待ち時間を記録するプール
+                    pool_size=const.DB_POOL_SIZE,
+                    max_overflow=const.DB_MAX_OVERFLOW,
+                    pool_timeout=const.DB_POOL_TIMEOUT,
+                    pool_recycle=const.DB_POOL_RECYCLE,
+                    pool_pre_ping=const.DB_POOL_PRE_PING,
+                )
+                if const.DB_INSTRUMENTATION:
+                    # SQLの発行回数とDB時間を Server-Timing ヘッダーで返すためのイベント
+                    instrumentation.install(engine)
+                _engine = engine
+    return _engine
+
+
+def get_async_engine():
+    """非同期用のエンジンを返す. ASYNC_DB=true でなければ None"""
+    global _async_engine, _async_session_factory  # noqa: PLW0603
+    if not const.ASYNC_DB:
+        return None
+    if _async_engine is None:
+        with _lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                async_engine = create_async_engine(
+                    ASYNC_DATABASE_URL,
+                    echo=False,
+                    poolclass=MeteredAsyncAdaptedQueuePool,
+                    pool_size=const.DB_POOL_SIZE,
+                    max_overflow=const.DB_MAX_OVERFLOW,
+                    pool_timeout=const.DB_POOL_TIMEOUT,
+                    pool_recycle=const.DB_POOL_RECYCLE,
+                    pool_pre_ping=const.DB_POOL_PRE_PING,
+                )
+                if const.DB_INSTRUMENTATION:
+                    instrumentation.install(async_engine.sync_engine)
+                # commit後に属性を読むたびに暗黙のSELECTが走らないように expire_on_commit=False
+                _async_session_factory = async_sessionmaker(
+                    async_engine,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+                _async_engine = async_engine
+    return _async_engine
+
+
+def get_async_session_factory():
+    """非同期用のセッションのファクトリーを返す. ASYNC_DB=true でなければ None"""
+    get_async_engine()
+    return _async_session_factory
+
+
+def __getattr__(name: str):
+    # from app.database import engine のような今までの書き方でも使えるようにする (その時点でエンジンを作る)
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    if name == "AsyncSessionLocal":
+        return get_async_session_factory()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+class LazySession(Session):
+    """bind が無ければ最初にDBを使う時にエンジンを作って使うセッション."""
+
+    def get_bind(self, *args, **kwargs):  # noqa: D102
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(*args, **kwargs)
 
-# SQLAlchemyでDB接続するための設定
-# engine はDB接続のインターフェースとして使われる
-engine = create_engine(
-    DATABASE_URL,
-    echo=False, # SQLのコンソールを非表示
-)
 
 # セッション管理を行う？
 # セッションのファクトリー関数(？？？？？)
 SessionLocal = scoped_session(
     # セッションの作成
     sessionmaker(
+        class_=LazySession, # engineは最初にDBを使う時に接続する
         autocommit=False,
         autoflush=False,
-        bind=engine, # engineを接続
     ),
 )
 
@@ -32,7 +125,15 @@ SessionLocal = scoped_session(
 Base = declarative_base()
 
 
-class SQLAlchemyPanel(BasePanel):
-    """FastAPI Debug BarにSQLAlchemyクエリ実行結果表示パネルを追加するための記述."""
-    async def add_engines(self, _: Request) -> None:  # noqa: D102
-        self.engines.add(engine)
+def _dispose_pool_after_fork() -> None:
+    """fork した子プロセスでは、親プロセスが作った接続を使わずにプールを作り直す"""
+    # close=False: 親プロセスが使っている接続(ソケット)は閉じない
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+
+# python -m app.server のワーカーは spawn なので不要だが、
+# gunicorn --preload のように import 後に fork する起動方法でも接続を共有しないようにする
+os.register_at_fork(after_in_child=_dispose_pool_after_fork)
@@ -0,0 +1,12 @@
+"""DEBUG=true の時だけ使うデバッグツール用 (fastapi-debug-toolbar は開発用の依存)."""
+
+from debug_toolbar.panels.sqlalchemy import SQLAlchemyPanel as BasePanel
+from fastapi import Request
+
+from app.database import get_engine
+
+
+class SQLAlchemyPanel(BasePanel):
+    """FastAPI Debug BarにSQLAlchemyクエリ実行結果表示パネルを追加するための記述."""
+    async def add_engines(self, _: Request) -> None:  # noqa: D102
+        self.engines.add(get_engine())
@@ -1,4 +1,4 @@
-from .database import SessionLocal
+from .database import SessionLocal, get_async_session_factory
 
 # DBのセッションを作る関数？
 # これは同期する。asyncで非同期で返すのも作れるらしい。
@@ -12,3 +12,16 @@ def get_db():
         
     finally: # 処理が戻ってきたら（リクエスト処理が終わったら）
         db.close() # セッションを閉じて解放
+
+
+# 非同期版のDBセッション (ASYNC_DB=true の時に使う)
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+# ストリーミングレスポンスのようにリクエスト処理が終わった後もDBを読む場合に使う
+# get_db のセッションはレスポンスを返す前に閉じられるので、自分でセッションを作る
+def get_session_factory():
+    # scoped_session はスレッドごとにセッションを共有するので、素の sessionmaker を返す
+    return SessionLocal.session_factory
@@ -0,0 +1,86 @@
+"""ETag と If-None-Match による条件付きGET、If-Match による条件付きPUT.
+
+ポーリングしているクライアントが前回のETagを If-None-Match で送ってきた時に、
+変わっていなければ本文なしの 304 Not Modified を返して、JSONへの変換と転送を省く.
+
+PUT に If-Match で取得時のETagを付けると、その後に他の誰かが更新していれば 412 Precondition Failed にする.
+1件のリソースのETagの先頭には id と version を入れておき、DBを読まずに
+UPDATE ... WHERE version IN (...) の1文で比較と更新をする.
+"""
+
+import hashlib
+
+from fastapi import Response
+
+
+def make_etag(*parts) -> str:
+    """partsの値から強いETagを作る (値が同じなら同じETagになる)"""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _json_values(schema, obj) -> tuple:
+    """レスポンスのJSONと同じ形にした全フィールドの値
+
+    ORMのオブジェクトでは status_code が int、キャッシュから戻したスキーマでは Enum のように
+    同じ本文でも型が違うことがあるので、JSONの値にそろえてからETagにする
+    """
+    if not isinstance(obj, schema):
+        obj = schema.model_validate(obj, from_attributes=True)
+    return tuple(obj.model_dump(mode="json").values())
+
+
+def resource_etag(schema, obj) -> str:
+    """レスポンススキーマの全フィールドの値からETagを作る (同じ本文なら同じETagになる)
+
+    objはORMのオブジェクトでもキャッシュから戻したスキーマでもよい
+    """
+    return make_etag(*_json_values(schema, obj))
+
+
+def versioned_etag(schema, obj) -> str:
+    """id と version を先頭に付けたETag (If-Match で受け取った時に version を取り出せる)
+
+    後ろには resource_etag と同じく全フィールドの値のハッシュを付ける
+    (TODOリストの件数カウンターのように version を上げずに変わる値があるため)
+    """
+    digest = resource_etag(schema, obj).strip('"')[:16]
+    return f'"{obj.id}-{obj.version}-{digest}"'
+
+
+def if_match_versions(if_match: str | None, resource_id: int) -> list[int] | None:
+    """If-Match のETagから version を取り出す
+
+    ヘッダーが無い時と * の時は条件なしとして None を返す.
+    他のリソースのETag・弱いETag・形式の違うETagは一致しないものとして除く (空のリストなら必ず412になる)
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    # If-Match は強い比較なので W/ 付きは一致しない
+    for tag in (tag.strip() for tag in if_match.split(",")):
+        parts = tag.strip('"').split("-")
+        if not tag.startswith('"') or len(parts) != 3 or parts[0] != str(resource_id) or not parts[1].isdigit():  # noqa: PLR2004
+            continue
+        versions.append(int(parts[1]))
+    return versions
+
+
+def collection_etag(schema, objs, *parts) -> str:
+    """複数件のレスポンスのETagを作る. partsには次のカーソルなど本文以外に返す値を渡す"""
+    return make_etag(*parts, *(_json_values(schema, obj) for obj in objs))
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match のどれかがetagと一致するか"""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match は弱い比較なので W/ を外して比べる
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def not_modified(etag: str) -> Response:
+    """本文なしの 304 Not Modified"""
+    return Response(status_code=304, headers={"ETag": etag})
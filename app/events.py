@@ -0,0 +1,219 @@
+"""TODOリストの変更イベントの配信 (GET /lists/{todo_list_id}/events の Server-Sent Events 用).
+
+list_crud/item_crud の書き込み関数が commit した後に publish し、
+購読しているリクエストごとのキュー(asyncio.Queue)に配る.
+
+購読者はイベントループ上でキューを待つだけなので、待っている間はスレッドもDB接続も使わない.
+キューの大きさには上限があり、読むのが遅いクライアントのキューが溢れた時は溜まったイベントを捨てて
+resync イベントを送る (クライアントは一覧を取り直す). 書き込み側が遅いクライアントを待つことはない.
+
+複数ワーカーで動かす時は EVENTS_BACKEND=redis にすると、Redis の Pub/Sub で全てのワーカーに配る.
+配るのは書き込みの commit の後なので、送れなくてもログに出すだけで書き込みのリクエストは失敗させない.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+import anyio.to_thread
+
+from app import const
+
+logger = logging.getLogger(__name__)
+
+# 溢れた時に送るイベント (それまでのイベントを捨てたので、クライアントは取り直す)
+RESYNC = "resync"
+# TODOリストが削除された時のイベント (これを送ったらストリームを閉じる)
+LIST_DELETED = "list_deleted"
+
+
+class Subscription:
+    """1つのSSEのリクエストの購読. イベントループ上で作ること."""
+
+    def __init__(self, todo_list_id: int, queue_size: int) -> None:
+        self.todo_list_id = todo_list_id
+        # 別スレッドから配る時に、このループで put を呼んでもらう
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def put(self, event: dict) -> None:
+        """イベントをキューに入れる. 溢れたら溜まっているイベントを捨てて resync にする"""
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            event = {"todo_list_id": self.todo_list_id, "type": RESYNC, "data": {}}
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> dict | None:
+        """次のイベントを待つ. timeout 秒の間に何も来なければNone"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class LocalBroadcast:
+    """同じプロセスの中だけで配る (EVENTS_BACKEND=memory).
+
+    複数の EventBroker で1つを共有すると、テストで複数ワーカーの代わりになる
+    """
+
+    # publish がI/Oで待つかどうか (待たないのでイベントループからそのまま呼べる)
+    blocking = False
+
+    def __init__(self) -> None:
+        self._handlers = []
+
+    def start(self, handler) -> None:  # noqa: D102
+        self._handlers.append(handler)
+
+    def stop(self, handler) -> None:  # noqa: D102
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def publish(self, message: str) -> None:  # noqa: D102
+        for handler in list(self._handlers):
+            handler(message)
+
+
+class RedisBroadcast:
+    """Redis互換サーバーの Pub/Sub で全てのワーカーに配る (EVENTS_BACKEND=redis).
+
+    client には redis.Redis と同じ publish/pubsub を持つオブジェクトを渡す.
+    受信はワーカーごとに1本のスレッドで行い、購読者の数だけスレッドを作ることはない.
+    """
+
+    # publish はサーバーとの往復を待つので、イベントループからはスレッドで呼ぶ
+    blocking = True
+
+    def __init__(self, client, channel: str = "todo:events") -> None:
+        self.client = client
+        self.channel = channel
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, handler) -> None:  # noqa: D102
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: lambda message: handler(message["data"])})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def stop(self, handler) -> None:  # noqa: D102, ARG002
+        if self._thread is not None:
+            self._thread.stop()
+            self._pubsub.close()
+            self._thread = None
+            self._pubsub = None
+
+    def publish(self, message: str) -> None:  # noqa: D102
+        self.client.publish(self.channel, message)
+
+
+class EventBroker:
+    """TODOリストごとの購読者にイベントを配る."""
+
+    def __init__(self, broadcast, queue_size: int) -> None:
+        self.broadcast = broadcast
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        # publish はスレッドプールのスレッドから、subscribe はイベントループから呼ばれるのでロックする
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        """broadcast からの受信を始める (最初の subscribe でも呼ばれる)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.broadcast.start(self._deliver)
+
+    def stop(self) -> None:
+        """broadcast からの受信をやめる"""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+        self.broadcast.stop(self._deliver)
+
+    def publish(self, todo_list_id: int, event_type: str, data: dict) -> None:
+        """イベントを全てのワーカーの購読者に送る. commit した後に呼ぶこと
+
+        送れなかった時はログに出すだけで例外にしない (書き込みは終わっているので、そのイベントが購読者に届かないだけにする)
+        """
+        try:
+            self.broadcast.publish(json.dumps({"todo_list_id": todo_list_id, "type": event_type, "data": data}))
+        except Exception:
+            logger.warning("failed to publish %s event for todo list %s", event_type, todo_list_id, exc_info=True)
+
+    def subscribe(self, todo_list_id: int) -> Subscription:
+        """TODOリストのイベントを購読する. イベントループ上で呼ぶこと"""
+        self.start()
+        subscription = Subscription(todo_list_id, self.queue_size)
+        with self._lock:
+            self._subscriptions[todo_list_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """購読をやめる"""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.todo_list_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.todo_list_id]
+
+    def subscriber_count(self, todo_list_id: int | None = None) -> int:
+        """購読者の数 (todo_list_id を省略すると全てのTODOリストの合計)"""
+        with self._lock:
+            if todo_list_id is None:
+                return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+            return len(self._subscriptions.get(todo_list_id, ()))
+
+    def _deliver(self, message: str | bytes) -> None:
+        """broadcast から受け取ったイベントを、このワーカーの購読者のキューに入れる"""
+        event = json.loads(message)
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event["todo_list_id"], ()))
+        for subscription in subscriptions:
+            # asyncio.Queue はスレッドセーフではないので、購読者のイベントループの上で入れる
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # 購読者のイベントループが既に閉じている
+                self.unsubscribe(subscription)
+
+
+def build_broker() -> EventBroker:
+    """EVENTS_BACKENDの設定からブローカーを作る"""
+    if const.EVENTS_BACKEND == "redis":
+        # redis パッケージは EVENTS_BACKEND=redis の時だけ必要
+        import redis
+
+        return EventBroker(RedisBroadcast(redis.Redis.from_url(const.REDIS_URL)), queue_size=const.EVENTS_QUEUE_SIZE)
+    return EventBroker(LocalBroadcast(), queue_size=const.EVENTS_QUEUE_SIZE)
+
+
+broker = build_broker()
+
+
+def publish(todo_list_id: int, event_type: str, data: dict) -> None:
+    """broker にイベントを送る (CRUDの書き込み関数から commit した後に呼ぶ)"""
+    broker.publish(todo_list_id, event_type, data)
+
+
+async def publish_async(todo_list_id: int, event_type: str, data: dict) -> None:
+    """publish の非同期版 (非同期のCRUDから呼ぶ). I/Oで待つ broadcast はスレッドで呼び、イベントループを止めない"""
+    if broker.broadcast.blocking:
+        await anyio.to_thread.run_sync(publish, todo_list_id, event_type, data)
+    else:
+        publish(todo_list_id, event_type, data)
+
+
+def format_sse(event: dict) -> str:
+    """イベントを text/event-stream の1件分の文字列にする"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
@@ -0,0 +1,68 @@
+"""POST の Idempotency-Key による再送の重複防止.
+
+通信が不安定なクライアントが同じ POST を再送しても、TODOリスト/TODO項目を二重に作らない.
+最初のリクエストのレスポンスを (ルート, キー, リクエストBodyのハッシュ) ごとに保存しておき、
+再送には書き込みをせずに保存したレスポンスを返す (Idempotent-Replayed: true ヘッダーを付ける).
+
+保存先は cache.idempotency_store で、IDEMPOTENCY_TTL 秒で期限切れになる.
+同じキーのリクエストが処理中の間は、後から来た方を 409 Conflict にする.
+"""
+
+import hashlib
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from app import cache, const
+
+# 再送に保存したレスポンスを返した時に付けるヘッダー
+REPLAYED_HEADER = "Idempotent-Replayed"
+# 処理中の印 (レスポンスのJSONは "{" から始まるので区別できる)
+IN_FLIGHT = b"in-flight"
+
+
+class IdempotentRequest:
+    """Idempotency-Key 付きのリクエスト1件分.
+
+    key が None の時 (ヘッダーが無い時) は何もしない
+    """
+
+    def __init__(self, key: str | None, route: str, body: BaseModel) -> None:
+        self.key = key
+        if key is not None:
+            # 空白や改行の違いで別のリクエストにならないよう、検証後のBodyからハッシュを作る
+            body_hash = hashlib.sha256(body.model_dump_json().encode()).hexdigest()
+            # キーはクライアントが決める任意の文字列なので、ハッシュにして保存先のキーに使える文字だけにする
+            key_hash = hashlib.sha256(key.encode()).hexdigest()
+            self.store_key = f"{route}:{key_hash}:{body_hash}"
+
+    def replay(self) -> Response | None:
+        """保存したレスポンスがあれば返す. 無ければ処理中の印を付けて None を返す
+
+        同じリクエストを処理中の時は 409 にする
+        """
+        if self.key is None:
+            return None
+        store = cache.idempotency_store
+        # 印を付けられたものだけが書き込みに進む (同時に来た再送は片方だけ)
+        if store.add(self.store_key, IN_FLIGHT, ttl=const.IDEMPOTENCY_LOCK_TTL):
+            return None
+        stored = store.get(self.store_key)
+        if stored is None:
+            # 確認の間に期限切れになった. もう一度だけ印を付けてみる
+            if store.add(self.store_key, IN_FLIGHT, ttl=const.IDEMPOTENCY_LOCK_TTL):
+                return None
+            stored = store.get(self.store_key)
+        if stored is None or stored == IN_FLIGHT:
+            raise HTTPException(status_code=409, detail='A request with the same Idempotency-Key is in progress')
+        return Response(content=stored, media_type="application/json", headers={REPLAYED_HEADER: "true"})
+
+    def save(self, result: BaseModel) -> None:
+        """成功したレスポンスを IDEMPOTENCY_TTL 秒の間保存する"""
+        if self.key is not None:
+            cache.idempotency_store.set(self.store_key, result.model_dump_json().encode())
+
+    def release(self) -> None:
+        """失敗した時に処理中の印を消す (同じキーで再送すればもう一度処理する)"""
+        if self.key is not None:
+            cache.idempotency_store.delete(self.store_key)
@@ -0,0 +1,93 @@
+"""リクエストごとのSQL発行回数とDB時間の計測.
+
+SQLAlchemyのイベントで実行時間を測り、ContextVarに入れたリクエストごとの集計に足していく.
+デバッグツールバーと違い、1クエリあたりの処理は時刻の取得と足し算だけなので本番でも有効にしておける.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """1リクエスト中のSQLの集計."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+
+# 同期のルートはスレッドプールで動くが、ContextVarはスレッドにコピーされるので
+# 同じ QueryStats のインスタンスに足していける
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    """実行中のリクエストの集計を返す (リクエスト外ではNone)"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += time.perf_counter() - context._query_started_at
+
+
+def install(engine) -> None:
+    """engineにSQL計測用のイベントを登録する (AsyncEngineの場合は sync_engine を渡す)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """SQLの発行回数とDB時間を Server-Timing ヘッダーで返し、遅いリクエストをログに出すミドルウェア."""
+
+    def __init__(self, app, slow_request_ms: float) -> None:
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: D102
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_server_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _current_stats.reset(token)
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            if elapsed_ms >= self.slow_request_ms:
+                logger.warning(
+                    "slow request: %s %s %.1fms (db %.1fms, %d queries)",
+                    scope["method"],
+                    scope["path"],
+                    elapsed_ms,
+                    stats.duration * 1000,
+                    stats.count,
+                )
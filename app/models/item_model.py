@@ -1,6 +1,6 @@
 from typing import ClassVar
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func, text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func, text
 
 from app.database import Base
 
@@ -8,15 +8,38 @@ from app.database import Base
 class ItemModel(Base):
     """アイテムモデル."""
     __tablename__ = "todo_items"
-    __table_args__: ClassVar[dict[str]] = {
-        "comment": "アイテムテーブル",
-    }
+    __table_args__: ClassVar[tuple] = (
+        # マイグレーション 8c2d4e6f1a3b で作成したインデックス
+        # リスト内のページネーション (todo_list_id=? ORDER BY id)
+        Index("ix_todo_items_todo_list_id_id", "todo_list_id", "id"),
+        # ステータスと期限での絞り込み
+        Index("ix_todo_items_todo_list_id_status_code_due_at", "todo_list_id", "status_code", "due_at"),
+        # 期限での絞り込み・並び替え
+        Index("ix_todo_items_todo_list_id_due_at", "todo_list_id", "due_at"),
+        # 作成日時での並び替え
+        Index("ix_todo_items_todo_list_id_created_at", "todo_list_id", "created_at"),
+        # マイグレーション c4e8a2f6b1d3 で作成したインデックス (集計API用)
+        # リストごとの日別の完了件数 (todo_list_id=? AND status_code=? AND updated_at >= ?)
+        Index("ix_todo_items_todo_list_id_status_code_updated_at", "todo_list_id", "status_code", "updated_at"),
+        # 全てのリストの期限切れの件数 (status_code=? AND due_at < ?)
+        Index("ix_todo_items_status_code_due_at", "status_code", "due_at"),
+        # 全てのリストの日別の完了件数 (status_code=? AND updated_at >= ?)
+        Index("ix_todo_items_status_code_updated_at", "status_code", "updated_at"),
+        # マイグレーション e7b3d5a9c2f4 で作成した全文検索用のインデックス (日本語も検索できるよう ngram で分割する)
+        Index("ft_todo_items_title_description", "title", "description", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        {
+            "comment": "アイテムテーブル",
+        },
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
-    todo_list_id = Column("todo_list_id", Integer, ForeignKey("todo_lists.id"), nullable=False)
+    # マイグレーションの todo_list_id_fk と同じく、リストが削除されたらDB側で項目も削除する
+    todo_list_id = Column("todo_list_id", Integer, ForeignKey("todo_lists.id", ondelete="CASCADE"), nullable=False)
     title = Column("title", String(50), nullable=False)
     description = Column("description", String(200))
     status_code = Column("status_code", Integer)
     due_at = Column("due_at", DateTime)
+    # PUTで更新するたびに増える番号 (If-Match の楽観的排他制御に使う)
+    version = Column("version", Integer, nullable=False, server_default="1")
     created_at = Column("created_at", DateTime, server_default=func.now())
     updated_at = Column("updated_at", DateTime, server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
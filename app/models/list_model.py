@@ -1,6 +1,6 @@
 from typing import ClassVar
 
-from sqlalchemy import Column, DateTime, Integer, String, func, text
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -11,10 +11,14 @@ class ListModel(Base):
 
     # テーブル名
     __tablename__ = "todo_lists"
-    # コメント？ 型ヒント: ClassVar[dict[str]] → Record<string, string> みたいなもん
-    __table_args__: ClassVar[dict[str]] = {
-        "comment": "TODOリストテーブル",
-    }
+    # コメント？ 型ヒント: ClassVar[tuple] → インデックスと最後にテーブルの設定(dict)を並べる
+    __table_args__: ClassVar[tuple] = (
+        # マイグレーション e7b3d5a9c2f4 で作成した全文検索用のインデックス (日本語も検索できるよう ngram で分割する)
+        Index("ft_todo_lists_title_description", "title", "description", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        {
+            "comment": "TODOリストテーブル",
+        },
+    )
 
     # カラムの設定
     # int型 主キー:true オートインクリメント: true
@@ -23,6 +27,14 @@ class ListModel(Base):
     title = Column("title", String(50), nullable=False)
     # str型(200文字) null許容:true
     description = Column("description", String(200))
+    # int型 TODO項目の件数 (item_crud が項目の作成・削除と同じトランザクションで更新する)
+    item_count = Column("item_count", Integer, nullable=False, server_default="0")
+    # int型 完了済みのTODO項目の件数 (item_crud が項目の完了・未完了の切り替えと同じトランザクションで更新する)
+    completed_count = Column("completed_count", Integer, nullable=False, server_default="0")
+    # int型 TODO項目を書き換えるたびに増える番号 (項目一覧のETagに使う)
+    items_version = Column("items_version", Integer, nullable=False, server_default="0")
+    # int型 PUTで更新するたびに増える番号 (If-Match の楽観的排他制御に使う. 件数カウンターの更新では増やさない)
+    version = Column("version", Integer, nullable=False, server_default="1")
     # datetime型 タイムスタンプを自動付与する
     created_at = Column("created_at", DateTime, server_default=func.now())
     # datetime型 データ更新のたびにタイムスタンプを更新する
@@ -30,4 +42,5 @@ class ListModel(Base):
     
     # リレーションシップの設定
     # 複数のItemModelを持つ Itemから親のListModelを取れるようにする
-    items = relationship("ItemModel", backref="todo_lists")
+    # passive_deletes=True: リストを削除する時に項目を読み込まず、外部キーの ON DELETE CASCADE に任せる
+    items = relationship("ItemModel", backref="todo_lists", passive_deletes=True)
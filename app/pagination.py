@@ -0,0 +1,91 @@
+"""カーソル(キーセット)ページネーション用."""
+
+import base64
+import json
+from datetime import datetime
+
+# 次ページのカーソルを返すレスポンスヘッダー
+# レスポンスBodyは今まで通り配列のままにしたいのでヘッダーで返す
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(payload: dict) -> str:
+    """カーソルの中身をクライアントから見て不透明な文字列にする"""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    # URLのクエリに乗せるので urlsafe にして末尾の = は削る
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """encode_cursorで作ったカーソルを元に戻す. 壊れている場合はValueError"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as e:  # base64/JSON/UTF-8のエラーはどれもValueErrorの仲間
+        msg = "invalid cursor"
+        raise ValueError(msg) from e
+    if not isinstance(payload, dict):
+        msg = "invalid cursor"
+        raise ValueError(msg)
+    return payload
+
+
+def encode_id_cursor(last_id: int) -> str:
+    """最後に返した行のidからカーソルを作る"""
+    return encode_cursor({"id": last_id})
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """カーソルから「ここより後ろ」のidを取り出す"""
+    last_id = decode_cursor(cursor).get("id")
+    # bool は int のサブクラスなので弾いておく
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        msg = "invalid cursor"
+        raise ValueError(msg)
+    return last_id
+
+
+def encode_keyset_cursor(last_id: int, sort: str = "id", order: str = "asc", key: datetime | None = None) -> str:
+    """(並び替えの列の値, id) の組からカーソルを作る. id の昇順なら encode_id_cursor と同じ"""
+    payload = {"id": last_id}
+    if sort != "id":
+        payload["s"] = sort
+        payload["k"] = None if key is None else key.isoformat()
+    if order != "asc":
+        payload["o"] = order
+    return encode_cursor(payload)
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[str, str, datetime | None, int]:
+    """encode_keyset_cursorで作ったカーソルから (sort, order, key, id) を取り出す"""
+    payload = decode_cursor(cursor)
+    last_id = decode_id_cursor(cursor)
+    sort = payload.get("s", "id")
+    order = payload.get("o", "asc")
+    key = payload.get("k")
+    if not isinstance(sort, str) or not isinstance(order, str):
+        msg = "invalid cursor"
+        raise ValueError(msg)
+    if key is not None:
+        if not isinstance(key, str):
+            msg = "invalid cursor"
+            raise ValueError(msg)
+        key = datetime.fromisoformat(key)
+    return sort, order, key, last_id
+
+
+def encode_search_cursor(score: float, kind: str, last_id: int) -> str:
+    """検索結果の最後の行の (スコア, 種類, id) からカーソルを作る"""
+    return encode_cursor({"id": last_id, "t": kind, "r": score})
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, str, int]:
+    """encode_search_cursorで作ったカーソルから (score, kind, id) を取り出す"""
+    payload = decode_cursor(cursor)
+    last_id = decode_id_cursor(cursor)
+    kind = payload.get("t")
+    score = payload.get("r")
+    if not isinstance(kind, str) or not isinstance(score, (int, float)) or isinstance(score, bool):
+        msg = "invalid cursor"
+        raise ValueError(msg)
+    return float(score), kind, last_id
@@ -0,0 +1,96 @@
+"""コネクションプールの統計情報."""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 接続の待ち時間ヒストグラムの区切り(秒)
+WAIT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class WaitTimeHistogram:
+    """プールから接続を借りるまでの待ち時間のヒストグラム."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # 最後の要素は WAIT_TIME_BUCKETS の最大値を超えたもの
+        self._counts = [0] * (len(WAIT_TIME_BUCKETS) + 1)
+        self._sum = 0.0
+        self._timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        """待ち時間を1件記録する"""
+        index = bisect.bisect_left(WAIT_TIME_BUCKETS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def observe_timeout(self) -> None:
+        """pool_timeout を超えて接続が借りられなかったことを記録する"""
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        """現在の値を返す (バケットは上限以下の累積件数)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            timeouts = self._timeouts
+        buckets = {}
+        cumulative = 0
+        for le, count in zip([*map(str, WAIT_TIME_BUCKETS), "+Inf"], counts, strict=True):
+            cumulative += count
+            buckets[le] = cumulative
+        return {
+            "count": cumulative,
+            "sum_seconds": round(total, 6),
+            "timeouts": timeouts,
+            "buckets": buckets,
+        }
+
+
+class _WaitTimeMixin:
+    """QueuePool の _do_get をラップして待ち時間を記録する."""
+
+    wait_time: WaitTimeHistogram
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_time.observe_timeout()
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - start)
+
+
+class MeteredQueuePool(_WaitTimeMixin, QueuePool):
+    """待ち時間を記録する QueuePool (同期用)."""
+
+    wait_time = WaitTimeHistogram()
+
+
+class MeteredAsyncAdaptedQueuePool(_WaitTimeMixin, AsyncAdaptedQueuePool):
+    """待ち時間を記録する QueuePool (非同期用)."""
+
+    wait_time = WaitTimeHistogram()
+
+
+def pool_status(pool) -> dict:
+    """プールの現在の状態を返す"""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # プールが埋まるまではマイナスの値になるので0に揃える
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, _WaitTimeMixin):
+        status["wait_time"] = pool.wait_time.snapshot()
+    return status
@@ -0,0 +1,156 @@
+"""クライアントとルートごとのレート制限 (トークンバケット).
+
+1つのクライアントが短い間隔でポーリングし続けても、DBのコネクションプールを使い切らないようにする.
+(クライアント, メソッド, ルート) ごとにバケットを持ち、使い切ったら 429 Too Many Requests と Retry-After を返す.
+ルートはパスの数字を {id} に置き換えたもので、/lists/1 と /lists/2 は同じバケットになる.
+
+クライアントは scope["client"] のアドレスで区別する. python -m app.server では uvicorn が
+FORWARDED_ALLOW_IPS のプロキシから来た時だけ X-Forwarded-For を使うので、クライアントが自分で付けたヘッダーでは変えられない.
+
+既定ではプロセス内の dict にバケットを持つ. ミドルウェアはイベントループの上だけで動き、
+バケットの読み書きの間に await しないので、ロックを使わない.
+RATE_LIMIT_BACKEND=redis にすると、全てのワーカーで共有する固定ウィンドウのカウンターを使う.
+"""
+
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+
+from starlette.responses import JSONResponse
+
+from app import const
+
+logger = logging.getLogger(__name__)
+
+# レート制限をしないパス (ロードバランサーのヘルスチェックなど)
+EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json")
+# パスの中のid
+_ID_SEGMENT = re.compile(r"/\d+(?=/|:|$)")
+
+
+def route_of(method: str, path: str) -> str:
+    """バケットを分ける単位のルート (例: GET /lists/{id}/items)"""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+def parse_routes(value: str) -> dict[str, tuple[float, int]]:
+    """"GET /lists=5:10;POST /lists/{id}/items=2:5" の形式のルートごとの設定を読む (ルート -> (rate, burst))"""
+    routes = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(";"))):
+        route, _, limit = entry.rpartition("=")
+        rate, _, burst = limit.partition(":")
+        routes[route.strip()] = (float(rate), int(burst))
+    return routes
+
+
+class MemoryStore:
+    """プロセス内のトークンバケット. イベントループのスレッドからだけ使うこと.
+
+    max_keys を超えたら最近使っていないバケットから1つずつ追い出す (クライアントの数によらず一定の手間で済む)
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> [残りのトークン, 最後に使った時刻] 末尾ほど最近使ったもの
+        self._buckets: OrderedDict[tuple, list[float]] = OrderedDict()
+
+    async def acquire(self, key: tuple, rate: float, burst: int) -> float:
+        """トークンを1つ使う. 使えたら0、足りなければ次に使えるまでの秒数を返す"""
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            self._buckets[key] = [burst - 1, now]
+            return 0.0
+        self._buckets.move_to_end(key)
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+
+class RedisStore:
+    """Redis互換サーバーの固定ウィンドウのカウンター. 全てのワーカーで共有する.
+
+    burst / rate 秒ごとのウィンドウで burst 回まで許す (トークンバケットの近似).
+    client には redis.asyncio.Redis と同じ incr/pexpire を持つオブジェクトを渡す.
+    サーバーに繋がらない時 (errors の例外) はログに出して制限せずに通す (Redisが止まっても全てを429にしない).
+    """
+
+    def __init__(
+        self, client, namespace: str = "todo_rate:", clock=time.time, errors: tuple = (ConnectionError, TimeoutError),
+    ) -> None:
+        self.client = client
+        self.namespace = namespace
+        self.clock = clock
+        # redis.RedisError など、サーバーとのやり取りの失敗として扱う例外
+        self.errors = errors
+
+    async def acquire(self, key: tuple, rate: float, burst: int) -> float:  # noqa: D102
+        window = burst / rate
+        now = self.clock()
+        window_index = int(now // window)
+        redis_key = f"{self.namespace}{':'.join(map(str, key))}:{window_index}"
+        try:
+            count = await self.client.incr(redis_key)
+            if count == 1:
+                await self.client.pexpire(redis_key, math.ceil(window * 1000))
+        except self.errors:
+            logger.warning("rate limit store failed; allowing the request: %s", redis_key, exc_info=True)
+            return 0.0
+        if count <= burst:
+            return 0.0
+        return (window_index + 1) * window - now
+
+
+def build_store():
+    """RATE_LIMIT_BACKENDの設定からバケットの保存先を作る"""
+    if const.RATE_LIMIT_BACKEND == "redis":
+        # redis パッケージは RATE_LIMIT_BACKEND=redis の時だけ必要
+        import redis.asyncio
+
+        return RedisStore(redis.asyncio.Redis.from_url(const.REDIS_URL), errors=(redis.RedisError,))
+    return MemoryStore()
+
+
+class RateLimitMiddleware:
+    """クライアントとルートごとにリクエスト数を制限するミドルウェア.
+
+    rate は1秒あたりに補充するトークン数、burst はバケットの大きさ (連続して送れる数).
+    routes で "GET /lists" のようなルートごとに (rate, burst) を変えられる
+    """
+
+    def __init__(self, app, rate: float, burst: int, routes: dict[str, tuple[float, int]] | None = None, store=None) -> None:
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.routes = routes or {}
+        self.store = MemoryStore() if store is None else store
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: D102
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        route = route_of(scope["method"], scope["path"])
+        rate, burst = self.routes.get(route, (self.rate, self.burst))
+        # 接続元のアドレス (信用するプロキシからの時だけ、uvicorn が X-Forwarded-For のアドレスに置き換える)
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        retry_after = await self.store.acquire((client, route), rate, burst)
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            {"detail": "Too Many Requests"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,46 @@
+"""TODOリストの件数カウンター (item_count / completed_count) の点検と修復.
+
+使い方(DBコンテナが起動している状態で):
+    docker compose exec -w /opt/python-be-syokyu-app app python -m app.repair_counters [--dry-run]
+
+カウンターが実際のTODO項目の件数とずれているリストを出力し、
+--dry-run を付けなければ集計し直して直す. ずれがあれば終了コード1を返すので、定期実行で監視にも使える.
+"""
+
+import argparse
+import json
+import sys
+
+from app.crud import list_crud
+from app.database import SessionLocal
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="ずれを出力するだけで直さない")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        drift = [
+            {
+                "id": todo_list_id,
+                "item_count": item_count,
+                "actual_item_count": actual_item_count,
+                "completed_count": completed_count,
+                "actual_completed_count": actual_completed_count,
+            }
+            for todo_list_id, item_count, actual_item_count, completed_count, actual_completed_count
+            in list_crud.find_counter_drift(db)
+        ]
+        repaired = 0
+        if drift and not args.dry_run:
+            repaired = list_crud.repair_counters(db)
+        print(json.dumps({"drift": drift, "repaired": repaired}, indent=2))
+    finally:
+        db.close()
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""事前にJSONにしたバイト列を返すレスポンス (FAST_JSON_RESPONSE=true の時に使う).
+
+通常はルーターで組み立てたスキーマを FastAPI が response_model で再検証し、
+jsonable_encoder と json.dumps でJSONにしている.
+ここではコンパイル済みの TypeAdapter でORMのオブジェクトから直接検証してJSONのバイト列にするので、
+検証とエンコードが1回ずつで済む. 出力されるJSONは通常のレスポンスとバイト単位で同じ.
+"""
+
+import csv
+import io
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.schemas.item_schema import ResponseBatchTodoItems, ResponseTodoItem
+from app.schemas.list_schema import ResponseTodoList
+
+# TypeAdapter は作るのが重いので起動時に1回だけ作る
+todo_item_adapter = TypeAdapter(ResponseTodoItem)
+todo_items_adapter = TypeAdapter(list[ResponseTodoItem])
+batch_todo_items_adapter = TypeAdapter(ResponseBatchTodoItems)
+todo_list_adapter = TypeAdapter(ResponseTodoList)
+todo_lists_adapter = TypeAdapter(list[ResponseTodoList])
+
+
+class PreEncodedJSONResponse(Response):
+    """JSONにエンコード済みのバイト列をそのまま返すレスポンス."""
+
+    media_type = "application/json"
+
+
+def render(adapter: TypeAdapter, data, response: Response | None = None) -> PreEncodedJSONResponse:
+    """ORMのオブジェクト(またはそのリスト)をJSONのバイト列にしてレスポンスにする"""
+    content = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    # ルーターで response.headers に設定したヘッダー(X-Next-Cursorなど)を引き継ぐ
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key not in ("content-length", "content-type")}
+    return PreEncodedJSONResponse(content, headers=headers)
+
+
+# CSVエクスポートの列 (ResponseTodoItem のフィールドと同じ順番)
+CSV_COLUMNS = list(ResponseTodoItem.model_fields)
+
+
+def encode_ndjson(todo_items) -> bytes:
+    """TODO項目を1行1件のJSON(NDJSON)にする"""
+    return b"".join(
+        todo_item_adapter.dump_json(todo_item_adapter.validate_python(todo_item, from_attributes=True)) + b"\n"
+        for todo_item in todo_items
+    )
+
+
+def encode_csv(todo_items, header: bool = False) -> bytes:
+    """TODO項目をCSVの行にする"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for todo_item in todo_items:
+        row = todo_item_adapter.dump_python(todo_item_adapter.validate_python(todo_item, from_attributes=True), mode="json")
+        writer.writerow([row[column] for column in CSV_COLUMNS])
+    return buffer.getvalue().encode()
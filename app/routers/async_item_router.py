@@ -0,0 +1,165 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import etag, pagination
+from ..const import TodoItemStatusCode
+from ..schemas import item_schema
+from ..crud import VersionConflictError, async_item_crud
+from ..dependencies import get_async_db
+
+# item_router の非同期版 (ASYNC_DB=true の時に item_router の代わりに使う)
+router = APIRouter(
+    prefix='/lists/{todo_list_id}',
+    tags=['Todo項目'],
+)
+
+# POST Todo項目を作成
+@router.post('/items', response_model=item_schema.ResponseTodoItem)
+async def post_todo_item(
+    todo_list_id: int,
+    new_todo_item : item_schema.NewTodoItem,
+    session: AsyncSession = Depends(get_async_db)
+):
+    todo_item = await async_item_crud.create_todo_item(db=session, new_todo_item=new_todo_item, todo_list_id=todo_list_id)
+    if todo_item is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    return item_schema.ResponseTodoItem(
+        id=todo_item.id,
+        todo_list_id=todo_item.todo_list_id,
+        title=todo_item.title,
+        description=todo_item.description,
+        status_code=todo_item.status_code,
+        due_at=todo_item.due_at,
+        version=todo_item.version,
+        created_at=todo_item.created_at,
+        updated_at=todo_item.updated_at,
+    )
+
+# GET todo項目を取得
+@router.get('/items/{todo_item_id}', response_model=item_schema.ResponseTodoItem)
+async def get_todo_item(
+    todo_list_id: int,
+    todo_item_id: int,
+    response: Response,
+    session: AsyncSession = Depends(get_async_db)
+):
+    todo_item = await async_item_crud.get_todo_item(db=session, todo_list_id=todo_list_id, todo_item_id=todo_item_id)
+    if todo_item is None:
+        raise HTTPException(status_code=404, detail='Todo Item not found')
+    # PUT の If-Match に使うETag
+    response.headers['ETag'] = etag.versioned_etag(item_schema.ResponseTodoItem, todo_item)
+    return item_schema.ResponseTodoItem(
+        id=todo_item.id,
+        todo_list_id=todo_item.todo_list_id,
+        title=todo_item.title,
+        description=todo_item.description,
+        status_code=todo_item.status_code,
+        due_at=todo_item.due_at,
+        version=todo_item.version,
+        created_at=todo_item.created_at,
+        updated_at=todo_item.updated_at,
+    )
+
+# GET todo項目を全て取得
+@router.get('/items', response_model=list[item_schema.ResponseTodoItem])
+async def get_todo_items(
+    todo_list_id: int,
+    response: Response,
+    page: int = Query(0, ge=0),
+    per_page: int = Query(10, gt=0, le=50),
+    cursor: str | None = Query(None),
+    status: Literal['not_completed', 'completed'] | None = Query(None),
+    due_before: datetime | None = Query(None),
+    due_after: datetime | None = Query(None),
+    sort: Literal['id', 'due_at', 'created_at'] = Query('id'),
+    order: Literal['asc', 'desc'] = Query('asc'),
+    session: AsyncSession = Depends(get_async_db)
+):
+    # 絞り込みと並び替えは item_router と同じくSQLで行う
+    filters = dict(
+        status=None if status is None else TodoItemStatusCode[status.upper()],
+        due_before=due_before,
+        due_after=due_after,
+        sort=sort,
+        order=order,
+    )
+    if cursor is None:
+        offset = (page - 1) * per_page
+        todo_items = await async_item_crud.get_todo_items(
+            db=session, todo_list_id=todo_list_id, offset=offset, limit=per_page, **filters,
+        )
+    else:
+        try:
+            cursor_sort, cursor_order, after_key, after_id = pagination.decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise HTTPException(status_code=400, detail='Cursor does not match sort and order')
+        todo_items = await async_item_crud.get_todo_items_after(
+            db=session,
+            todo_list_id=todo_list_id,
+            after_id=after_id,
+            after_key=after_key,
+            limit=per_page,
+            **filters,
+        )
+    if len(todo_items) == per_page:
+        last_item = todo_items[-1]
+        after_key = None if sort == 'id' else getattr(last_item, sort)
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_keyset_cursor(last_item.id, sort, order, after_key)
+    return [item_schema.ResponseTodoItem(
+        id=todo_item.id,
+        todo_list_id=todo_item.todo_list_id,
+        title=todo_item.title,
+        description=todo_item.description,
+        status_code=todo_item.status_code,
+        due_at=todo_item.due_at,
+        version=todo_item.version,
+        created_at=todo_item.created_at,
+        updated_at=todo_item.updated_at,
+    ) for todo_item in todo_items]
+
+# PUT todo項目を更新
+@router.put('/items/{todo_item_id}', response_model=item_schema.ResponseTodoItem)
+async def put_todo_item(
+    todo_list_id: int,
+    todo_item_id: int,
+    update_todo_item : item_schema.UpdateTodoItem,
+    response: Response,
+    if_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_db)
+):
+    try:
+        todo_item = await async_item_crud.update_todo_item(
+            db=session,
+            update_todo_item=update_todo_item,
+            todo_item_id=todo_item_id,
+            todo_list_id=todo_list_id,
+            expected_versions=etag.if_match_versions(if_match, todo_item_id),
+        )
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail='Todo Item has been modified')
+    if todo_item is None:
+        raise HTTPException(status_code=404, detail='Todo Item not found')
+    response.headers['ETag'] = etag.versioned_etag(item_schema.ResponseTodoItem, todo_item)
+    return item_schema.ResponseTodoItem(
+        id=todo_item.id,
+        todo_list_id=todo_item.todo_list_id,
+        title=todo_item.title,
+        description=todo_item.description,
+        status_code=todo_item.status_code,
+        due_at=todo_item.due_at,
+        version=todo_item.version,
+        created_at=todo_item.created_at,
+        updated_at=todo_item.updated_at,
+    )
+
+@router.delete('/items/{todo_item_id}')
+async def delete_todo_item(todo_list_id: int, todo_item_id: int, session: AsyncSession = Depends(get_async_db)):
+    todo_item = await async_item_crud.delete_todo_item(db=session, todo_item_id=todo_item_id, todo_list_id=todo_list_id)
+    if not todo_item:
+        raise HTTPException(status_code=404, detail='Not Found Todo Item')
+    return {"message": "Todo Item deleted successfully"}
@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import etag, pagination
+from ..schemas import list_schema
+from ..crud import VersionConflictError, async_list_crud
+from ..dependencies import get_async_db
+
+# list_router の非同期版 (ASYNC_DB=true の時に list_router の代わりに使う)
+# async def のルートはスレッドプールを使わずにイベントループ上で動く
+router = APIRouter(
+    prefix='/lists',
+    tags=['Todoリスト'],
+)
+
+# POST 作成
+@router.post('/', response_model=list_schema.ResponseTodoList)
+async def post_todo_list(todoList: list_schema.NewTodoList, session: AsyncSession = Depends(get_async_db)):
+    todo_list = await async_list_crud.create_todo_post(db=session, new_todo_list=todoList)
+    return list_schema.ResponseTodoList(
+        id=todo_list.id,
+        title=todo_list.title,
+        description=todo_list.description,
+        version=todo_list.version,
+        created_at=todo_list.created_at,
+        updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
+    )
+
+# GET 取得
+@router.get('/{todo_list_id}', response_model=list_schema.ResponseTodoList)
+async def get_todo_list(todo_list_id: int, response: Response, session: AsyncSession = Depends(get_async_db)):
+    todo_list = await async_list_crud.get_todo_list(db=session, todo_list_id=todo_list_id)
+    if todo_list is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    # PUT の If-Match に使うETag
+    response.headers['ETag'] = etag.versioned_etag(list_schema.ResponseTodoList, todo_list)
+    return list_schema.ResponseTodoList(
+        id=todo_list.id,
+        title=todo_list.title,
+        description=todo_list.description,
+        version=todo_list.version,
+        created_at=todo_list.created_at,
+        updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
+    )
+
+# GET 全てのTODOリストを取得
+@router.get('/', response_model=list[list_schema.ResponseTodoList])
+async def get_todo_lists(
+    response: Response,
+    page: int = Query(0, ge=0),
+    per_page: int = Query(10, gt=0, le=50),
+    cursor: str | None = Query(None),
+    session: AsyncSession = Depends(get_async_db)
+):
+    if cursor is None:
+        offset = (page - 1) * per_page
+        todo_lists = await async_list_crud.get_todo_lists(db=session, offset=offset, limit=per_page)
+    else:
+        try:
+            after_id = pagination.decode_id_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        todo_lists = await async_list_crud.get_todo_lists_after(db=session, after_id=after_id, limit=per_page)
+    if len(todo_lists) == per_page:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_id_cursor(todo_lists[-1].id)
+    return [list_schema.ResponseTodoList(
+        id=todo_list.id,
+        title=todo_list.title,
+        description=todo_list.description,
+        version=todo_list.version,
+        created_at=todo_list.created_at,
+        updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
+    ) for todo_list in todo_lists]
+
+# PUT 更新
+@router.put('/{todo_list_id}', response_model=list_schema.ResponseTodoList)
+async def put_todo_list(
+    update_todo_list: list_schema.UpdateTodoList,
+    todo_list_id: int,
+    response: Response,
+    if_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_async_db)
+):
+    try:
+        todo_list = await async_list_crud.update_todo_list(
+            db=session,
+            todo_list_id=todo_list_id,
+            update_todo_list=update_todo_list,
+            expected_versions=etag.if_match_versions(if_match, todo_list_id),
+        )
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail='Todo List has been modified')
+    if todo_list is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    response.headers['ETag'] = etag.versioned_etag(list_schema.ResponseTodoList, todo_list)
+    return list_schema.ResponseTodoList(
+        id=todo_list.id,
+        title=todo_list.title,
+        description=todo_list.description,
+        version=todo_list.version,
+        created_at=todo_list.created_at,
+        updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
+    )
+
+# DELETE 削除
+@router.delete('/{todo_list_id}')
+async def delete_todo_list(todo_list_id: int, session: AsyncSession = Depends(get_async_db)):
+    isDelete = await async_list_crud.delete_todo_list(db=session, todo_list_id=todo_list_id)
+    if not isDelete:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    return {}
@@ -0,0 +1,111 @@
+from typing import Literal
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from .. import const, responses
+from ..schemas import item_schema
+from ..crud import BulkReadBackError, item_crud, list_crud
+from ..dependencies import get_db, get_session_factory
+
+# 一括作成で1リクエストに受け付ける最大件数
+BULK_MAX_ITEMS = 10000
+# 一括取得で1リクエストに受け付ける最大のidの数
+BATCH_GET_MAX_IDS = 1000
+
+# 多くのTodo項目をまとめて扱うルート
+# 非同期版は無く、ASYNC_DB=true でも同期版を使う (1リクエストで多くの行を扱うので、スレッドプールで実行する方が向いている)
+router = APIRouter(
+    prefix='/lists/{todo_list_id}',
+    tags=['Todo項目'],
+)
+
+# POST Todo項目を一括作成
+@router.post('/items:bulk', response_model=list[item_schema.ResponseTodoItem])
+def post_todo_items_bulk(
+    todo_list_id: int,
+    new_todo_items: list[item_schema.NewTodoItem] = Body(min_length=1, max_length=BULK_MAX_ITEMS),
+    session: Session = Depends(get_db)
+):
+    try:
+        todo_items = item_crud.create_todo_items(db=session, todo_list_id=todo_list_id, new_todo_items=new_todo_items)
+    except BulkReadBackError:
+        # ロールバック済みで何も作成していないので、そのまま再送できる
+        raise HTTPException(status_code=503, detail='Created items could not be read back; nothing was created, please retry')
+    if todo_items is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.todo_items_adapter, todo_items)
+    return [item_schema.ResponseTodoItem(
+        id=todo_item.id,
+        todo_list_id=todo_item.todo_list_id,
+        title=todo_item.title,
+        description=todo_item.description,
+        status_code=todo_item.status_code,
+        due_at=todo_item.due_at,
+        version=todo_item.version,
+        created_at=todo_item.created_at,
+        updated_at=todo_item.updated_at,
+    ) for todo_item in todo_items]
+
+# POST todo項目をidでまとめて取得
+# 取得だがidの数が多いとURLに収まらないのでPOSTにする
+@router.post('/items:batchGet', response_model=item_schema.ResponseBatchTodoItems)
+def batch_get_todo_items(
+    todo_list_id: int,
+    ids: list[int] = Body(embed=True, min_length=1, max_length=BATCH_GET_MAX_IDS), # {"ids": [1, 2, 3]}
+    session: Session = Depends(get_db)
+):
+    # 見つからないidがあってもエラーにせず missing_ids で返す
+    todo_items, missing_ids = item_crud.get_todo_items_by_ids(db=session, todo_list_id=todo_list_id, todo_item_ids=ids)
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.batch_todo_items_adapter, {'items': todo_items, 'missing_ids': missing_ids})
+    return item_schema.ResponseBatchTodoItems(
+        items=[item_schema.ResponseTodoItem(
+            id=todo_item.id,
+            todo_list_id=todo_item.todo_list_id,
+            title=todo_item.title,
+            description=todo_item.description,
+            status_code=todo_item.status_code,
+            due_at=todo_item.due_at,
+            version=todo_item.version,
+            created_at=todo_item.created_at,
+            updated_at=todo_item.updated_at,
+        ) for todo_item in todo_items],
+        missing_ids=missing_ids,
+    )
+
+# GET todo項目を全てエクスポート
+# '/items/{todo_item_id}' より先に登録しないと 'export' がidとして扱われる
+@router.get('/items/export', response_class=StreamingResponse)
+def export_todo_items(
+    todo_list_id: int,
+    format: Literal['ndjson', 'csv'] = Query('ndjson'),
+    session: Session = Depends(get_db),
+    session_factory = Depends(get_session_factory),
+):
+    if list_crud.get_todo_list(db=session, todo_list_id=todo_list_id) is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+
+    def generate():
+        # 1チャンク分だけメモリに載せて、エンコードしたら次を読む
+        with session_factory() as db:
+            is_first = True
+            for todo_items in item_crud.iter_todo_items(db=db, todo_list_id=todo_list_id):
+                if format == 'csv':
+                    yield responses.encode_csv(todo_items, header=is_first)
+                else:
+                    yield responses.encode_ndjson(todo_items)
+                is_first = False
+            if format == 'csv' and is_first:
+                # 1件も無くてもヘッダー行は返す
+                yield responses.encode_csv([], header=True)
+
+    if format == 'csv':
+        return StreamingResponse(
+            generate(),
+            media_type='text/csv',
+            headers={'Content-Disposition': f'attachment; filename="todo_list_{todo_list_id}_items.csv"'},
+        )
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from .. import const, events
+from ..crud import list_crud
+from ..dependencies import get_db
+
+# TODOリストの変更イベントを Server-Sent Events で送る
+router = APIRouter(
+    prefix='/lists/{todo_list_id}',
+    tags=['Todoリスト'],
+)
+
+# GET 変更イベントのストリーム
+# 一覧をポーリングする代わりに、TODOリストとTODO項目の作成・更新・削除をその都度受け取る
+@router.get('/events', response_class=StreamingResponse)
+async def get_todo_list_events(todo_list_id: int, session: Session = Depends(get_db)):
+    # 存在チェックより先に購読する. チェックからストリームを始めるまでの間のイベント (list_deleted など) も落とさない
+    subscription = events.broker.subscribe(todo_list_id)
+    try:
+        # DBを使うのは存在チェックだけ. get_db のセッションはストリームを返す前に閉じられる
+        todo_list = await run_in_threadpool(list_crud.get_todo_list, db=session, todo_list_id=todo_list_id)
+    except BaseException:
+        events.broker.unsubscribe(subscription)
+        raise
+    if todo_list is None:
+        events.broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail='Todo List not found')
+
+    async def stream():
+        # イベントループ上でキューを待つだけなので、接続中もスレッドとDB接続は使わない
+        try:
+            yield ': connected\n\n'
+            while True:
+                event = await subscription.get(timeout=const.EVENTS_KEEPALIVE)
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                yield events.format_sse(event)
+                if event['type'] == events.LIST_DELETED:
+                    break
+        finally:
+            # クライアントが切断した時もここで購読をやめる
+            events.broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        # プロキシやブラウザにバッファリング・キャッシュさせない
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
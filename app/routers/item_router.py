@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from .. import const, etag, idempotency, pagination, responses
+from ..const import TodoItemStatusCode
 from ..schemas import item_schema
-from ..crud import item_crud
+from ..crud import VersionConflictError, item_crud
 from ..dependencies import get_db
 
 # '/lists/' から始まるパスになる
@@ -16,33 +21,55 @@ router = APIRouter(
 def post_todo_item(
     todo_list_id: int,
     new_todo_item : item_schema.NewTodoItem,
+    idempotency_key: str | None = Header(None, max_length=255), # 再送でも1件しか作らないためのキー
     session: Session = Depends(get_db)
 ):
-    todo_item = item_crud.create_todo_item(db=session, new_todo_item=new_todo_item, todo_list_id=todo_list_id)
+    # 同じキー・同じBodyの再送なら、書き込まずに前回のレスポンスを返す
+    idempotent = idempotency.IdempotentRequest(idempotency_key, f'POST /lists/{todo_list_id}/items', new_todo_item)
+    replayed = idempotent.replay()
+    if replayed is not None:
+        return replayed
+    try:
+        todo_item = item_crud.create_todo_item(db=session, new_todo_item=new_todo_item, todo_list_id=todo_list_id)
+    except Exception:
+        idempotent.release()
+        raise
     if todo_item is None:
+        # リストが作られた後の再送では作れるように、失敗は保存しない
+        idempotent.release()
         raise HTTPException(status_code=404, detail='Todo List not found')  
-    return item_schema.ResponseTodoItem(
+    result = item_schema.ResponseTodoItem(
         id=todo_item.id,
         todo_list_id=todo_item.todo_list_id,
         title=todo_item.title,
         description=todo_item.description,
         status_code=todo_item.status_code,
         due_at=todo_item.due_at,
+        version=todo_item.version,
         created_at=todo_item.created_at,
         updated_at=todo_item.updated_at,
     )
+    idempotent.save(result)
+    return result
 
 # GET todo項目を取得
 @router.get('/items/{todo_item_id}', response_model=item_schema.ResponseTodoItem)
 def get_todo_item(
     todo_list_id: int,
     todo_item_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None), # 前回のレスポンスのETag
     session: Session = Depends(get_db)
 ):
     todo_item = item_crud.get_todo_item(db=session, todo_list_id=todo_list_id, todo_item_id=todo_item_id)
     if todo_item is None:
         raise HTTPException(status_code=404, detail='Todo Item not found')
-    
+    todo_item_etag = etag.versioned_etag(item_schema.ResponseTodoItem, todo_item)
+    if etag.is_not_modified(if_none_match, todo_item_etag):
+        return etag.not_modified(todo_item_etag)
+    response.headers['ETag'] = todo_item_etag
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.todo_item_adapter, todo_item, response)
     return item_schema.ResponseTodoItem(
         id=todo_item.id,
         todo_list_id=todo_item.todo_list_id,
@@ -50,6 +77,7 @@ def get_todo_item(
         description=todo_item.description,
         status_code=todo_item.status_code,
         due_at=todo_item.due_at,
+        version=todo_item.version,
         created_at=todo_item.created_at,
         updated_at=todo_item.updated_at,
     )
@@ -58,12 +86,61 @@ def get_todo_item(
 @router.get('/items', response_model=list[item_schema.ResponseTodoItem])
 def get_todo_items(
     todo_list_id: int,
+    response: Response,
     page: int = Query(0, ge=0),
     per_page: int = Query(10, gt=0, le=50),
+    cursor: str | None = Query(None),
+    status: Literal['not_completed', 'completed'] | None = Query(None), # TodoItemStatusCode の名前
+    due_before: datetime | None = Query(None), # 期限がこの日時より前 (この日時は含まない)
+    due_after: datetime | None = Query(None), # 期限がこの日時以降
+    sort: Literal['id', 'due_at', 'created_at'] = Query('id'),
+    order: Literal['asc', 'desc'] = Query('asc'),
+    if_none_match: str | None = Header(None), # 前回のレスポンスのETag
     session: Session = Depends(get_db)
 ):
-    offset = (page - 1) * per_page
-    todo_items = item_crud.get_todo_items(db=session, todo_list_id=todo_list_id, offset=offset, limit=per_page)
+    # 項目一覧のバージョンとクエリパラメーターからETagを作る
+    # 変わっていなければ項目を読み込まずに304を返せる
+    items_version = item_crud.get_items_version(db=session, todo_list_id=todo_list_id)
+    todo_items_etag = None
+    if items_version is not None:
+        todo_items_etag = etag.make_etag(
+            'items', todo_list_id, items_version, page, per_page, cursor, status, due_before, due_after, sort, order,
+        )
+        if etag.is_not_modified(if_none_match, todo_items_etag):
+            return etag.not_modified(todo_items_etag)
+        response.headers['ETag'] = todo_items_etag
+    # 絞り込みと並び替えはSQLで行う
+    filters = dict(
+        status=None if status is None else TodoItemStatusCode[status.upper()],
+        due_before=due_before,
+        due_after=due_after,
+        sort=sort,
+        order=order,
+    )
+    if cursor is None:
+        offset = (page - 1) * per_page
+        todo_items = item_crud.get_todo_items(db=session, todo_list_id=todo_list_id, offset=offset, limit=per_page, **filters)
+    else:
+        try:
+            cursor_sort, cursor_order, after_key, after_id = pagination.decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise HTTPException(status_code=400, detail='Cursor does not match sort and order')
+        todo_items = item_crud.get_todo_items_after(
+            db=session,
+            todo_list_id=todo_list_id,
+            after_id=after_id,
+            after_key=after_key,
+            limit=per_page,
+            **filters,
+        )
+    if len(todo_items) == per_page:
+        last_item = todo_items[-1]
+        after_key = None if sort == 'id' else getattr(last_item, sort)
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_keyset_cursor(last_item.id, sort, order, after_key)
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.todo_items_adapter, todo_items, response)
     return [item_schema.ResponseTodoItem(
         id=todo_item.id,
         todo_list_id=todo_item.todo_list_id,
@@ -71,6 +148,7 @@ def get_todo_items(
         description=todo_item.description,
         status_code=todo_item.status_code,
         due_at=todo_item.due_at,
+        version=todo_item.version,
         created_at=todo_item.created_at,
         updated_at=todo_item.updated_at,
     ) for todo_item in todo_items]
@@ -81,16 +159,24 @@ def put_todo_item(
     todo_list_id: int,
     todo_item_id: int,
     update_todo_item : item_schema.UpdateTodoItem,
+    response: Response,
+    if_match: str | None = Header(None), # 取得時のETag. その後に更新されていれば412にする
     session: Session = Depends(get_db)
 ): 
-    todo_item = item_crud.update_todo_item(
-        db=session,
-        update_todo_item=update_todo_item,
-        todo_item_id=todo_item_id,
-        todo_list_id= todo_list_id
-    )
+    try:
+        todo_item = item_crud.update_todo_item(
+            db=session,
+            update_todo_item=update_todo_item,
+            todo_item_id=todo_item_id,
+            todo_list_id= todo_list_id,
+            expected_versions=etag.if_match_versions(if_match, todo_item_id),
+        )
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail='Todo Item has been modified')
     if todo_item is None:
         raise HTTPException(status_code=404, detail='Todo Item not found')
+    # 続けて更新できるように新しいETagを返す
+    response.headers['ETag'] = etag.versioned_etag(item_schema.ResponseTodoItem, todo_item)
     return item_schema.ResponseTodoItem(
         id=todo_item.id,
         todo_list_id=todo_item.todo_list_id,
@@ -98,6 +184,7 @@ def put_todo_item(
         description=todo_item.description,
         status_code=todo_item.status_code,
         due_at=todo_item.due_at,
+        version=todo_item.version,
         created_at=todo_item.created_at,
         updated_at=todo_item.updated_at,
     )
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from .. import const, etag, idempotency, pagination, responses
 from ..schemas import list_schema
-from ..crud import list_crud
+from ..crud import VersionConflictError, list_crud
 from ..dependencies import get_db
 
 # '/lists/' から始まるパスになる
@@ -13,62 +14,140 @@ router = APIRouter(
 
 # POST 作成
 @router.post('/', response_model=list_schema.ResponseTodoList)
-def post_todo_list(todoList: list_schema.NewTodoList, session: Session = Depends(get_db)):
-    todo_list = list_crud.create_todo_post(db=session, new_todo_list=todoList)
-    return list_schema.ResponseTodoList(
+def post_todo_list(
+    todoList: list_schema.NewTodoList,
+    idempotency_key: str | None = Header(None, max_length=255), # 再送でも1件しか作らないためのキー
+    session: Session = Depends(get_db)
+):
+    # 同じキー・同じBodyの再送なら、書き込まずに前回のレスポンスを返す
+    idempotent = idempotency.IdempotentRequest(idempotency_key, 'POST /lists', todoList)
+    replayed = idempotent.replay()
+    if replayed is not None:
+        return replayed
+    try:
+        todo_list = list_crud.create_todo_post(db=session, new_todo_list=todoList)
+    except Exception:
+        idempotent.release()
+        raise
+    result = list_schema.ResponseTodoList(
         id=todo_list.id,
         title=todo_list.title,
         description=todo_list.description,
+        version=todo_list.version,
         created_at=todo_list.created_at,
         updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
     )
+    idempotent.save(result)
+    return result
 
 # GET 取得
 @router.get('/{todo_list_id}', response_model=list_schema.ResponseTodoList)
-def get_todo_list(todo_list_id: int, session: Session = Depends(get_db)):
+def get_todo_list(
+    todo_list_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None), # 前回のレスポンスのETag
+    session: Session = Depends(get_db)
+):
     todo_list = list_crud.get_todo_list(db=session, todo_list_id=todo_list_id)
     if todo_list is None:
         raise HTTPException(status_code=404, detail='Todo List not found')
+    # 変わっていなければJSONにせずに304を返す
+    todo_list_etag = etag.versioned_etag(list_schema.ResponseTodoList, todo_list)
+    if etag.is_not_modified(if_none_match, todo_list_etag):
+        return etag.not_modified(todo_list_etag)
+    response.headers['ETag'] = todo_list_etag
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.todo_list_adapter, todo_list, response)
     return list_schema.ResponseTodoList(
         id=todo_list.id,
         title=todo_list.title,
         description=todo_list.description,
+        version=todo_list.version,
         created_at=todo_list.created_at,
         updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
     )
 
 # GET 全てのTODOリストを取得
 @router.get('/', response_model=list[list_schema.ResponseTodoList]) # ResponseTodoListの配列を示す
 def get_todo_lists(
+    response: Response,
     page: int = Query(0, ge=0), # 初期値:0, 0以上
     per_page: int = Query(10, gt=0, le=50), # 初期値:10, 0以上, 50以下
+    cursor: str | None = Query(None), # X-Next-Cursorで返したカーソル。指定時はpageを無視する
+    if_none_match: str | None = Header(None),
     session: Session = Depends(get_db)
 ):
-    # オフセットページネーションで、offsetを計算する
-    offset = (page - 1) * per_page
-    todo_lists = list_crud.get_todo_lists(db=session, offset=offset, limit=per_page)
+    if cursor is None:
+        # オフセットページネーションで、offsetを計算する
+        offset = (page - 1) * per_page
+        todo_lists = list_crud.get_todo_lists(db=session, offset=offset, limit=per_page)
+    else:
+        # カーソルページネーション 深いページでも前の行を読み飛ばさない
+        try:
+            after_id = pagination.decode_id_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        todo_lists = list_crud.get_todo_lists_after(db=session, after_id=after_id, limit=per_page)
+    # 1ページ分埋まっていれば続きがあるかもしれないので次のカーソルを返す
+    if len(todo_lists) == per_page:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_id_cursor(todo_lists[-1].id)
+    # リスト全体のバージョンは無いので、取得した行の値からETagを作る (転送量だけ減らせる)
+    todo_lists_etag = etag.collection_etag(
+        list_schema.ResponseTodoList, todo_lists, response.headers.get(pagination.NEXT_CURSOR_HEADER),
+    )
+    if etag.is_not_modified(if_none_match, todo_lists_etag):
+        return etag.not_modified(todo_lists_etag)
+    response.headers['ETag'] = todo_lists_etag
+    if const.FAST_JSON_RESPONSE:
+        return responses.render(responses.todo_lists_adapter, todo_lists, response)
     # 一応 ResponseTodoList で返す
     return [list_schema.ResponseTodoList(
         id=todo_list.id,
         title=todo_list.title,
         description=todo_list.description,
+        version=todo_list.version,
         created_at=todo_list.created_at,
         updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
     ) for todo_list in todo_lists] # リスト内包表記
 
 # PUT 更新
 @router.put('/{todo_list_id}', response_model=list_schema.ResponseTodoList, tags=['Todoリスト'])
-def put_todo_list(update_todo_list: list_schema.UpdateTodoList, todo_list_id: int, session: Session = Depends(get_db)):
-    todo_list = list_crud.update_todo_list(db=session, todo_list_id=todo_list_id, update_todo_list=update_todo_list)
+def put_todo_list(
+    update_todo_list: list_schema.UpdateTodoList,
+    todo_list_id: int,
+    response: Response,
+    if_match: str | None = Header(None), # 取得時のETag. その後に更新されていれば412にする
+    session: Session = Depends(get_db)
+):
+    try:
+        todo_list = list_crud.update_todo_list(
+            db=session,
+            todo_list_id=todo_list_id,
+            update_todo_list=update_todo_list,
+            expected_versions=etag.if_match_versions(if_match, todo_list_id),
+        )
+    except VersionConflictError:
+        raise HTTPException(status_code=412, detail='Todo List has been modified')
     if todo_list is None:
         # HTTPエラーを発生させる
         raise HTTPException(status_code=404, detail='Todo List not found')
+    # 続けて更新できるように新しいETagを返す
+    response.headers['ETag'] = etag.versioned_etag(list_schema.ResponseTodoList, todo_list)
     return list_schema.ResponseTodoList(
         id=todo_list.id,
         title=todo_list.title,
         description=todo_list.description,
+        version=todo_list.version,
         created_at=todo_list.created_at,
         updated_at=todo_list.updated_at,
+        item_count=todo_list.item_count,
+        completed_count=todo_list.completed_count,
     )
 
 # DELETE 削除
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from .. import pagination
+from ..schemas import search_schema
+from ..crud import search_crud
+from ..dependencies import get_db
+
+# TODOリストとTODO項目の全文検索
+router = APIRouter(
+    tags=['検索'],
+)
+
+# GET キーワードで検索
+@router.get('/search', response_model=list[search_schema.ResponseSearchResult])
+def get_search(
+    response: Response,
+    q: str = Query(min_length=1, max_length=100), # 空白で区切った語を全て含むものを探す
+    per_page: int = Query(10, gt=0, le=50),
+    cursor: str | None = Query(None), # X-Next-Cursorで返したカーソル
+    session: Session = Depends(get_db)
+):
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+    results = search_crud.search(db=session, q=q, limit=per_page, after=after)
+    # 関連度の高い順に並んでいる. 1ページ分埋まっていれば続きがあるかもしれないので次のカーソルを返す
+    if len(results) == per_page:
+        last = results[-1]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_search_cursor(last.score, last.kind, last.id)
+    return [search_schema.ResponseSearchResult.model_validate(result) for result in results]
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from .. import const
+from ..schemas import stats_schema
+from ..crud import stats_crud
+from ..dependencies import get_db
+
+# 日別の件数を返す最大の日数
+STATS_MAX_DAYS = 366
+
+# TODOリスト/TODO項目の集計
+router = APIRouter(
+    tags=['集計'],
+)
+
+def _set_cache_control(response: Response) -> None:
+    # サーバー側のキャッシュと同じ秒数だけクライアントにもキャッシュさせる
+    response.headers['Cache-Control'] = f'max-age={int(const.STATS_CACHE_TTL)}'
+
+# GET 全てのTODOリストの集計
+@router.get('/stats', response_model=stats_schema.ResponseTodoStats)
+def get_stats(
+    response: Response,
+    days: int = Query(30, ge=1, le=STATS_MAX_DAYS), # 日別の完了件数を返す日数 (今日を含む)
+    session: Session = Depends(get_db)
+):
+    stats = stats_crud.get_stats(db=session, days=days)
+    _set_cache_control(response)
+    return stats
+
+# GET TODOリストの集計
+@router.get('/lists/{todo_list_id}/stats', response_model=stats_schema.ResponseTodoListStats)
+def get_todo_list_stats(
+    todo_list_id: int,
+    response: Response,
+    days: int = Query(30, ge=1, le=STATS_MAX_DAYS),
+    session: Session = Depends(get_db)
+):
+    stats = stats_crud.get_todo_list_stats(db=session, todo_list_id=todo_list_id, days=days)
+    if stats is None:
+        raise HTTPException(status_code=404, detail='Todo List not found')
+    _set_cache_control(response)
+    return stats
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from app.const import TodoItemStatusCode
 
 # TODO項目のスキーマ定義
@@ -22,12 +22,26 @@ class UpdateTodoItem(BaseModel):
 
 
 class ResponseTodoItem(BaseModel):
+    """TODO項目のレスポンススキーマ."""
+
+    # ORMのオブジェクトから直接作れるようにする
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     todo_list_id: int
     title: str = Field(title="Todo Item Title", min_length=1, max_length=100)
     description: str | None = Field(default=None, title="Todo Item Description", min_length=1, max_length=200)
     status_code: TodoItemStatusCode = Field(title="Todo Status Code")
     due_at: datetime | None = Field(default=None, title="Todo Item Due")
+    version: int = Field(title="Incremented on every update of the item")
     created_at: datetime = Field(title="datetime that the item was created")
     updated_at: datetime = Field(title="datetime that the item was updated")
 
+
+class ResponseBatchTodoItems(BaseModel):
+    """TODO項目の一括取得のレスポンススキーマ."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    items: list[ResponseTodoItem] = Field(title="Todo Items found, in the requested order")
+    missing_ids: list[int] = Field(title="Requested ids that were not found in the list")
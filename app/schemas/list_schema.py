@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # TODOリストのスキーマ定義
 
@@ -20,8 +20,14 @@ class UpdateTodoList(BaseModel):
 class ResponseTodoList(BaseModel):
     """TODOリストのレスポンススキーマ."""
 
+    # ORMのオブジェクトから直接作れるようにする
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str = Field(title="Todo List Title", min_length=1, max_length=100)
     description: str | None = Field(default=None, title="Todo List Description", min_length=1, max_length=200)
+    version: int = Field(title="Incremented on every update of the list")
     created_at: datetime = Field(title="datetime that the item was created")
     updated_at: datetime = Field(title="datetime that the item was updated")
+    item_count: int | None = Field(default=None, title="Number of items in the list")
+    completed_count: int | None = Field(default=None, title="Number of completed items in the list")
@@ -0,0 +1,17 @@
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field
+
+# 全文検索のスキーマ定義
+
+class ResponseSearchResult(BaseModel):
+    """検索結果1件のレスポンススキーマ."""
+
+    # SELECTした行から直接作れるようにする
+    model_config = ConfigDict(from_attributes=True)
+
+    kind: Literal["list", "item"] = Field(title="Whether the result is a todo list or a todo item")
+    id: int = Field(title="Id of the todo list or the todo item")
+    todo_list_id: int = Field(title="Id of the todo list (same as id for a todo list)")
+    title: str = Field(title="Title")
+    description: str | None = Field(default=None, title="Description")
+    score: float = Field(title="Relevance, higher is better")
@@ -0,0 +1,39 @@
+from datetime import date
+from pydantic import BaseModel, Field
+from app.const import TodoItemStatusCode
+
+# 集計APIのスキーマ定義
+
+class StatusCount(BaseModel):
+    """ステータスごとのTODO項目の件数."""
+
+    status_code: TodoItemStatusCode = Field(title="Todo Status Code")
+    count: int = Field(title="Number of items with the status")
+
+
+class DailyCount(BaseModel):
+    """1日あたりの件数."""
+
+    day: date = Field(title="Day")
+    count: int = Field(title="Number of items")
+
+
+class TodoStats(BaseModel):
+    """TODO項目の集計."""
+
+    item_count: int = Field(title="Number of items")
+    items_by_status: list[StatusCount] = Field(title="Number of items by status")
+    overdue_count: int = Field(title="Number of not completed items past their due")
+    completed_per_day: list[DailyCount] = Field(title="Number of completed items by the day they were last updated, oldest first")
+
+
+class ResponseTodoListStats(TodoStats):
+    """TODOリスト1件の集計のレスポンススキーマ."""
+
+    todo_list_id: int
+
+
+class ResponseTodoStats(TodoStats):
+    """全てのTODOリストの集計のレスポンススキーマ."""
+
+    list_count: int = Field(title="Number of todo lists")
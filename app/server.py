@@ -0,0 +1,76 @@
+"""本番用の起動スクリプト.
+
+使い方:
+    python -m app.server
+
+uvicorn のワーカープロセスを WEB_CONCURRENCY (0の時はCPUのコア数) だけ起動する.
+リローダーは使わない. ワーカーは spawn で起動され、それぞれが app.main を読み込んで
+自分のエンジン(コネクションプール)を作るので、DB接続がプロセス間で共有されることはない.
+
+このモジュールは親プロセスでも読み込まれるので、app.main や app.database をimportしないこと.
+"""
+
+import logging
+import os
+
+import uvicorn
+
+from app import const
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """起動するワーカープロセスの数"""
+    if const.WEB_CONCURRENCY > 0:
+        return const.WEB_CONCURRENCY
+    # コンテナでCPUを割り当てられている場合は、マシン全体ではなく使えるコア数にする
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return max(os.cpu_count() or 1, 1)
+
+
+def shared_state_warnings(workers: int) -> list[str]:
+    """複数ワーカーの時に、ワーカーごとのプロセス内に状態を持つ設定の警告
+
+    ワーカーの間で共有されないので、再送の重複防止・イベントの配信・レート制限がワーカーごとになる
+    """
+    if workers <= 1:
+        return []
+    warnings = []
+    if const.CACHE_BACKEND != "redis":
+        warnings.append(
+            "Idempotency-Key is stored per worker (CACHE_BACKEND is not redis); "
+            "a retry that reaches another worker creates a duplicate",
+        )
+    if const.CACHE_BACKEND == "memory":
+        warnings.append("the read cache is per worker (CACHE_BACKEND=memory); other workers serve stale values until CACHE_TTL")
+    if const.EVENTS_BACKEND != "redis":
+        warnings.append("events are delivered per worker (EVENTS_BACKEND is not redis); subscribers miss writes handled by other workers")
+    if const.RATE_LIMIT_ENABLED and const.RATE_LIMIT_BACKEND != "redis":
+        warnings.append(
+            f"rate limits are counted per worker (RATE_LIMIT_BACKEND is not redis); clients get up to {workers}x the configured rate",
+        )
+    return warnings
+
+
+def main() -> None:
+    workers = worker_count()
+    for warning in shared_state_warnings(workers):
+        logger.warning("WEB_CONCURRENCY=%d: %s", workers, warning)
+    if const.RATE_LIMIT_ENABLED and "*" in (ip.strip() for ip in const.FORWARDED_ALLOW_IPS.split(",")):
+        # どこから来た X-Forwarded-For も信用するので、クライアントが付けたアドレスでレート制限を避けられる
+        logger.warning("FORWARDED_ALLOW_IPS=* lets any client choose its address for rate limiting")
+    uvicorn.run(
+        "app.main:app",
+        host=const.APP_HOST,
+        port=const.APP_PORT,
+        workers=workers,
+        # ロードバランサーの後ろで動かすので、FORWARDED_ALLOW_IPS のプロキシからの X-Forwarded-* だけを信用する
+        proxy_headers=True,
+        forwarded_allow_ips=const.FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
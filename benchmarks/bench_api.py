@@ -0,0 +1,233 @@
+"""HTTP APIの負荷テスト.
+
+起動中のAPIサーバーに対してワークロードを順番に流し、ワークロードとエンドポイントごとに
+リクエスト数/秒とレイテンシのパーセンタイル(p50/p95/p99)をJSONで出力する.
+出力にはコミットのハッシュを入れるので、変更の前後で結果を比べられる.
+
+使い方(docker compose up でアプリとDBが起動している状態で):
+    docker compose exec -w /opt/python-be-syokyu-app app python -m benchmarks.bench_api --output bench.json
+    # 前回の結果と比べる (エンドポイントごとに rps と p95 の増減率が付く)
+    docker compose exec -w /opt/python-be-syokyu-app app python -m benchmarks.bench_api --baseline bench.json
+
+ワークロード:
+    list_polling     TODOリストと項目一覧を If-None-Match 付きでポーリングする (読み込み中心)
+    deep_pagination  大量の項目をカーソルとオフセットで深いページまで読む
+    create_burst     TODO項目を作成し続ける
+    mixed_writes     TODO項目の更新(PUT)と削除(DELETE)を 3:1 で混ぜる
+
+ベンチマーク用のデータはAPI経由で作り、終わったらTODOリストごと削除する.
+アプリはMySQL固有の機能(ON UPDATE CURRENT_TIMESTAMP など)を使っているので、DBはMySQLのコンテナを使う.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stats import summarize
+
+
+# 項目一覧の1ページの件数
+PER_PAGE = 50
+# 一括作成の1リクエストの件数 (bulk_item_router.BULK_MAX_ITEMS 以下)
+SEED_CHUNK_SIZE = 5000
+
+
+class Recorder:
+    """エンドポイントごとにレイテンシとエラーを記録する."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        """リクエストを送って記録する. 5xxと通信エラーはエラーとして数え、Noneを返す"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        if response.status_code >= 500:  # noqa: PLR2004
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        """ワークロード全体とエンドポイントごとの集計"""
+        endpoints = sorted(set(self.latencies) | set(self.errors))
+        return {
+            "errors": sum(self.errors.values()),
+            **summarize([latency for latencies in self.latencies.values() for latency in latencies], elapsed),
+            "endpoints": {
+                endpoint: {"errors": self.errors[endpoint], **summarize(self.latencies[endpoint], elapsed)}
+                for endpoint in endpoints
+            },
+        }
+
+
+async def list_polling(client: httpx.AsyncClient, recorder: Recorder, context: dict, deadline: float) -> None:
+    """モバイルクライアントのように、前回のETagを付けて同じリソースを取り直す"""
+    todo_list_id = context["todo_list_id"]
+    etags: dict[str, str] = {}
+    paths = {
+        "GET /lists/{todo_list_id}": f"/lists/{todo_list_id}",
+        "GET /lists/{todo_list_id}/items": f"/lists/{todo_list_id}/items?page=1&per_page={PER_PAGE}",
+    }
+    while time.perf_counter() < deadline:
+        for endpoint, path in paths.items():
+            headers = {"If-None-Match": etags[path]} if path in etags else {}
+            response = await recorder.request(client, endpoint, "GET", path, headers=headers)
+            if response is not None and "ETag" in response.headers:
+                etags[path] = response.headers["ETag"]
+
+
+async def deep_pagination(client: httpx.AsyncClient, recorder: Recorder, context: dict, deadline: float) -> None:
+    """カーソルで最後のページまでたどりつつ、オフセットで深いページを読む"""
+    todo_list_id = context["todo_list_id"]
+    path = f"/lists/{todo_list_id}/items"
+    last_page = max(context["seed_items"] // PER_PAGE, 1)
+    cursor = None
+    while time.perf_counter() < deadline:
+        params = {"per_page": PER_PAGE, "page": 1} if cursor is None else {"per_page": PER_PAGE, "cursor": cursor}
+        response = await recorder.request(client, "GET /lists/{todo_list_id}/items (cursor)", "GET", path, params=params)
+        # 最後のページまで行ったら先頭から読み直す
+        cursor = None if response is None else response.headers.get("X-Next-Cursor")
+
+        page = random.randint(last_page // 2, last_page)  # noqa: S311
+        await recorder.request(client, "GET /lists/{todo_list_id}/items (offset)", "GET", path, params={"per_page": PER_PAGE, "page": page})
+
+
+async def create_burst(client: httpx.AsyncClient, recorder: Recorder, context: dict, deadline: float) -> None:
+    """TODO項目を作成し続ける. 作った項目は mixed_writes で使う"""
+    todo_list_id = context["write_list_id"]
+    while time.perf_counter() < deadline:
+        response = await recorder.request(
+            client, "POST /lists/{todo_list_id}/items", "POST", f"/lists/{todo_list_id}/items", json={"title": "bench_api"},
+        )
+        if response is not None and response.status_code == 200:  # noqa: PLR2004
+            context["created_ids"].append(response.json()["id"])
+
+
+async def mixed_writes(client: httpx.AsyncClient, recorder: Recorder, context: dict, deadline: float) -> None:
+    """作成済みの項目を更新し、4回に1回は削除する"""
+    todo_list_id = context["write_list_id"]
+    created_ids = context["created_ids"]
+    while time.perf_counter() < deadline and created_ids:
+        todo_item_id = random.choice(created_ids)  # noqa: S311
+        path = f"/lists/{todo_list_id}/items/{todo_item_id}"
+        if random.random() < 0.25 and todo_item_id in created_ids:  # noqa: S311, PLR2004
+            created_ids.remove(todo_item_id)
+            await recorder.request(client, "DELETE /lists/{todo_list_id}/items/{todo_item_id}", "DELETE", path)
+        else:
+            await recorder.request(
+                client,
+                "PUT /lists/{todo_list_id}/items/{todo_item_id}",
+                "PUT",
+                path,
+                json={"title": "bench_api_updated", "complete": random.random() < 0.5},  # noqa: S311, PLR2004
+            )
+
+
+WORKLOADS = {
+    "list_polling": list_polling,
+    "deep_pagination": deep_pagination,
+    "create_burst": create_burst,
+    "mixed_writes": mixed_writes,
+}
+
+
+async def _seed(client: httpx.AsyncClient, seed_items: int) -> dict:
+    """読み込み用と書き込み用のTODOリストを作り、読み込み用には項目をまとめて入れる"""
+    todo_list_id = (await client.post("/lists/", json={"title": "bench_api"})).json()["id"]
+    write_list_id = (await client.post("/lists/", json={"title": "bench_api_writes"})).json()["id"]
+    for start in range(0, seed_items, SEED_CHUNK_SIZE):
+        count = min(SEED_CHUNK_SIZE, seed_items - start)
+        response = await client.post(f"/lists/{todo_list_id}/items:bulk", json=[{"title": f"bench_api_{start + i}"} for i in range(count)])
+        response.raise_for_status()
+    return {"todo_list_id": todo_list_id, "write_list_id": write_list_id, "seed_items": seed_items, "created_ids": []}
+
+
+async def run(url: str, workloads: list[str], concurrency: int, duration: float, seed_items: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        context = await _seed(client, seed_items)
+        results = {}
+        try:
+            for name in workloads:
+                workload = WORKLOADS[name]
+                recorder = Recorder()
+                deadline = time.perf_counter() + duration
+                started = time.perf_counter()
+                await asyncio.gather(*[workload(client, recorder, context, deadline) for _ in range(concurrency)])
+                results[name] = recorder.report(time.perf_counter() - started)
+        finally:
+            # TODO項目は ON DELETE CASCADE で消える
+            await client.delete(f"/lists/{context['todo_list_id']}")
+            await client.delete(f"/lists/{context['write_list_id']}")
+    return {
+        "commit": _git_commit(),
+        "url": url,
+        "concurrency": concurrency,
+        "duration": duration,
+        "seed_items": seed_items,
+        "workloads": results,
+    }
+
+
+def compare(result: dict, baseline: dict) -> None:
+    """前回の結果と比べて、エンドポイントごとに rps と p95 の増減率(%)を付け足す"""
+    result["baseline_commit"] = baseline.get("commit")
+    for name, workload in result["workloads"].items():
+        baseline_endpoints = baseline.get("workloads", {}).get(name, {}).get("endpoints", {})
+        for endpoint, stats in workload["endpoints"].items():
+            before = baseline_endpoints.get(endpoint)
+            if not before:
+                continue
+            stats["vs_baseline"] = {
+                key: round((stats[key] - before[key]) / before[key] * 100, 1) if before[key] else None
+                for key in ("rps", "p95_ms")
+            }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:18008")
+    parser.add_argument("--workload", action="append", choices=WORKLOADS, help="流すワークロード (複数指定可, 省略時は全て)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="ワークロードごとの秒数")
+    parser.add_argument("--seed-items", type=int, default=20_000, help="読み込み用のTODOリストに入れる項目数")
+    parser.add_argument("--baseline", type=Path, help="比較対象の結果のJSON")
+    parser.add_argument("--output", type=Path, help="結果のJSONの保存先")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.workload or list(WORKLOADS), args.concurrency, args.duration, args.seed_items))
+    if args.baseline:
+        compare(result, json.loads(args.baseline.read_text()))
+    output = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""同期版と非同期版(ASYNC_DB=true)のスループット比較用の負荷テスト.
+
+起動中のAPIサーバーに対して、指定した同時接続数でGETリクエストを送り続け、
+リクエスト数/秒とレイテンシのパーセンタイルをJSONで出力する.
+
+使い方:
+    # 同期版
+    uvicorn app.main:app --port 18008
+    python -m benchmarks.bench_async_load --url http://localhost:18008 --concurrency 500
+
+    # 非同期版
+    ASYNC_DB=true uvicorn app.main:app --port 18008
+    python -m benchmarks.bench_async_load --url http://localhost:18008 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.stats import summarize
+
+
+async def _worker(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:  # noqa: PLR2004
+                errors.append(response.status_code)
+            else:
+                latencies.append(time.perf_counter() - start)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def run(url: str, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        # 読み込み対象のTODOリストを1件作っておく
+        todo_list = (await client.post("/lists/", json={"title": "bench_async_load"})).json()
+        path = f"/lists/{todo_list['id']}"
+
+        latencies: list[float] = []
+        errors: list = []
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+        await client.delete(path)
+
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        **summarize(latencies, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:18008")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.url, args.concurrency, args.duration)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
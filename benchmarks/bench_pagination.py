@@ -0,0 +1,103 @@
+"""オフセットページネーションとカーソルページネーションの速度比較.
+
+使い方(DBコンテナが起動している状態で):
+    docker compose exec -w /opt/python-be-syokyu-app app python -m benchmarks.bench_pagination
+
+ベンチマーク用のTODOリストにTODO項目をまとめてインサートし、
+1, 1,000, 10,000 ページ目を両方の方式で取得した時間(ミリ秒の中央値)をJSONで出力する.
+終わったらベンチマーク用のデータは削除する.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy import insert
+
+from app.const import TodoItemStatusCode
+from app.crud import item_crud
+from app.database import SessionLocal
+from app.models.item_model import ItemModel
+from app.models.list_model import ListModel
+
+PAGES = (1, 1_000, 10_000)
+
+
+def _seed(db, num_of_items: int) -> int:
+    """ベンチマーク用のTODOリストと項目を作り、リストのidを返す"""
+    todo_list = ListModel(title="bench_pagination", description="A record for the pagination benchmark.")
+    db.add(todo_list)
+    db.commit()
+
+    chunk = 5_000
+    for start in range(0, num_of_items, chunk):
+        rows = [
+            {
+                "todo_list_id": todo_list.id,
+                "title": f"bench_{i}",
+                "status_code": TodoItemStatusCode.NOT_COMPLETED.value,
+            }
+            for i in range(start, min(start + chunk, num_of_items))
+        ]
+        db.execute(insert(ItemModel), rows)
+        db.commit()
+    return todo_list.id
+
+
+def _measure(func, repeat: int) -> float:
+    """funcをrepeat回実行して、かかった時間の中央値(ミリ秒)を返す"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    num_of_items = max(PAGES) * args.per_page
+    todo_list_id = _seed(db, num_of_items)
+    try:
+        results = []
+        for page in PAGES:
+            offset = (page - 1) * args.per_page
+            # カーソルの位置(直前のページの最後のid)は計測の外で求めておく
+            after_id = 0
+            if offset > 0:
+                after_id = (
+                    db.query(ItemModel.id)
+                    .filter_by(todo_list_id=todo_list_id)
+                    .order_by(ItemModel.id)
+                    .offset(offset - 1)
+                    .limit(1)
+                    .scalar()
+                )
+            results.append({
+                "page": page,
+                "offset_ms": _measure(
+                    lambda offset=offset: item_crud.get_todo_items(db, todo_list_id, offset, args.per_page),
+                    args.repeat,
+                ),
+                "cursor_ms": _measure(
+                    lambda after_id=after_id: item_crud.get_todo_items_after(db, todo_list_id, after_id, args.per_page),
+                    args.repeat,
+                ),
+            })
+            db.expunge_all()
+        print(json.dumps({"per_page": args.per_page, "num_of_items": num_of_items, "results": results}, indent=2))
+    finally:
+        db.query(ItemModel).filter_by(todo_list_id=todo_list_id).delete()
+        db.query(ListModel).filter_by(id=todo_list_id).delete()
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
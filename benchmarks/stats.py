@@ -0,0 +1,15 @@
+"""ベンチマーク結果の集計."""
+
+import statistics
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """レイテンシ(秒)のリストから、リクエスト数/秒とパーセンタイル(ミリ秒)を求める"""
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0] if latencies else 0.0] * 99
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
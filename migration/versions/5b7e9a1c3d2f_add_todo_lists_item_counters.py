@@ -0,0 +1,45 @@
+"""add todo_lists item counters
+
+Revision ID: 5b7e9a1c3d2f
+Revises: 8c2d4e6f1a3b
+Create Date: 2026-10-18 11:03:52.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e9a1c3d2f'
+down_revision: Union[str, None] = '8c2d4e6f1a3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/const.py の TodoItemStatusCode.COMPLETED
+COMPLETED = 2
+
+
+def upgrade() -> None:
+    # MySQL 8 は末尾への列追加を ALGORITHM=INSTANT で行うのでテーブルのコピーは起きない
+    op.add_column('todo_lists', sa.Column('item_count', sa.Integer, nullable=False, server_default='0'))
+    op.add_column('todo_lists', sa.Column('completed_count', sa.Integer, nullable=False, server_default='0'))
+    # 既存のデータを集計して埋める
+    # updated_at = updated_at を指定して ON UPDATE CURRENT_TIMESTAMP を発火させない
+    op.execute(
+        'UPDATE todo_lists AS l'
+        ' LEFT JOIN ('
+        '  SELECT todo_list_id, COUNT(*) AS item_count,'
+        f'  SUM(status_code = {COMPLETED}) AS completed_count'
+        '  FROM todo_items GROUP BY todo_list_id'
+        ' ) AS c ON c.todo_list_id = l.id'
+        ' SET l.item_count = COALESCE(c.item_count, 0),'
+        '  l.completed_count = COALESCE(c.completed_count, 0),'
+        '  l.updated_at = l.updated_at'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('todo_lists', 'completed_count')
+    op.drop_column('todo_lists', 'item_count')
@@ -0,0 +1,51 @@
+"""add todo_items indexes
+
+Revision ID: 8c2d4e6f1a3b
+Revises: 3f0b5fa5c5e1
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d4e6f1a3b'
+down_revision: Union[str, None] = '3f0b5fa5c5e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/models/item_model.py の Index と揃えること
+INDEXES = {
+    'ix_todo_items_todo_list_id_id': '(todo_list_id, id)',
+    'ix_todo_items_todo_list_id_status_code_due_at': '(todo_list_id, status_code, due_at)',
+    'ix_todo_items_todo_list_id_due_at': '(todo_list_id, due_at)',
+    'ix_todo_items_todo_list_id_created_at': '(todo_list_id, created_at)',
+}
+
+# 外部キー作成時にMySQLが自動で作ったインデックス
+# (todo_list_id, id) が外部キーにも使えるので不要になる
+FK_INDEX = 'todo_list_id_fk'
+
+
+def _index_names() -> set[str]:
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('todo_items')}
+
+
+def upgrade() -> None:
+    clauses = [f'ADD INDEX {name} {columns}' for name, columns in INDEXES.items()]
+    if FK_INDEX in _index_names():
+        clauses.append(f'DROP INDEX {FK_INDEX}')
+    # ALGORITHM=INPLACE, LOCK=NONE でインデックス作成中も書き込みをブロックしない
+    # 1つのALTER TABLEにまとめてテーブルの走査を1回で済ませる
+    op.execute(f"ALTER TABLE todo_items {', '.join(clauses)}, ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def downgrade() -> None:
+    clauses = [f'DROP INDEX {name}' for name in INDEXES]
+    if FK_INDEX not in _index_names():
+        # 外部キー用のインデックスが無くなるので先に戻しておく
+        clauses.insert(0, f'ADD INDEX {FK_INDEX} (todo_list_id)')
+    op.execute(f"ALTER TABLE todo_items {', '.join(clauses)}, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,27 @@
+"""add todo_lists items_version
+
+Revision ID: 9d4f2b8e6a17
+Revises: 5b7e9a1c3d2f
+Create Date: 2026-10-18 13:26:08.774512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f2b8e6a17'
+down_revision: Union[str, None] = '5b7e9a1c3d2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # TODO項目を書き換えるたびに1増やす (項目一覧のETagに使う)
+    op.add_column('todo_lists', sa.Column('items_version', sa.Integer, nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('todo_lists', 'items_version')
@@ -0,0 +1,35 @@
+"""add todo_items stats indexes
+
+Revision ID: c4e8a2f6b1d3
+Revises: 9d4f2b8e6a17
+Create Date: 2026-10-18 15:02:37.218840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2f6b1d3'
+down_revision: Union[str, None] = '9d4f2b8e6a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/models/item_model.py の Index と揃えること
+INDEXES = {
+    'ix_todo_items_todo_list_id_status_code_updated_at': '(todo_list_id, status_code, updated_at)',
+    'ix_todo_items_status_code_due_at': '(status_code, due_at)',
+    'ix_todo_items_status_code_updated_at': '(status_code, updated_at)',
+}
+
+
+def upgrade() -> None:
+    clauses = [f'ADD INDEX {name} {columns}' for name, columns in INDEXES.items()]
+    # 8c2d4e6f1a3b と同じく、書き込みをブロックせずにテーブルの走査1回で作る
+    op.execute(f"ALTER TABLE todo_items {', '.join(clauses)}, ALGORITHM=INPLACE, LOCK=NONE")
+
+
+def downgrade() -> None:
+    clauses = [f'DROP INDEX {name}' for name in INDEXES]
+    op.execute(f"ALTER TABLE todo_items {', '.join(clauses)}, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,37 @@
+"""add fulltext indexes
+
+Revision ID: e7b3d5a9c2f4
+Revises: c4e8a2f6b1d3
+Create Date: 2026-10-18 16:40:12.655093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d5a9c2f4'
+down_revision: Union[str, None] = 'c4e8a2f6b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/models の Index と揃えること (テーブル -> インデックス名)
+INDEXES = {
+    'todo_lists': 'ft_todo_lists_title_description',
+    'todo_items': 'ft_todo_items_title_description',
+}
+
+
+def upgrade() -> None:
+    for table, name in INDEXES.items():
+        # 最初の FULLTEXT インデックスはテーブルを作り直すので LOCK=NONE にはできない (読み込みはブロックしない)
+        op.execute(
+            f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} (title, description) WITH PARSER ngram, "
+            "ALGORITHM=INPLACE, LOCK=SHARED",
+        )
+
+
+def downgrade() -> None:
+    for table, name in INDEXES.items():
+        op.execute(f"ALTER TABLE {table} DROP INDEX {name}, ALGORITHM=INPLACE, LOCK=NONE")
@@ -0,0 +1,31 @@
+"""add version columns
+
+Revision ID: f1a5c7e3b9d2
+Revises: e7b3d5a9c2f4
+Create Date: 2026-10-18 18:05:51.390277
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a5c7e3b9d2'
+down_revision: Union[str, None] = 'e7b3d5a9c2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('todo_lists', 'todo_items')
+
+
+def upgrade() -> None:
+    # PUT のたびに1増やす (If-Match の楽観的排他制御に使う)
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer, nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'version')
@@ -1,12 +1,121 @@
+"""テスト用のDBの準備.
+
+既定ではテストごとに1本の接続でトランザクションを張り、アプリの commit は SAVEPOINT の解放にして、
+テストの最後に丸ごとロールバックする. 全件DELETEをしないので速い.
+
+別の接続からDBを読み書きするテスト (非同期のエンジンを使うものなど) は
+@pytest.mark.truncate_db を付けると、今まで通りテストの前後で全件DELETEする.
+TEST_DB_ISOLATION=truncate で全てのテストを全件DELETEにもできる.
+
+pytest-xdist で並列に実行する (pytest -n auto) と、ワーカーごとに
+<DB_NAME>_gw0, <DB_NAME>_gw1 ... のデータベースを作ってマイグレーションを流す.
+"""
+
+import os
+from pathlib import Path
+
 import pytest
-from sqlalchemy import inspect
 
-from app.database import SessionLocal, engine
-from app.models import item_model, list_model
+# ワーカーごとに別のデータベースを使う. app が DB_NAME を読む前に変えておく
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+if XDIST_WORKER:
+    os.environ["DB_NAME"] = f"{os.environ['DB_NAME']}_{XDIST_WORKER}"
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import create_engine, event, inspect, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app import const  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.dependencies import get_db, get_session_factory  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import item_model, list_model  # noqa: E402
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# transaction: トランザクションをロールバックする / truncate: 全件DELETEする
+TEST_DB_ISOLATION = os.getenv("TEST_DB_ISOLATION", "transaction")
+
+# トランザクションの仕組みで発行されるSQL (count_queries では数えない)
+SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@pytest.fixture(scope="session")
+def test_database():
+    """テスト用のデータベースを用意し、前回の実行で残ったレコードを消す."""
+    if XDIST_WORKER:
+        _create_database()
+        config = Config(str(ROOT_DIR / "alembic.ini"))
+        config.set_main_option("script_location", str(ROOT_DIR / "migration"))
+        command.upgrade(config, "head")
+    db = SessionLocal()
+    try:
+        _reset_records(db)
+    finally:
+        db.close()
 
 
 @pytest.fixture(autouse=False)
-def db_session():
+def db_session(request, test_database):
+    if TEST_DB_ISOLATION == "truncate" or request.node.get_closest_marker("truncate_db"):
+        yield from _truncating_session()
+    else:
+        yield from _transactional_session()
+
+
+@pytest.fixture()
+def count_queries():
+    """テスト中に発行されたSQL文を (statement, parameters) のリストで記録する."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(SAVEPOINT_STATEMENTS):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def _transactional_session():
+    """1本の接続のトランザクションの中で、テストとアプリのセッションを動かす."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # セッションの commit/rollback は接続のトランザクションではなく SAVEPOINT に対して行う
+    session_factory = sessionmaker(
+        bind=connection,
+        autocommit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+    # リクエストごとのセッションも同じ接続を使う (識別マップはリクエストごとに分ける)
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_session_factory, None)
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+def _truncating_session():
+    """テストの前後で全件DELETEする."""
     db = SessionLocal()
     try:
         _reset_records(db)
@@ -16,6 +125,17 @@ def db_session():
         db.close()
 
 
+def _create_database() -> None:
+    """DB_NAMEのデータベースが無ければ作る."""
+    server_engine = create_engine(
+        f"mysql+pymysql://{const.DB_USER}:{const.DB_PASS}@{const.DB_HOST}/?charset=utf8",
+        poolclass=NullPool,
+    )
+    with server_engine.connect() as connection:
+        connection.execute(text(f"CREATE DATABASE IF NOT EXISTS `{const.DB_NAME}`"))
+    server_engine.dispose()
+
+
 def _reset_records(db) -> None:
     """テーブルのレコードをリセット."""
     inspector = inspect(engine)
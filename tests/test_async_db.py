@@ -0,0 +1,134 @@
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import cache
+from app.crud import item_crud, list_crud
+from app.database import ASYNC_DATABASE_URL
+from app.dependencies import get_async_db
+from app.models import item_model, list_model
+from app.routers import async_item_router, async_list_router
+
+# TestClientはリクエストごとにイベントループが変わることがあるので、接続はプールしない
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def _get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+app.include_router(async_list_router.router)
+app.include_router(async_item_router.router)
+app.dependency_overrides[get_async_db] = _get_async_db
+
+client = TestClient(app)
+
+# 別のエンジン(接続)でDBを読み書きするので、トランザクションのロールバックではなく全件DELETEで片付ける
+pytestmark = pytest.mark.truncate_db
+
+
+def test_async_todo_list_crud(db_session) -> None:
+    """非同期版のルーターでTODOリストの作成・取得・更新・削除ができること."""
+    response = client.post("/lists", json={"title": "async_test", "description": "A test record for async routes."})
+    assert response.status_code == status.HTTP_200_OK
+    todo_list_id = response.json()["id"]
+
+    response = client.get(f"/lists/{todo_list_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "async_test"
+
+    response = client.put(f"/lists/{todo_list_id}", json={"title": "updated_async_test"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "updated_async_test"
+
+    response = client.delete(f"/lists/{todo_list_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert db_session.query(list_model.ListModel).filter_by(id=todo_list_id).first() is None
+
+
+@pytest.mark.parametrize("complete", [True, False])
+def test_async_todo_item_crud(complete: bool, db_session) -> None:
+    """非同期版のルーターでTODO項目の作成・更新・削除ができること."""
+    db_todo_list = list_model.ListModel(title="async_test", description="A test record for async routes.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+
+    response = client.post(f"/lists/{todo_list_id}/items", json={"title": "async_test"})
+    assert response.status_code == status.HTTP_200_OK
+    todo_item_id = response.json()["id"]
+
+    response = client.put(f"/lists/{todo_list_id}/items/{todo_item_id}", json={"complete": complete})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status_code"] == (2 if complete else 1)
+
+    response = client.get(f"/lists/{todo_list_id}/items", params={"page": 1})
+    assert [x["id"] for x in response.json()] == [todo_item_id]
+
+    response = client.delete(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    assert response.status_code == status.HTTP_200_OK
+    db_session.reset()
+    assert db_session.query(item_model.ItemModel).filter_by(id=todo_item_id).first() is None
+
+
+def test_async_todo_item_404() -> None:
+    """存在しないTODOリストへの項目作成は404になること."""
+    response = client.post("/lists/-1/items", json={"title": "async_test"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_todo_items_filter_and_sort(db_session) -> None:
+    """非同期版でも一覧の絞り込み・並び替え・カーソルが同期版と同じように効くこと."""
+    db_todo_list = list_model.ListModel(title="async_test", description="A test record for async routes.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    db_session.add_all([
+        item_model.ItemModel(todo_list_id=todo_list_id, title="a", status_code=1, due_at="2024-09-03 00:00:00"),
+        item_model.ItemModel(todo_list_id=todo_list_id, title="b", status_code=2, due_at="2024-09-02 00:00:00"),
+        item_model.ItemModel(todo_list_id=todo_list_id, title="c", status_code=1, due_at="2024-09-01 00:00:00"),
+        item_model.ItemModel(todo_list_id=todo_list_id, title="d", status_code=1, due_at="2024-09-04 00:00:00"),
+    ])
+    db_session.commit()
+
+    params = {"status": "not_completed", "due_before": "2024-09-04T00:00:00", "sort": "due_at", "per_page": 1}
+    response = client.get(f"/lists/{todo_list_id}/items", params={**params, "page": 1})
+    assert [x["title"] for x in response.json()] == ["c"]
+
+    response = client.get(f"/lists/{todo_list_id}/items", params={**params, "cursor": response.headers["X-Next-Cursor"]})
+    assert [x["title"] for x in response.json()] == ["a"]
+
+    # 並び順の違うカーソルは400
+    response = client.get(f"/lists/{todo_list_id}/items", params={**params, "order": "desc", "cursor": response.headers["X-Next-Cursor"]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_async_writes_invalidate_cache(db_session, monkeypatch) -> None:
+    """非同期版の書き込みでも、同期版と共有するキャッシュが消えること."""
+    todo_cache = cache.LRUCache(max_bytes=1024 * 1024, ttl=60)
+    monkeypatch.setattr(cache, "todo_cache", todo_cache)
+    todo_list_id = client.post("/lists", json={"title": "async_test"}).json()["id"]
+    todo_item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "async_test"}).json()["id"]
+
+    # 同期版のCRUDでキャッシュに載せる
+    list_crud.get_todo_list(db=db_session, todo_list_id=todo_list_id)
+    item_crud.get_todo_item(db=db_session, todo_list_id=todo_list_id, todo_item_id=todo_item_id)
+    client.put(f"/lists/{todo_list_id}", json={"title": "updated_async_test"})
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_id}", json={"complete": True})
+    assert todo_cache.get(cache.list_key(todo_list_id)) is None
+    assert todo_cache.get(cache.item_key(todo_list_id, todo_item_id)) is None
+
+    db_session.reset()
+    assert list_crud.get_todo_list(db=db_session, todo_list_id=todo_list_id).title == "updated_async_test"
+    assert item_crud.get_todo_item(db=db_session, todo_list_id=todo_list_id, todo_item_id=todo_item_id).status_code == 2
+
+    client.delete(f"/lists/{todo_list_id}")
+    assert todo_cache.get(cache.list_key(todo_list_id)) is None
+    assert todo_cache.get(cache.item_key(todo_list_id, todo_item_id)) is None
+    db_session.reset()
+    assert list_crud.get_todo_list(db=db_session, todo_list_id=todo_list_id) is None
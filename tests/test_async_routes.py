@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# 登録した順に (メソッド, パス) を出力する
+_LIST_ROUTES = (
+    "import json; from app.main import app; "
+    "print(json.dumps([[method, route.path] for route in app.routes for method in sorted(getattr(route, 'methods', None) or [])]))"
+)
+
+
+def _routes(async_db: str) -> list[tuple[str, str]]:
+    """ASYNC_DB を変えて app.main を import し、登録されたルートを登録順に返す"""
+    env = {**os.environ, "DEBUG": "", "ASYNC_DB": async_db}
+    result = subprocess.run(
+        [sys.executable, "-c", _LIST_ROUTES],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return [tuple(route) for route in json.loads(result.stdout)]
+
+
+# ********** 同期版と非同期版のルート **********
+@pytest.mark.parametrize("async_db", ["", "true"])
+def test_bulk_routes_mounted(async_db) -> None:
+    """ASYNC_DB に関わらず、一括で扱うルートが登録されていること."""
+    routes = _routes(async_db)
+
+    assert ("POST", "/lists/{todo_list_id}/items:bulk") in routes
+    assert ("POST", "/lists/{todo_list_id}/items:batchGet") in routes
+
+
+@pytest.mark.parametrize("async_db", ["", "true"])
+def test_export_route_before_item_route(async_db) -> None:
+    """ASYNC_DB に関わらず、エクスポートが '/items/{todo_item_id}' より先に登録されていること ('export' をidとして扱わない)."""
+    routes = _routes(async_db)
+
+    export_route = ("GET", "/lists/{todo_list_id}/items/export")
+    assert export_route in routes
+    assert routes.index(export_route) < routes.index(("GET", "/lists/{todo_list_id}/items/{todo_item_id}"))
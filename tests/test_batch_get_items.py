@@ -0,0 +1,66 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.crud import item_crud
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def _insert_todo_items(db_session, num_of_items: int) -> tuple[int, list[int]]:
+    db_todo_list = list_model.ListModel(title="batch_get_test", description="A test record for batch get.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"batch_get_test_{i}",
+        status_code=1) for i in range(num_of_items)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    return db_todo_list.id, [x.id for x in db_todo_items]
+
+
+def test_batch_get_todo_items(db_session, count_queries) -> None:
+    """指定した順番で項目が返り、見つからないidは missing_ids で返ること."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id, todo_item_ids = _insert_todo_items(db_session, 5)
+    # 別のリストの項目は見つからない扱いになる
+    _, other_todo_item_ids = _insert_todo_items(db_session, 1)
+    count_queries.clear()
+
+    # ******************
+    # テスト実行
+    # ******************
+    ids = [todo_item_ids[3], -1, todo_item_ids[0], other_todo_item_ids[0], todo_item_ids[3]]
+    response = client.post(f"/lists/{todo_list_id}/items:batchGet", json={"ids": ids})
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    response_body = response.json()
+    assert [x["id"] for x in response_body["items"]] == [todo_item_ids[3], todo_item_ids[0]]
+    assert response_body["missing_ids"] == [-1, other_todo_item_ids[0]]
+    assert len(count_queries) == 1
+    assert " IN " in count_queries[0][0]
+
+
+def test_batch_get_todo_items_chunked(db_session, count_queries, monkeypatch) -> None:
+    """idの数がチャンクの大きさを超えると IN (...) を分けて発行すること."""
+    monkeypatch.setattr(item_crud, "BATCH_GET_CHUNK_SIZE", 2)
+    todo_list_id, todo_item_ids = _insert_todo_items(db_session, 5)
+    count_queries.clear()
+
+    response = client.post(f"/lists/{todo_list_id}/items:batchGet", json={"ids": todo_item_ids})
+
+    assert [x["id"] for x in response.json()["items"]] == todo_item_ids
+    assert len(count_queries) == 3
+
+
+def test_batch_get_todo_items_422_validation_error() -> None:
+    """idが空の時は422になること."""
+    response = client.post("/lists/1/items:batchGet", json={"ids": []})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
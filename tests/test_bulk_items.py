@@ -0,0 +1,93 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.crud import item_crud
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def test_post_todo_items_bulk(db_session, count_queries) -> None:
+    """一括作成でチャンクごとに複数行INSERTされ、作成した項目が順番通り返ること."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk insert.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+
+    num_of_items = item_crud.BULK_INSERT_CHUNK_SIZE + 5
+    count_queries.clear()
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.post(f"/lists/{todo_list_id}/items:bulk", json=[
+        {"title": f"bulk_test_{i}", "due_at": "2024-09-08T12:54:53"} for i in range(num_of_items)
+    ])
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+
+    response_body = response.json()
+    assert [x["title"] for x in response_body] == [f"bulk_test_{i}" for i in range(num_of_items)]
+    assert all(x["todo_list_id"] == todo_list_id for x in response_body)
+    assert all(x["due_at"] == "2024-09-08T12:54:53" for x in response_body)
+
+    # 件数カウンターのUPDATE(存在チェックを兼ねる)1回 + INSERT 2回 + 読み直し 1回
+    assert [statement.split()[0] for statement, _ in count_queries] == ["UPDATE", "INSERT", "INSERT", "SELECT"]
+
+    db_session.reset()
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == num_of_items
+
+
+def test_post_todo_items_bulk_503_read_back_mismatch(db_session, monkeypatch) -> None:
+    """読み直した行が作成した項目と違う時は、何も作成せずに503を返すこと."""
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk insert.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+
+    class MismatchedInsert:
+        """INSERTする行のタイトルを変えて、読み直した行とリクエストを食い違わせる."""
+
+        def __init__(self, table) -> None:
+            self.statement = insert(table)
+
+        def values(self, rows):
+            return self.statement.values([{**row, "title": row["title"] + "_other"} for row in rows])
+
+    monkeypatch.setattr(item_crud, "insert", MismatchedInsert)
+
+    response = client.post(f"/lists/{todo_list_id}/items:bulk", json=[{"title": "bulk_test"}] * 3)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "nothing was created" in response.json()["detail"]
+    db_session.reset()
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == 0
+    assert db_session.get(list_model.ListModel, todo_list_id).item_count == 0
+
+
+def test_post_todo_items_bulk_404_list_not_found() -> None:
+    """存在しないTODOリストへの一括作成は404になること."""
+    response = client.post("/lists/-1/items:bulk", json=[{"title": "bulk_test"}])
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_post_todo_items_bulk_422_validation_error(db_session) -> None:
+    """1件でも不正な項目があれば何も作成されないこと."""
+    db_todo_list = list_model.ListModel(title="bulk_test", description="A test record for bulk insert.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+
+    response = client.post(f"/lists/{todo_list_id}/items:bulk", json=[{"title": "bulk_test"}, {"title": ""}])
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    db_session.reset()
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == 0
@@ -0,0 +1,259 @@
+import fnmatch
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import cache
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+class FakeRedis:
+    """RedisCacheのテスト用にRedisの代わりをする最小限のクラス."""
+
+    def __init__(self) -> None:
+        # name -> (有効期限, 値) ハッシュの値は dict
+        self.data = {}
+        self.commands = []
+
+    def _live(self, name):
+        value = self.data.get(name)
+        if value is None or value[0] <= time.monotonic():
+            return None
+        return value[1]
+
+    def get(self, name):
+        self.commands.append("GET")
+        return self._live(name)
+
+    def set(self, name, value, px, nx=False):
+        self.commands.append("SET")
+        if nx and self._live(name) is not None:
+            return None
+        self.data[name] = (time.monotonic() + px / 1000, value)
+        return True
+
+    def delete(self, *names):
+        self.commands.append("DEL")
+        for name in names:
+            self.data.pop(name, None)
+
+    def scan_iter(self, match):
+        self.commands.append("SCAN")
+        return [name for name in self.data if fnmatch.fnmatchcase(name, match)]
+
+    def hget(self, name, key):
+        self.commands.append("HGET")
+        return (self._live(name) or {}).get(key)
+
+    def hset(self, name, key, value):
+        self.commands.append("HSET")
+        if self._live(name) is None:
+            self.data[name] = (float("inf"), {})
+        self.data[name][1][key] = value
+
+    def hdel(self, name, key):
+        self.commands.append("HDEL")
+        (self._live(name) or {}).pop(key, None)
+
+    def pexpire(self, name, px):
+        self.commands.append("PEXPIRE")
+        if name in self.data:
+            self.data[name] = (time.monotonic() + px / 1000, self.data[name][1])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """FakeRedis のコマンドを execute でまとめて実行する."""
+
+    def __init__(self, redis) -> None:
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.calls.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return command
+
+    def execute(self):
+        return [method(*args, **kwargs) for method, args, kwargs in self.calls]
+
+
+class DownRedis:
+    """全てのコマンドが接続エラーになるRedisの代わり."""
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return command
+
+
+@pytest.fixture(params=["memory", "redis"])
+def todo_cache(request, monkeypatch):
+    """キャッシュを有効にする."""
+    if request.param == "memory":
+        backend = cache.LRUCache(max_bytes=1024 * 1024, ttl=60)
+    else:
+        backend = cache.RedisCache(FakeRedis(), ttl=60)
+    monkeypatch.setattr(cache, "todo_cache", backend)
+    return backend
+
+
+def test_lru_cache_max_bytes() -> None:
+    """最大バイト数を超えたら最近使っていないものから追い出されること."""
+    lru = cache.LRUCache(max_bytes=25, ttl=60)
+    lru.set("a", b"x" * 9)
+    lru.set("b", b"x" * 9)
+    assert lru.get("a") is not None  # a を最近使ったことにする
+    lru.set("c", b"x" * 9)
+
+    assert lru.get("b") is None
+    assert lru.get("a") is not None
+    assert lru.get("c") is not None
+    stats = lru.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 25
+
+
+def test_lru_cache_ttl() -> None:
+    """有効期限が切れたものはミスになること."""
+    lru = cache.LRUCache(max_bytes=1024, ttl=0)
+    lru.set("a", b"x")
+
+    assert lru.get("a") is None
+    assert lru.stats()["expirations"] == 1
+
+
+@pytest.mark.parametrize("backend", [cache.LRUCache(max_bytes=1024, ttl=60), cache.RedisCache(FakeRedis(), ttl=60)])
+def test_cache_add(backend) -> None:
+    """add はキーが無いか期限切れの時だけ保存すること."""
+    assert backend.add("a", b"first")
+    assert not backend.add("a", b"second")
+    assert backend.get("a") == b"first"
+
+    backend.set("b", b"expired", ttl=0)
+    assert backend.add("b", b"new")
+    assert backend.get("b") == b"new"
+
+
+@pytest.mark.parametrize("backend", [cache.LRUCache(max_bytes=1024, ttl=60), cache.RedisCache(FakeRedis(), ttl=60)])
+def test_cache_delete_group(backend) -> None:
+    """delete_group でグループのキーだけがまとめて消えること."""
+    backend.set(cache.item_key(1, 1), b"a")
+    backend.set(cache.item_key(1, 2), b"b")
+    backend.set(cache.item_key(11, 1), b"c")
+    backend.set(cache.list_key(1), b"d")
+
+    backend.delete_group(cache.item_group(1))
+
+    assert backend.get(cache.item_key(1, 1)) is None
+    assert backend.get(cache.item_key(1, 2)) is None
+    assert backend.get(cache.item_key(11, 1)) == b"c"
+    assert backend.get(cache.list_key(1)) == b"d"
+
+
+def test_redis_cache_delete_group_does_not_scan() -> None:
+    """Redisではグループの削除がハッシュ1つの削除で済むこと (キー全体をSCANしない)."""
+    redis = FakeRedis()
+    backend = cache.RedisCache(redis, ttl=60)
+    backend.set(cache.item_key(1, 1), b"a")
+    redis.commands.clear()
+
+    backend.delete_group(cache.item_group(1))
+
+    assert redis.commands == ["DEL"]
+
+
+def test_redis_cache_fails_open() -> None:
+    """Redisに繋がらない時はエラーにせず、ミスとして扱うこと."""
+    backend = cache.RedisCache(DownRedis(), ttl=60)
+
+    assert backend.get("a") is None
+    backend.set("a", b"x")
+    backend.set(cache.item_key(1, 1), b"x")
+    backend.delete(cache.item_key(1, 1))
+    backend.delete_group(cache.item_group(1))
+    # 重複を防げない代わりに処理を続ける
+    assert backend.add("a", b"x")
+    stats = backend.stats()
+    assert stats["misses"] == 1
+    assert stats["failures"] == 6
+
+
+def test_get_todo_list_cached(db_session, count_queries, todo_cache) -> None:
+    """2回目以降のGETはDBを読まず、PUTで無効化されること."""
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+
+    first = client.get(f"/lists/{todo_list_id}")
+    count_queries.clear()
+    second = client.get(f"/lists/{todo_list_id}")
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert count_queries == []
+    assert todo_cache.stats()["hits"] == 1
+
+    client.put(f"/lists/{todo_list_id}", json={"title": "updated_cache_test"})
+    response = client.get(f"/lists/{todo_list_id}")
+    assert response.json()["title"] == "updated_cache_test"
+
+
+def test_get_todo_list_stale_cache_schema(db_session, todo_cache) -> None:
+    """今のスキーマに合わないキャッシュの値 (version が無いなど) はミスとして扱い、DBから返すこと."""
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    todo_cache.set(cache.list_key(todo_list_id), b'{"id": %d, "title": "old"}' % todo_list_id)
+
+    response = client.get(f"/lists/{todo_list_id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "cache_test"
+    # DBから読んだ値で上書きされる
+    assert b"version" in todo_cache.get(cache.list_key(todo_list_id))
+
+
+def test_get_todo_list_redis_down(db_session, monkeypatch) -> None:
+    """キャッシュのRedisが止まっていてもDBから返すこと."""
+    monkeypatch.setattr(cache, "todo_cache", cache.RedisCache(DownRedis(), ttl=60))
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+
+    response = client.get(f"/lists/{db_todo_list.id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "cache_test"
+
+
+def test_get_todo_item_cached(db_session, count_queries, todo_cache) -> None:
+    """TODO項目もキャッシュされ、リストの削除で無効化されること."""
+    db_todo_list = list_model.ListModel(title="cache_test", description="A test record for cache.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_todo_item = item_model.ItemModel(todo_list_id=db_todo_list.id, title="cache_test", status_code=1)
+    db_session.add(db_todo_item)
+    db_session.commit()
+    todo_list_id = db_todo_list.id
+    todo_item_id = db_todo_item.id
+
+    client.get(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    count_queries.clear()
+    response = client.get(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert count_queries == []
+
+    client.delete(f"/lists/{todo_list_id}")
+    response = client.get(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
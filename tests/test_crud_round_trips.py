@@ -0,0 +1,98 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+def _insert_todo_item(db_session):
+    db_todo_list = list_model.ListModel(title="round_trip_test", description="A test record for round trips.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+
+    db_todo_item = item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title="round_trip_test",
+        description="A test record for round trips.",
+        status_code=1,
+    )
+    db_session.add(db_todo_item)
+    db_session.commit()
+    return db_todo_list.id, db_todo_item.id
+
+
+def test_put_todo_item_queries(db_session, count_queries) -> None:
+    """PUTはUPDATE文 (完了にした時はリストの件数カウンターも) と読み直しのSELECT文だけになること."""
+    todo_list_id, todo_item_id = _insert_todo_item(db_session)
+    count_queries.clear()
+
+    response = client.put(f"/lists/{todo_list_id}/items/{todo_item_id}", json={"title": "updated", "complete": True})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "updated"
+    assert [statement.split()[0] for statement, _ in count_queries] == ["UPDATE", "UPDATE", "SELECT"]
+
+
+def test_put_todo_item_queries_not_found(db_session, count_queries) -> None:
+    """存在しない項目へのPUTはUPDATE文1回で404を返すこと."""
+    todo_list_id, _ = _insert_todo_item(db_session)
+    count_queries.clear()
+
+    response = client.put(f"/lists/{todo_list_id}/items/-1", json={"title": "updated"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert len(count_queries) == 1
+
+
+def test_delete_todo_item_queries(db_session, count_queries) -> None:
+    """DELETEはSELECTせずにDELETE文とリストの件数カウンターのUPDATE文だけになること."""
+    todo_list_id, todo_item_id = _insert_todo_item(db_session)
+    count_queries.clear()
+
+    response = client.delete(f"/lists/{todo_list_id}/items/{todo_item_id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    # 未完了の項目なので、完了済みとしての DELETE は0件で次の DELETE で消える
+    assert [statement.split()[0] for statement, _ in count_queries] == ["DELETE", "DELETE", "UPDATE"]
+
+
+def test_put_todo_list_queries(db_session, count_queries) -> None:
+    """TODOリストのPUTもUPDATE文と読み直しのSELECT文の2回だけになること."""
+    todo_list_id, _ = _insert_todo_item(db_session)
+    count_queries.clear()
+
+    response = client.put(f"/lists/{todo_list_id}", json={"title": "updated"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [statement.split()[0] for statement, _ in count_queries] == ["UPDATE", "SELECT"]
+
+
+def test_delete_todo_list_queries(db_session, count_queries) -> None:
+    """TODOリストのDELETEは項目を読み込まず、DELETE文1回でDB側のCASCADEが項目も消すこと."""
+    todo_list_id, _ = _insert_todo_item(db_session)
+    db_session.add_all([item_model.ItemModel(todo_list_id=todo_list_id, title=f"cascade_test_{i}", status_code=1) for i in range(100)])
+    db_session.commit()
+    count_queries.clear()
+
+    response = client.delete(f"/lists/{todo_list_id}")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [statement.split()[0] for statement, _ in count_queries] == ["DELETE"]
+    assert "todo_items" not in count_queries[0][0]
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == 0
+
+
+def test_delete_todo_list_orm_is_passive(db_session, count_queries) -> None:
+    """ORMの Session.delete でTODOリストを消しても、項目をSELECTしないこと."""
+    todo_list_id, _ = _insert_todo_item(db_session)
+    db_session.expire_all()
+    todo_list = db_session.get(list_model.ListModel, todo_list_id)
+    count_queries.clear()
+
+    db_session.delete(todo_list)
+    db_session.commit()
+
+    assert [statement.split()[0] for statement, _ in count_queries] == ["DELETE"]
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == 0
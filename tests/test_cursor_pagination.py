@@ -0,0 +1,70 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 15
+
+
+@pytest.mark.parametrize("per_page", [4, 5])
+def test_get_todo_items_cursor(per_page: int, db_session) -> None:
+    """カーソルページネーションで全件を重複・欠落なく取得できること."""
+    # ******************
+    # 事前準備
+    # ******************
+    db_todo_list = list_model.ListModel(title="cursor_test", description="A test record for cursor pagination.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+
+    todo_list_id = db_todo_list.id
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=todo_list_id,
+        title=f"cursor_test_{str(i).zfill(3)}",
+        status_code=1) for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    expected_data_ids = sorted([x.id for x in db_todo_items])
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get(f"/lists/{todo_list_id}/items", params={"per_page": per_page, "page": 1})
+    actual_data_ids = [x["id"] for x in response.json()]
+    next_cursor = response.headers.get("X-Next-Cursor")
+    while next_cursor is not None:
+        response = client.get(f"/lists/{todo_list_id}/items", params={"per_page": per_page, "cursor": next_cursor})
+        assert response.status_code == status.HTTP_200_OK
+        actual_data_ids += [x["id"] for x in response.json()]
+        next_cursor = response.headers.get("X-Next-Cursor")
+
+    # ******************
+    # 実行結果の検証開始
+    # ******************
+    assert actual_data_ids == expected_data_ids
+
+
+def test_get_todo_lists_cursor(db_session) -> None:
+    """カーソルで指定した位置の続きから取得できること."""
+    db_todo_lists = [list_model.ListModel(title=f"cursor_test_{str(i).zfill(3)}") for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    expected_data_ids = sorted([x.id for x in db_todo_lists])
+
+    response = client.get("/lists", params={"per_page": 10, "page": 1})
+    next_cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/lists", params={"per_page": 10, "cursor": next_cursor})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [x["id"] for x in response.json()] == expected_data_ids[10:]
+    # 最後のページなので次のカーソルは返らない
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_todo_lists_invalid_cursor() -> None:
+    """壊れたカーソルは400になること."""
+    response = client.get("/lists", params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
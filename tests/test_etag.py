@@ -0,0 +1,112 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import cache
+from app.const import TodoItemStatusCode
+from app.etag import is_not_modified, versioned_etag
+from app.main import app
+from app.schemas.item_schema import ResponseTodoItem
+
+client = TestClient(app)
+
+
+def _create_todo_item() -> tuple[int, int]:
+    todo_list_id = client.post("/lists", json={"title": "etag_test"}).json()["id"]
+    todo_item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "etag_test"}).json()["id"]
+    return todo_list_id, todo_item_id
+
+
+def test_is_not_modified() -> None:
+    """If-None-Match の複数指定・弱いETag・* を扱えること."""
+    assert is_not_modified('"a", W/"b"', '"b"')
+    assert is_not_modified("*", '"b"')
+    assert not is_not_modified('"a"', '"b"')
+    assert not is_not_modified(None, '"b"')
+
+
+def test_versioned_etag_ignores_value_types() -> None:
+    """ORMのオブジェクト(status_code が int)とキャッシュから戻したスキーマ(Enum)で同じETagになること."""
+    fields = {
+        "id": 5,
+        "todo_list_id": 1,
+        "title": "etag_test",
+        "description": None,
+        "due_at": None,
+        "version": 1,
+        "created_at": datetime(2024, 9, 8, 12, 54, 53),
+        "updated_at": datetime(2024, 9, 8, 12, 54, 53),
+    }
+    db_item = SimpleNamespace(**fields, status_code=1)
+    cached_item = ResponseTodoItem(**fields, status_code=TodoItemStatusCode.NOT_COMPLETED)
+
+    assert versioned_etag(ResponseTodoItem, db_item) == versioned_etag(ResponseTodoItem, cached_item)
+
+
+def test_get_todo_item_etag_same_with_cache(db_session, monkeypatch) -> None:
+    """キャッシュのミスとヒットで同じETagを返し、ヒットでも304になること."""
+    monkeypatch.setattr(cache, "todo_cache", cache.LRUCache(max_bytes=1024 * 1024, ttl=60))
+    todo_list_id, todo_item_id = _create_todo_item()
+
+    missed = client.get(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    hit = client.get(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    assert cache.todo_cache.stats()["hits"] == 1
+    assert hit.content == missed.content
+    assert hit.headers["ETag"] == missed.headers["ETag"]
+
+    response = client.get(f"/lists/{todo_list_id}/items/{todo_item_id}", headers={"If-None-Match": missed.headers["ETag"]})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_get_todo_list_not_modified(db_session) -> None:
+    """同じETagで取得すると304になり、更新後は新しいETagで200になること."""
+    todo_list_id, _ = _create_todo_item()
+    response = client.get(f"/lists/{todo_list_id}")
+    todo_list_etag = response.headers["ETag"]
+
+    response = client.get(f"/lists/{todo_list_id}", headers={"If-None-Match": todo_list_etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == todo_list_etag
+
+    client.put(f"/lists/{todo_list_id}", json={"title": "updated_etag_test"})
+    response = client.get(f"/lists/{todo_list_id}", headers={"If-None-Match": todo_list_etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != todo_list_etag
+
+
+def test_get_todo_item_not_modified(db_session) -> None:
+    """TODO項目も同じETagなら304になること."""
+    todo_list_id, todo_item_id = _create_todo_item()
+    path = f"/lists/{todo_list_id}/items/{todo_item_id}"
+    todo_item_etag = client.get(path).headers["ETag"]
+
+    assert client.get(path, headers={"If-None-Match": todo_item_etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.put(path, json={"complete": True})
+    assert client.get(path, headers={"If-None-Match": todo_item_etag}).status_code == status.HTTP_200_OK
+
+
+def test_get_todo_items_not_modified_without_loading_items(db_session, count_queries) -> None:
+    """項目一覧はバージョンの1回のSELECTだけで304を返し、項目を書き換えると200になること."""
+    todo_list_id, todo_item_id = _create_todo_item()
+    path = f"/lists/{todo_list_id}/items"
+    todo_items_etag = client.get(path, params={"page": 1}).headers["ETag"]
+
+    count_queries.clear()
+    response = client.get(path, params={"page": 1}, headers={"If-None-Match": todo_items_etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert len(count_queries) == 1
+    assert "todo_items" not in count_queries[0][0]
+
+    # クエリパラメーターが違えば別のETagになる
+    response = client.get(path, params={"page": 1, "sort": "due_at"}, headers={"If-None-Match": todo_items_etag})
+    assert response.status_code == status.HTTP_200_OK
+
+    # 件数の変わらない更新でもバージョンが上がる
+    client.put(f"{path}/{todo_item_id}", json={"title": "updated_etag_test"})
+    response = client.get(path, params={"page": 1}, headers={"If-None-Match": todo_items_etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["title"] == "updated_etag_test"
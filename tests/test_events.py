@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import events
+from app.crud import list_crud
+from app.main import app
+
+client = TestClient(app)
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    """text/event-stream の本文から (event, data) のリストを作る (コメント行は飛ばす)."""
+    parsed = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def _wait_for_subscriber(todo_list_id: int) -> None:
+    deadline = time.monotonic() + 5
+    while events.broker.subscriber_count(todo_list_id) == 0:
+        assert time.monotonic() < deadline, "subscriber did not connect"
+        time.sleep(0.01)
+
+
+# ********** ブローカー **********
+def test_broker_delivers_to_subscribers_of_the_list() -> None:
+    """購読しているTODOリストのイベントだけが届くこと."""
+    broker = events.EventBroker(events.LocalBroadcast(), queue_size=10)
+
+    async def run():
+        subscription = broker.subscribe(1)
+        other = broker.subscribe(2)
+        broker.publish(1, "item_deleted", {"id": 10})
+        event = await subscription.get(timeout=1)
+        assert await other.get(timeout=0.01) is None
+        broker.unsubscribe(subscription)
+        broker.unsubscribe(other)
+        return event
+
+    assert asyncio.run(run()) == {"todo_list_id": 1, "type": "item_deleted", "data": {"id": 10}}
+    assert broker.subscriber_count() == 0
+
+
+def test_broker_replaces_overflow_with_resync() -> None:
+    """読むのが遅い購読者のキューが溢れたら、溜まったイベントを捨てて resync を送ること."""
+    broker = events.EventBroker(events.LocalBroadcast(), queue_size=3)
+
+    async def run():
+        subscription = broker.subscribe(1)
+        for i in range(5):
+            broker.publish(1, "item_deleted", {"id": i})
+        # call_soon_threadsafe で入れたものを処理させる
+        await asyncio.sleep(0)
+        received = []
+        while (event := await subscription.get(timeout=0.01)) is not None:
+            received.append((event["type"], event["data"]))
+        return subscription, received
+
+    subscription, received = asyncio.run(run())
+    assert received == [("resync", {}), ("item_deleted", {"id": 4})]
+    assert subscription.dropped == 3
+
+
+def test_broadcast_reaches_other_workers() -> None:
+    """broadcast を共有していれば、別のワーカーで publish したイベントも届くこと."""
+    broadcast = events.LocalBroadcast()
+    worker_a = events.EventBroker(broadcast, queue_size=10)
+    worker_b = events.EventBroker(broadcast, queue_size=10)
+    worker_a.start()
+
+    async def run():
+        subscription = worker_b.subscribe(1)
+        worker_a.publish(1, "item_deleted", {"id": 10})
+        return await subscription.get(timeout=1)
+
+    assert asyncio.run(run())["data"] == {"id": 10}
+    worker_b.stop()
+    worker_a.stop()
+
+
+class DownBroadcast:
+    """publish が必ず失敗し、呼ばれたスレッドを記録する broadcast."""
+
+    blocking = True
+
+    def __init__(self) -> None:
+        self.threads = []
+
+    def start(self, handler) -> None:
+        pass
+
+    def stop(self, handler) -> None:
+        pass
+
+    def publish(self, message: str) -> None:
+        self.threads.append(threading.get_ident())
+        raise ConnectionError("redis is down")
+
+
+def test_publish_failure_is_not_raised(monkeypatch) -> None:
+    """broadcast に送れなくても publish は例外にならないこと (commit 済みの書き込みを失敗させない)."""
+    broadcast = DownBroadcast()
+    monkeypatch.setattr(events, "broker", events.EventBroker(broadcast, queue_size=10))
+
+    events.publish(1, "item_deleted", {"id": 10})
+
+    assert len(broadcast.threads) == 1
+
+
+def test_publish_async_runs_blocking_broadcast_in_thread(monkeypatch) -> None:
+    """I/Oで待つ broadcast は、非同期のCRUDからはイベントループ以外のスレッドで呼ばれること."""
+    broadcast = DownBroadcast()
+    monkeypatch.setattr(events, "broker", events.EventBroker(broadcast, queue_size=10))
+
+    async def run():
+        await events.publish_async(1, "item_deleted", {"id": 10})
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert len(broadcast.threads) == 1
+    assert broadcast.threads[0] != loop_thread
+
+
+# ********** SSE **********
+def test_todo_list_events(db_session) -> None:
+    """TODOリストとTODO項目の書き込みがSSEで届き、TODOリストの削除でストリームが閉じること."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id = client.post("/lists", json={"title": "events_test"}).json()["id"]
+    result = {}
+    # ストリームはTODOリストが削除されるまで終わらないので、別スレッドで読む
+    reader = threading.Thread(target=lambda: result.setdefault("response", TestClient(app).get(f"/lists/{todo_list_id}/events")))
+    reader.start()
+    _wait_for_subscriber(todo_list_id)
+
+    # ******************
+    # テスト実行
+    # ******************
+    todo_item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "events_test"}).json()["id"]
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_id}", json={"complete": True})
+    bulk_ids = [todo_item["id"] for todo_item in client.post(f"/lists/{todo_list_id}/items:bulk", json=[{"title": "bulk"}] * 2).json()]
+    client.delete(f"/lists/{todo_list_id}/items/{todo_item_id}")
+    client.put(f"/lists/{todo_list_id}", json={"title": "events_test_updated"})
+    client.delete(f"/lists/{todo_list_id}")
+    reader.join(timeout=10)
+
+    # ******************
+    # 検証
+    # ******************
+    response = result["response"]
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    received = _parse_sse(response.text)
+    assert [event_type for event_type, _ in received] == [
+        "item_created", "item_updated", "items_created", "item_deleted", "list_updated", "list_deleted",
+    ]
+    assert received[0][1]["id"] == todo_item_id
+    assert received[1][1]["status_code"] == 2
+    assert received[2][1] == {"ids": bulk_ids}
+    assert received[4][1]["title"] == "events_test_updated"
+    assert events.broker.subscriber_count(todo_list_id) == 0
+
+
+def test_todo_list_events_list_deleted_before_stream(db_session, monkeypatch) -> None:
+    """存在チェックの直後 (ストリームを始める前) に削除されても list_deleted が届き、ストリームが閉じること."""
+    todo_list_id = client.post("/lists", json={"title": "events_test"}).json()["id"]
+
+    get_todo_list = list_crud.get_todo_list
+
+    def get_then_delete(db, todo_list_id):
+        todo_list = get_todo_list(db=db, todo_list_id=todo_list_id)
+        list_crud.delete_todo_list(db=db, todo_list_id=todo_list_id)
+        return todo_list
+
+    monkeypatch.setattr(list_crud, "get_todo_list", get_then_delete)
+    result = {}
+    reader = threading.Thread(target=lambda: result.setdefault("response", TestClient(app).get(f"/lists/{todo_list_id}/events")))
+    reader.start()
+    reader.join(timeout=10)
+
+    assert not reader.is_alive(), "stream did not close after list_deleted"
+    response = result["response"]
+    assert response.status_code == status.HTTP_200_OK
+    assert [event_type for event_type, _ in _parse_sse(response.text)] == ["list_deleted"]
+    assert events.broker.subscriber_count(todo_list_id) == 0
+
+
+def test_todo_list_events_not_found(db_session) -> None:
+    """存在しないTODOリストのイベントは404を返すこと."""
+    response = client.get("/lists/999999/events")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    # 先に購読していても、404の時は購読をやめている
+    assert events.broker.subscriber_count(999999) == 0
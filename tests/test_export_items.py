@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.crud import item_crud
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+NUM_OF_RECORDS = 25
+
+
+def _insert_todo_items(db_session) -> tuple[int, list[int]]:
+    db_todo_list = list_model.ListModel(title="export_test", description="A test record for export.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"export_test_{i}",
+        status_code=1) for i in range(NUM_OF_RECORDS)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    return db_todo_list.id, sorted(x.id for x in db_todo_items)
+
+
+def test_export_todo_items_ndjson(db_session) -> None:
+    """全てのTODO項目が1行1件のJSONで返ること."""
+    todo_list_id, expected_data_ids = _insert_todo_items(db_session)
+
+    response = client.get(f"/lists/{todo_list_id}/items/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == expected_data_ids
+    assert rows[0]["title"] == "export_test_0"
+
+
+def test_export_todo_items_csv(db_session) -> None:
+    """CSVでもエクスポートできること."""
+    todo_list_id, expected_data_ids = _insert_todo_items(db_session)
+
+    response = client.get(f"/lists/{todo_list_id}/items/export", params={"format": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == expected_data_ids
+
+
+def test_iter_todo_items_chunks(db_session) -> None:
+    """指定した件数ずつに分けて読み込まれること."""
+    todo_list_id, expected_data_ids = _insert_todo_items(db_session)
+
+    chunks = list(item_crud.iter_todo_items(db_session, todo_list_id=todo_list_id, chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert [x.id for chunk in chunks for x in chunk] == expected_data_ids
+
+
+def test_export_todo_items_404_list_not_found() -> None:
+    """存在しないTODOリストは404になること."""
+    response = client.get("/lists/-1/items/export")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,45 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import const
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def todo_list_id(db_session):
+    db_todo_list = list_model.ListModel(title="fast_json_テスト", description="A test record for fast JSON.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_session.add_all([item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"fast_json_test_{i}",
+        description="説明" if i % 2 else None,
+        status_code=1 + i % 2,
+        due_at="2024-09-08 12:54:53") for i in range(5)])
+    db_session.commit()
+    return db_todo_list.id
+
+
+def test_fast_json_response_is_byte_compatible(todo_list_id, db_session, monkeypatch) -> None:
+    """FAST_JSON_RESPONSE の有無でレスポンスがバイト単位で同じになること."""
+    todo_item_id = db_session.query(item_model.ItemModel.id).filter_by(todo_list_id=todo_list_id).first().id
+    paths = [
+        f"/lists/{todo_list_id}",
+        f"/lists/{todo_list_id}/items/{todo_item_id}",
+        f"/lists/{todo_list_id}/items?page=1&per_page=3",
+    ]
+
+    monkeypatch.setattr(const, "FAST_JSON_RESPONSE", False)
+    expected = [client.get(path) for path in paths]
+    monkeypatch.setattr(const, "FAST_JSON_RESPONSE", True)
+    actual = [client.get(path) for path in paths]
+
+    for expected_response, actual_response in zip(expected, actual, strict=True):
+        assert actual_response.status_code == status.HTTP_200_OK
+        assert actual_response.content == expected_response.content
+        assert actual_response.headers["content-type"] == expected_response.headers["content-type"]
+        assert actual_response.headers.get("X-Next-Cursor") == expected_response.headers.get("X-Next-Cursor")
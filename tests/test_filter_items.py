@@ -0,0 +1,82 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.const import TodoItemStatusCode
+from app.main import app
+from app.models import item_model, list_model
+
+client = TestClient(app)
+
+# (期限, ステータス)
+RECORDS = [
+    ("2024-01-03 00:00:00", TodoItemStatusCode.NOT_COMPLETED),
+    (None, TodoItemStatusCode.COMPLETED),
+    ("2024-01-01 00:00:00", TodoItemStatusCode.NOT_COMPLETED),
+    ("2024-01-02 00:00:00", TodoItemStatusCode.COMPLETED),
+    (None, TodoItemStatusCode.NOT_COMPLETED),
+    ("2024-01-02 00:00:00", TodoItemStatusCode.NOT_COMPLETED),
+    ("2024-01-05 00:00:00", TodoItemStatusCode.COMPLETED),
+]
+
+
+@pytest.fixture()
+def todo_items(db_session):
+    db_todo_list = list_model.ListModel(title="filter_test", description="A test record for filters.")
+    db_session.add(db_todo_list)
+    db_session.commit()
+    db_todo_items = [item_model.ItemModel(
+        todo_list_id=db_todo_list.id,
+        title=f"filter_test_{i}",
+        due_at=due_at,
+        status_code=status_code.value) for i, (due_at, status_code) in enumerate(RECORDS)]
+    db_session.add_all(db_todo_items)
+    db_session.commit()
+    return db_todo_list.id, [x.id for x in db_todo_items]
+
+
+def _get_ids(todo_list_id: int, **params) -> list[int]:
+    response = client.get(f"/lists/{todo_list_id}/items", params={"page": 1, "per_page": 50, **params})
+    assert response.status_code == status.HTTP_200_OK
+    return [x["id"] for x in response.json()]
+
+
+def test_filter_by_status(todo_items) -> None:
+    """ステータスで絞り込めること."""
+    todo_list_id, ids = todo_items
+    assert _get_ids(todo_list_id, status="completed") == [ids[1], ids[3], ids[6]]
+    assert _get_ids(todo_list_id, status="not_completed") == [ids[0], ids[2], ids[4], ids[5]]
+
+
+def test_filter_by_due(todo_items) -> None:
+    """期限の範囲 (due_after以上、due_before未満) で絞り込めること."""
+    todo_list_id, ids = todo_items
+    assert _get_ids(todo_list_id, due_after="2024-01-02T00:00:00", due_before="2024-01-05T00:00:00") == [ids[0], ids[3], ids[5]]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_sort_by_due_at_with_cursor(order: str, todo_items) -> None:
+    """期限で並び替えてもカーソルで重複・欠落なく取得できること (期限なしは昇順で先頭、降順で末尾)."""
+    todo_list_id, ids = todo_items
+    expected = [ids[1], ids[4], ids[2], ids[3], ids[5], ids[0], ids[6]]
+    if order == "desc":
+        expected.reverse()
+    assert _get_ids(todo_list_id, sort="due_at", order=order) == expected
+
+    params = {"per_page": 2, "sort": "due_at", "order": order}
+    response = client.get(f"/lists/{todo_list_id}/items", params={"page": 1, **params})
+    actual = [x["id"] for x in response.json()]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get(f"/lists/{todo_list_id}/items", params={"cursor": response.headers["X-Next-Cursor"], **params})
+        actual += [x["id"] for x in response.json()]
+    assert actual == expected
+
+
+def test_cursor_sort_mismatch(todo_items) -> None:
+    """カーソルと違う並び順を指定すると400になること."""
+    todo_list_id, _ = todo_items
+    response = client.get(f"/lists/{todo_list_id}/items", params={"page": 1, "per_page": 2, "sort": "due_at"})
+
+    response = client.get(f"/lists/{todo_list_id}/items", params={"cursor": response.headers["X-Next-Cursor"]})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
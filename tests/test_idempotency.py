@@ -0,0 +1,100 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import cache, idempotency
+from app.main import app
+from app.models import item_model, list_model
+from app.schemas.list_schema import NewTodoList
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def idempotency_store(monkeypatch):
+    """テストごとに空の保存先を使う."""
+    store = cache.LRUCache(max_bytes=1024 * 1024, ttl=60)
+    monkeypatch.setattr(cache, "idempotency_store", store)
+    return store
+
+
+def test_post_todo_list_replayed(db_session, count_queries) -> None:
+    """同じ Idempotency-Key で再送しても1件しか作らず、再送にはDBを使わずに同じレスポンスを返すこと."""
+    # ******************
+    # 事前準備
+    # ******************
+    headers = {"Idempotency-Key": "post-list-1"}
+    first = client.post("/lists", json={"title": "idempotency_test"}, headers=headers)
+
+    # ******************
+    # テスト実行
+    # ******************
+    count_queries.clear()
+    second = client.post("/lists", json={"title": "idempotency_test"}, headers=headers)
+
+    # ******************
+    # 検証
+    # ******************
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert second.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert idempotency.REPLAYED_HEADER not in first.headers
+    assert count_queries == []
+    assert db_session.query(list_model.ListModel).filter_by(title="idempotency_test").count() == 1
+
+
+def test_post_todo_item_replayed(db_session) -> None:
+    """TODO項目の作成も再送で二重に作らず、件数カウンターも1回しか増えないこと."""
+    todo_list_id = client.post("/lists", json={"title": "idempotency_test"}).json()["id"]
+    headers = {"Idempotency-Key": "post-item-1"}
+
+    first = client.post(f"/lists/{todo_list_id}/items", json={"title": "idempotency_test"}, headers=headers)
+    second = client.post(f"/lists/{todo_list_id}/items", json={"title": "idempotency_test"}, headers=headers)
+
+    assert second.json()["id"] == first.json()["id"]
+    assert db_session.query(item_model.ItemModel).filter_by(todo_list_id=todo_list_id).count() == 1
+    assert client.get(f"/lists/{todo_list_id}").json()["item_count"] == 1
+
+
+def test_key_is_scoped_by_route_and_body(db_session) -> None:
+    """同じキーでもBodyやルートが違えば別のリクエストとして処理すること."""
+    headers = {"Idempotency-Key": "shared-key"}
+    first = client.post("/lists", json={"title": "idempotency_test"}, headers=headers).json()
+    other_body = client.post("/lists", json={"title": "idempotency_test_other"}, headers=headers).json()
+    other_route = client.post(f"/lists/{first['id']}/items", json={"title": "idempotency_test"}, headers=headers).json()
+
+    assert other_body["id"] != first["id"]
+    assert other_route["todo_list_id"] == first["id"]
+
+
+def test_without_key_creates_duplicates(db_session) -> None:
+    """Idempotency-Key が無ければ今まで通り毎回作ること."""
+    first = client.post("/lists", json={"title": "idempotency_test"}).json()
+    second = client.post("/lists", json={"title": "idempotency_test"}).json()
+
+    assert second["id"] != first["id"]
+
+
+def test_in_flight_request_conflicts(db_session, idempotency_store) -> None:
+    """同じキーのリクエストを処理中なら409を返すこと."""
+    body = NewTodoList(title="idempotency_test")
+    idempotent = idempotency.IdempotentRequest("in-flight", "POST /lists", body)
+    assert idempotent.replay() is None  # 処理中の印を付ける
+
+    response = client.post("/lists", json={"title": "idempotency_test"}, headers={"Idempotency-Key": "in-flight"})
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_failed_request_can_be_retried(db_session) -> None:
+    """失敗したリクエストは保存せず、同じキーで再送すれば処理し直すこと."""
+    headers = {"Idempotency-Key": "retry-after-404"}
+    todo_list_id = client.post("/lists", json={"title": "idempotency_test"}).json()["id"]
+    client.delete(f"/lists/{todo_list_id}")
+
+    response = client.post(f"/lists/{todo_list_id}/items", json={"title": "idempotency_test"}, headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    # 処理中の印が残っていれば409になる
+    response = client.post(f"/lists/{todo_list_id}/items", json={"title": "idempotency_test"}, headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
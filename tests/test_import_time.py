@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+# import app.main にかかってよい時間 (ミリ秒). 遅いマシンでは環境変数で変えられる
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1000"))
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """python -X importtime の結果から、モジュールごとの累計の import 時間(マイクロ秒)を返す"""
+    env = {**os.environ, "DEBUG": "", "ASYNC_DB": ""}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    times = {}
+    # 出力の形式: "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+# ********** import時間 **********
+def test_import_time_budget() -> None:
+    """app.main の import が予算内に収まること."""
+    times = _import_times("app.main")
+
+    assert times["app.main"] / 1000 < IMPORT_TIME_BUDGET_MS
+
+
+def test_lazy_imports() -> None:
+    """DEBUG でなければデバッグツールバーを、エンジンを作るまではDBドライバーを import しないこと."""
+    times = _import_times("app.main")
+
+    assert "debug_toolbar" not in times
+    assert "pymysql" not in times
+    assert "aiomysql" not in times
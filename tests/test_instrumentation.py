@@ -0,0 +1,41 @@
+import logging
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.instrumentation import QueryStatsMiddleware
+from app.main import app
+from app.models import list_model
+
+client = TestClient(app)
+
+
+# SAVEPOINT の分まで数えないよう、トランザクションを張らずに実行する
+@pytest.mark.truncate_db
+def test_server_timing_header(db_session) -> None:
+    """SQLの発行回数が Server-Timing ヘッダーで返ること."""
+    db_todo_list = list_model.ListModel(title="instrumentation_test")
+    db_session.add(db_todo_list)
+    db_session.commit()
+
+    response = client.put(f"/lists/{db_todo_list.id}", json={"title": "updated_instrumentation_test"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+
+def test_slow_request_log(caplog) -> None:
+    """しきい値を超えたリクエストがログに出ること."""
+    slow_app = FastAPI()
+    slow_app.add_middleware(QueryStatsMiddleware, slow_request_ms=0)
+
+    @slow_app.get("/slow")
+    def get_slow():
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        response = TestClient(slow_app).get("/slow")
+
+    assert response.headers["Server-Timing"].startswith('db;dur=0.0;desc="0 queries"')
+    assert "slow request: GET /slow" in caplog.text
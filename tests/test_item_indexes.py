@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from app import cache
+from app.const import TodoItemStatusCode
+from app.crud import item_crud, stats_crud
+from app.models import item_model, list_model
+
+NUM_OF_RECORDS = 30
+
+
+@pytest.fixture()
+def todo_list_id(db_session):
+    """インデックスが選ばれやすいように2つのTODOリストに項目を入れておく."""
+    db_todo_lists = [list_model.ListModel(title=f"index_test_{i}") for i in range(2)]
+    db_session.add_all(db_todo_lists)
+    db_session.commit()
+    db_session.add_all([
+        item_model.ItemModel(todo_list_id=db_todo_list.id, title=f"index_test_{i}", status_code=1 + i % 2)
+        for db_todo_list in db_todo_lists
+        for i in range(NUM_OF_RECORDS)
+    ])
+    db_session.commit()
+    return db_todo_lists[0].id
+
+
+def _explain(db_session, count_queries):
+    """記録したSELECT文をEXPLAINして、todo_itemsに使われたインデックスを返す."""
+    statement, parameters = next((s, p) for s, p in count_queries if s.lstrip().startswith("SELECT"))
+    rows = db_session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+    return next(row for row in rows if row["table"] == "todo_items")
+
+
+def test_get_todo_items_uses_index(db_session, count_queries, todo_list_id) -> None:
+    """オフセットページネーションが (todo_list_id, id) のインデックスを使い、並び替えが発生しないこと."""
+    count_queries.clear()
+    item_crud.get_todo_items(db_session, todo_list_id=todo_list_id, offset=10, limit=10)
+
+    row = _explain(db_session, count_queries)
+    assert row["key"] == "ix_todo_items_todo_list_id_id"
+    assert "filesort" not in (row["Extra"] or "")
+
+
+def test_get_todo_items_after_uses_index(db_session, count_queries, todo_list_id) -> None:
+    """カーソルページネーションが (todo_list_id, id) の範囲検索になること."""
+    count_queries.clear()
+    item_crud.get_todo_items_after(db_session, todo_list_id=todo_list_id, after_id=0, limit=10)
+
+    row = _explain(db_session, count_queries)
+    assert row["key"] == "ix_todo_items_todo_list_id_id"
+    assert row["type"] == "range"
+    assert "filesort" not in (row["Extra"] or "")
+
+
+def test_get_todo_item_uses_primary_key(db_session, count_queries, todo_list_id) -> None:
+    """1件取得は主キーで引けること."""
+    todo_item_id = db_session.query(item_model.ItemModel.id).filter_by(todo_list_id=todo_list_id).first().id
+    count_queries.clear()
+    item_crud.get_todo_item(db_session, todo_list_id=todo_list_id, todo_item_id=todo_item_id)
+
+    row = _explain(db_session, count_queries)
+    assert row["key"] == "PRIMARY"
+
+
+def test_filter_by_status_and_due_uses_index(db_session, count_queries, todo_list_id) -> None:
+    """ステータスと期限の絞り込みが (todo_list_id, status_code, due_at) のインデックスを使うこと."""
+    count_queries.clear()
+    item_crud.get_todo_items(
+        db_session,
+        todo_list_id=todo_list_id,
+        offset=0,
+        limit=10,
+        status=TodoItemStatusCode.NOT_COMPLETED,
+        due_before=datetime(2024, 1, 1),
+        sort="due_at",
+    )
+
+    row = _explain(db_session, count_queries)
+    assert row["key"] == "ix_todo_items_todo_list_id_status_code_due_at"
+    assert "filesort" not in (row["Extra"] or "")
+
+
+def test_stats_use_index(db_session, count_queries, todo_list_id, monkeypatch) -> None:
+    """集計のSELECTがどれもインデックスだけで数えられること."""
+    monkeypatch.setattr(cache, "stats_cache", cache.NullCache())
+    count_queries.clear()
+    stats_crud.get_todo_list_stats(db_session, todo_list_id=todo_list_id, days=30)
+
+    item_statements = [(s, p) for s, p in count_queries if "todo_items" in s]
+    assert len(item_statements) == 3
+    for statement, parameters in item_statements:
+        rows = db_session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        row = next(row for row in rows if row["table"] == "todo_items")
+        assert row["key"].startswith("ix_todo_items_todo_list_id_")
+        # テーブルの行を読まずにインデックスだけで済んでいる
+        assert "Using index" in (row["Extra"] or "")
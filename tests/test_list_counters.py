@@ -0,0 +1,79 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.crud import list_crud
+from app.main import app
+
+client = TestClient(app)
+
+
+def _get_counters(todo_list_id: int) -> tuple[int, int]:
+    response_body = client.get(f"/lists/{todo_list_id}").json()
+    return response_body["item_count"], response_body["completed_count"]
+
+
+def test_counters_follow_item_writes(db_session) -> None:
+    """TODO項目の作成・完了の切り替え・削除に合わせて件数カウンターが更新されること."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id = client.post("/lists", json={"title": "counter_test"}).json()["id"]
+    assert _get_counters(todo_list_id) == (0, 0)
+
+    # ******************
+    # テスト実行・検証
+    # ******************
+    todo_item_ids = [
+        client.post(f"/lists/{todo_list_id}/items", json={"title": f"counter_test_{i}"}).json()["id"]
+        for i in range(3)
+    ]
+    assert _get_counters(todo_list_id) == (3, 0)
+
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_ids[0]}", json={"complete": True})
+    # 同じ切り替えを繰り返してもカウンターは1回しか動かない
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_ids[0]}", json={"complete": True})
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_ids[1]}", json={"complete": True})
+    assert _get_counters(todo_list_id) == (3, 2)
+
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_ids[1]}", json={"complete": False})
+    assert _get_counters(todo_list_id) == (3, 1)
+
+    client.delete(f"/lists/{todo_list_id}/items/{todo_item_ids[0]}")
+    assert _get_counters(todo_list_id) == (2, 0)
+
+    client.post(f"/lists/{todo_list_id}/items:bulk", json=[{"title": "bulk"}] * 5)
+    assert _get_counters(todo_list_id) == (7, 0)
+
+
+def test_counters_do_not_touch_updated_at(db_session) -> None:
+    """カウンターの更新ではTODOリストの updated_at が変わらないこと."""
+    response_body = client.post("/lists", json={"title": "counter_test"}).json()
+    todo_list_id = response_body["id"]
+    db_session.execute(text("UPDATE todo_lists SET updated_at = '2000-01-01 00:00:00' WHERE id = :id"), {"id": todo_list_id})
+    db_session.commit()
+
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "counter_test"})
+
+    assert client.get(f"/lists/{todo_list_id}").json()["updated_at"] == "2000-01-01T00:00:00"
+
+
+def test_post_todo_item_to_missing_list(db_session) -> None:
+    """存在しないTODOリストへの項目作成は404になること."""
+    response = client.post("/lists/-1/items", json={"title": "counter_test"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_repair_counters(db_session) -> None:
+    """ずれたカウンターを検出し、集計し直して直せること."""
+    todo_list_id = client.post("/lists", json={"title": "counter_test"}).json()["id"]
+    todo_item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "counter_test"}).json()["id"]
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_id}", json={"complete": True})
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "counter_test"})
+    db_session.execute(text("UPDATE todo_lists SET item_count = 10, completed_count = 0 WHERE id = :id"), {"id": todo_list_id})
+    db_session.commit()
+
+    assert [tuple(row) for row in list_crud.find_counter_drift(db_session)] == [(todo_list_id, 10, 2, 0, 1)]
+    assert list_crud.repair_counters(db_session) == 1
+    assert list_crud.find_counter_drift(db_session) == []
+    assert _get_counters(todo_list_id) == (2, 1)
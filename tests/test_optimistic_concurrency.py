@@ -0,0 +1,118 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.crud import VersionConflictError, item_crud
+from app.etag import if_match_versions
+from app.main import app
+from app.schemas.item_schema import UpdateTodoItem
+
+client = TestClient(app)
+
+
+def _create_todo_item() -> tuple[int, int]:
+    todo_list_id = client.post("/lists", json={"title": "version_test"}).json()["id"]
+    todo_item_id = client.post(f"/lists/{todo_list_id}/items", json={"title": "version_test"}).json()["id"]
+    return todo_list_id, todo_item_id
+
+
+def test_if_match_versions() -> None:
+    """If-Match から同じリソースの強いETagの version だけを取り出すこと."""
+    assert if_match_versions(None, 1) is None
+    assert if_match_versions("*", 1) is None
+    assert if_match_versions('"1-3-abc", "1-4-def"', 1) == [3, 4]
+    # 他のリソースのETag・弱いETag・形式の違うETagは一致しない
+    assert if_match_versions('"2-3-abc"', 1) == []
+    assert if_match_versions('W/"1-3-abc"', 1) == []
+    assert if_match_versions('"abc"', 1) == []
+
+
+@pytest.mark.parametrize("path_format", ["/lists/{todo_list_id}", "/lists/{todo_list_id}/items/{todo_item_id}"])
+def test_put_with_if_match(db_session, path_format) -> None:
+    """取得時のETagを If-Match に付けたPUTは、その後に更新されていなければ成功し、更新されていれば412になること."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id, todo_item_id = _create_todo_item()
+    path = path_format.format(todo_list_id=todo_list_id, todo_item_id=todo_item_id)
+    response = client.get(path)
+    assert response.json()["version"] == 1
+    first_etag = response.headers["ETag"]
+
+    # ******************
+    # テスト実行・検証
+    # ******************
+    # 1人目の更新は成功し、version が上がる
+    response = client.put(path, json={"title": "first_editor"}, headers={"If-Match": first_etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["version"] == 2
+    second_etag = response.headers["ETag"]
+    assert second_etag == client.get(path).headers["ETag"]
+
+    # 同じETagを持っていた2人目の更新は412になり、上書きしない
+    response = client.put(path, json={"title": "second_editor"}, headers={"If-Match": first_etag})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert client.get(path).json()["title"] == "first_editor"
+
+    # 取り直したETagなら更新できる
+    response = client.put(path, json={"title": "second_editor"}, headers={"If-Match": second_etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["version"] == 3
+
+    # If-Match が無ければ今まで通り後勝ち
+    response = client.put(path, json={"title": "last_write_wins"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["version"] == 4
+
+
+def test_put_without_changes_checks_if_match(db_session) -> None:
+    """更新する項目が無いPUTも、ETagが古ければ412になること."""
+    todo_list_id, _ = _create_todo_item()
+    path = f"/lists/{todo_list_id}"
+    old_etag = client.get(path).headers["ETag"]
+    client.put(path, json={"title": "updated"})
+
+    assert client.put(path, json={}, headers={"If-Match": old_etag}).status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+def test_put_missing_with_if_match(db_session) -> None:
+    """存在しないリソースは If-Match があっても404になること."""
+    todo_list_id, todo_item_id = _create_todo_item()
+    headers = {"If-Match": f'"{todo_item_id + 1}-1-abc"'}
+
+    response = client.put(f"/lists/{todo_list_id}/items/{todo_item_id + 1}", json={"title": "missing"}, headers=headers)
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_counters_do_not_change_list_version(db_session) -> None:
+    """TODO項目の追加で件数カウンターが変わっても、TODOリストの version は上がらないこと."""
+    todo_list_id, _ = _create_todo_item()
+    todo_list_etag = client.get(f"/lists/{todo_list_id}").headers["ETag"]
+
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "version_test"})
+
+    # 本文が変わったのでETagは変わるが、If-Match はそのまま通る
+    assert client.get(f"/lists/{todo_list_id}").headers["ETag"] != todo_list_etag
+    response = client.put(f"/lists/{todo_list_id}", json={"title": "updated"}, headers={"If-Match": todo_list_etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_conflict_uses_single_update(db_session, count_queries) -> None:
+    """version の比較と更新を1文のUPDATEで行い、事前にSELECTしないこと."""
+    todo_list_id, todo_item_id = _create_todo_item()
+
+    count_queries.clear()
+    item_crud.update_todo_item(
+        db_session, todo_list_id=todo_list_id, todo_item_id=todo_item_id,
+        update_todo_item=UpdateTodoItem(title="cas"), expected_versions=[1],
+    )
+    # 項目のUPDATE、カウンターのUPDATE、レスポンス用の読み直し
+    assert [statement.split()[0] for statement, _ in count_queries] == ["UPDATE", "UPDATE", "SELECT"]
+    assert "todo_items.version IN" in count_queries[0][0]
+
+    with pytest.raises(VersionConflictError):
+        item_crud.update_todo_item(
+            db_session, todo_list_id=todo_list_id, todo_item_id=todo_item_id,
+            update_todo_item=UpdateTodoItem(title="cas"), expected_versions=[1],
+        )
@@ -0,0 +1,35 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.pool_metrics import WaitTimeHistogram
+
+client = TestClient(app)
+
+
+def test_wait_time_histogram() -> None:
+    """待ち時間が累積ヒストグラムとして集計されること."""
+    histogram = WaitTimeHistogram()
+    histogram.observe(0.0005)
+    histogram.observe(0.02)
+    histogram.observe(10)
+    histogram.observe_timeout()
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 3
+    assert snapshot["timeouts"] == 1
+    assert snapshot["buckets"]["0.001"] == 1
+    assert snapshot["buckets"]["0.05"] == 2
+    assert snapshot["buckets"]["5.0"] == 2
+    assert snapshot["buckets"]["+Inf"] == 3
+
+
+def test_get_pool_health() -> None:
+    """プールの状態が取得できること."""
+    response = client.get("/health/pool")
+    assert response.status_code == status.HTTP_200_OK
+
+    pool = response.json()["sync"]
+    assert pool["pool_class"] == "MeteredQueuePool"
+    for key in ("size", "checked_in", "checked_out", "overflow", "wait_time"):
+        assert key in pool
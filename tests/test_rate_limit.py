@@ -0,0 +1,214 @@
+import asyncio
+import time
+
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app import rate_limit
+
+
+class FakeClock:
+    """手で進める時計."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeAsyncRedis:
+    """RedisStoreが使う incr/pexpire だけを持つ、プロセス内の代わり."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, int] = {}
+        self.expires: dict[str, int] = {}
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    async def pexpire(self, key, ms):
+        self.expires[key] = ms
+
+
+def _make_client(store, rate=1.0, burst=2, routes=None, client=("testclient", 50000), trusted_proxies=None) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/lists/{todo_list_id}")
+    def get_list(todo_list_id: int):
+        return {"id": todo_list_id}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    app.add_middleware(rate_limit.RateLimitMiddleware, rate=rate, burst=burst, routes=routes, store=store)
+    # python -m app.server と同じく、uvicorn の ProxyHeadersMiddleware を通す
+    inner = app if trusted_proxies is None else ProxyHeadersMiddleware(app, trusted_hosts=trusted_proxies)
+
+    async def app_with_client(scope, receive, send):
+        # 接続元のアドレスを変える
+        await inner({**scope, "client": client}, receive, send)
+
+    return TestClient(app_with_client)
+
+
+def _acquire(store, key, rate=1.0, burst=2) -> float:
+    return asyncio.run(store.acquire(key, rate, burst))
+
+
+# ********** ルートとクライアント **********
+def test_route_of_normalizes_ids() -> None:
+    """パスの数字を {id} にまとめ、メソッドでルートを分けること."""
+    assert rate_limit.route_of("GET", "/lists/1/items/22") == "GET /lists/{id}/items/{id}"
+    assert rate_limit.route_of("POST", "/lists/1/items:bulk") == "POST /lists/{id}/items:bulk"
+    assert rate_limit.route_of("GET", "/lists/v2") == "GET /lists/v2"
+
+
+def test_parse_routes() -> None:
+    """RATE_LIMIT_ROUTES の形式を (rate, burst) に読むこと."""
+    assert rate_limit.parse_routes("") == {}
+    assert rate_limit.parse_routes("GET /lists=5:10; POST /lists/{id}/items=0.5:2") == {
+        "GET /lists": (5.0, 10),
+        "POST /lists/{id}/items": (0.5, 2),
+    }
+
+
+# ********** プロセス内のトークンバケット **********
+def test_memory_store_refills_tokens() -> None:
+    """burst回まで続けて使え、rateの速さで補充されること."""
+    clock = FakeClock()
+    store = rate_limit.MemoryStore(clock=clock)
+    key = ("1.2.3.4", "GET /lists")
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) == 1.0
+
+    clock.now += 0.5
+    assert _acquire(store, key) == 0.5
+    clock.now += 0.5
+    assert _acquire(store, key) == 0
+
+    # 長く使わなくても burst を超えて貯まらない
+    clock.now += 100
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) > 0
+
+
+def test_memory_store_evicts_least_recently_used() -> None:
+    """max_keysに達したら、最近使っていないバケットを1つだけ追い出すこと."""
+    clock = FakeClock()
+    store = rate_limit.MemoryStore(max_keys=2, clock=clock)
+    _acquire(store, ("a", "GET /lists"))
+    _acquire(store, ("b", "GET /lists"))
+    _acquire(store, ("a", "GET /lists"))
+    _acquire(store, ("c", "GET /lists"))
+
+    assert list(store._buckets) == [("a", "GET /lists"), ("c", "GET /lists")]
+    # 追い出されなかったバケットは使った分が残っている
+    assert _acquire(store, ("a", "GET /lists")) > 0
+
+
+# ********** 共有のバックエンド **********
+def test_redis_store_counts_per_window() -> None:
+    """burst / rate 秒のウィンドウごとに burst 回まで許し、キーに有効期限を付けること."""
+    clock = FakeClock()
+    client = FakeAsyncRedis()
+    store = rate_limit.RedisStore(client, clock=clock)
+    key = ("1.2.3.4", "GET /lists")
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) == 0
+    assert _acquire(store, key) == 2.0
+    assert list(client.expires.values()) == [2000]
+
+    clock.now += 2
+    assert _acquire(store, key) == 0
+
+
+def test_redis_store_fails_open() -> None:
+    """Redisに繋がらない時は制限せずに通すこと."""
+
+    class DownRedis:
+        async def incr(self, key):
+            raise ConnectionError("redis is down")
+
+    store = rate_limit.RedisStore(DownRedis(), clock=FakeClock())
+    for _ in range(5):
+        assert _acquire(store, ("1.2.3.4", "GET /lists")) == 0
+
+
+# ********** ミドルウェア **********
+def test_returns_429_with_retry_after() -> None:
+    """バケットを使い切ったら 429 と Retry-After を返すこと."""
+    client = _make_client(rate_limit.MemoryStore(clock=FakeClock()))
+    assert client.get("/lists/1").status_code == status.HTTP_200_OK
+    assert client.get("/lists/2").status_code == status.HTTP_200_OK
+
+    response = client.get("/lists/3")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "1"
+    assert response.json() == {"detail": "Too Many Requests"}
+
+
+def test_buckets_are_per_client_and_route() -> None:
+    """クライアントとルートが違えば別のバケットになること. ヘルスチェックは制限しないこと."""
+    store = rate_limit.MemoryStore(clock=FakeClock())
+    client_a = _make_client(store, burst=1, client=("10.0.0.1", 50000))
+    client_b = _make_client(store, burst=1, client=("10.0.0.2", 50000))
+    assert client_a.get("/lists/1").status_code == status.HTTP_200_OK
+    assert client_a.get("/lists/1").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert client_b.get("/lists/1").status_code == status.HTTP_200_OK
+    assert client_a.post("/lists/1").status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+    for _ in range(3):
+        assert client_a.get("/health").status_code == status.HTTP_200_OK
+
+
+def test_spoofed_forwarded_for_is_ignored() -> None:
+    """信用するプロキシ以外から来た X-Forwarded-For ではクライアントを変えられないこと."""
+    client = _make_client(
+        rate_limit.MemoryStore(clock=FakeClock()), client=("203.0.113.5", 50000), trusted_proxies="127.0.0.1",
+    )
+    statuses = [client.get("/lists/1", headers={"X-Forwarded-For": f"9.9.9.{i}"}).status_code for i in range(4)]
+    assert statuses == [200, 200, 429, 429]
+
+
+def test_forwarded_for_from_trusted_proxy() -> None:
+    """信用するプロキシからの時は、プロキシが付け足したクライアントのアドレスで区別すること."""
+    store = rate_limit.MemoryStore(clock=FakeClock())
+    client = _make_client(store, burst=1, client=("127.0.0.1", 50000), trusted_proxies="127.0.0.1")
+
+    # 先頭にクライアントが付けた値があっても、プロキシが付け足した末尾のアドレスを使う
+    assert client.get("/lists/1", headers={"X-Forwarded-For": "9.9.9.1, 198.51.100.7"}).status_code == status.HTTP_200_OK
+    assert client.get("/lists/1", headers={"X-Forwarded-For": "9.9.9.2, 198.51.100.7"}).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert client.get("/lists/1", headers={"X-Forwarded-For": "198.51.100.8"}).status_code == status.HTTP_200_OK
+
+
+def test_route_limits_override_default() -> None:
+    """routes に指定したルートはその (rate, burst) を使うこと."""
+    client = _make_client(rate_limit.MemoryStore(clock=FakeClock()), burst=1, routes={"GET /lists/{id}": (1.0, 3)})
+    for _ in range(3):
+        assert client.get("/lists/1").status_code == status.HTTP_200_OK
+    assert client.get("/lists/1").status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_middleware_overhead_is_small() -> None:
+    """通すリクエストでのミドルウェアの処理時間が小さいこと (全てのリクエストで有効にしておけること)."""
+
+    async def app(scope, receive, send):
+        pass
+
+    middleware = rate_limit.RateLimitMiddleware(app, rate=1e9, burst=10**9)
+    scope = {"type": "http", "method": "GET", "path": "/lists/1/items/2", "client": ("10.0.0.1", 50000)}
+    count = 10000
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(count):
+            await middleware(scope, None, None)
+        return time.perf_counter() - started
+
+    # 1リクエストあたり 50µs 未満 (通常は数µs)
+    assert asyncio.run(run()) / count < 50e-6
@@ -0,0 +1,121 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.crud import search_crud
+from app.main import app
+
+client = TestClient(app)
+
+# InnoDB の FULLTEXT インデックスは commit されるまで更新されないので、
+# テストのトランザクションをロールバックする方式ではなく全件DELETEで後片付けする
+pytestmark = pytest.mark.truncate_db
+
+
+@pytest.fixture()
+def search_data(db_session):
+    """検索対象のTODOリストとTODO項目を作る."""
+    todo_list_id = client.post("/lists", json={"title": "週末の買い物", "description": "スーパーで買うもの"}).json()["id"]
+    other_todo_list_id = client.post("/lists", json={"title": "仕事", "description": "release checklist"}).json()["id"]
+    item_ids = {
+        title: client.post(f"/lists/{list_id}/items", json={"title": title, "description": description}).json()["id"]
+        for list_id, title, description in [
+            (todo_list_id, "牛乳を買う", "低脂肪の牛乳"),
+            (todo_list_id, "卵を買う", None),
+            (other_todo_list_id, "release notes", "write the release notes"),
+            (other_todo_list_id, "deploy", "deploy the release build"),
+        ]
+    }
+    return {"todo_list_id": todo_list_id, "other_todo_list_id": other_todo_list_id, "item_ids": item_ids}
+
+
+def test_search_lists_and_items(search_data) -> None:
+    """TODOリストとTODO項目のタイトルと説明から検索できること."""
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get("/search", params={"q": "買う"})
+
+    # ******************
+    # 検証
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert {(result["kind"], result["id"]) for result in results} == {
+        ("item", search_data["item_ids"]["牛乳を買う"]),
+        ("item", search_data["item_ids"]["卵を買う"]),
+    }
+    assert all(result["todo_list_id"] == search_data["todo_list_id"] for result in results)
+
+    # 説明だけに含まれる語でもTODOリストが見つかる
+    results = client.get("/search", params={"q": "スーパー"}).json()
+    assert [(result["kind"], result["id"]) for result in results] == [("list", search_data["todo_list_id"])]
+
+
+def test_search_is_ranked(search_data) -> None:
+    """語を多く含むものから順に並ぶこと."""
+    results = client.get("/search", params={"q": "release"}).json()
+
+    assert [(result["kind"], result["id"]) for result in results][0] == ("item", search_data["item_ids"]["release notes"])
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+    assert len(results) == 3
+
+
+def test_search_requires_all_terms(search_data) -> None:
+    """空白で区切った語を全て含むものだけを返すこと."""
+    results = client.get("/search", params={"q": "release deploy"}).json()
+
+    assert [(result["kind"], result["id"]) for result in results] == [("item", search_data["item_ids"]["deploy"])]
+
+
+def test_search_ignores_operators(search_data) -> None:
+    """BOOLEAN MODE の演算子は普通の文字として無視すること."""
+    assert client.get("/search", params={"q": '"release" -deploy*'}).status_code == status.HTTP_200_OK
+    assert client.get("/search", params={"q": "+-*"}).json() == []
+
+
+def test_search_pagination(search_data) -> None:
+    """カーソルで全ての検索結果を重複なくたどれること."""
+    # ******************
+    # 事前準備
+    # ******************
+    client.post(f"/lists/{search_data['todo_list_id']}/items:bulk", json=[{"title": f"paging {i}"} for i in range(7)])
+
+    # ******************
+    # テスト実行
+    # ******************
+    seen = []
+    params = {"q": "paging", "per_page": 3}
+    while True:
+        response = client.get("/search", params=params)
+        seen.extend((result["kind"], result["id"]) for result in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+
+    # ******************
+    # 検証
+    # ******************
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_search_invalid_cursor(db_session) -> None:
+    """壊れたカーソルは400を返すこと."""
+    response = client.get("/search", params={"q": "release", "cursor": "broken"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_uses_fulltext_index(db_session, count_queries, search_data) -> None:
+    """どちらのテーブルも FULLTEXT インデックスから一致した行だけを読むこと."""
+    count_queries.clear()
+    search_crud.search(db_session, q="release", limit=10)
+
+    statement, parameters = next((s, p) for s, p in count_queries if s.lstrip().startswith("SELECT"))
+    rows = db_session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+    rows_by_table = {row["table"]: row for row in rows if row["table"] in ("todo_lists", "todo_items")}
+    assert rows_by_table["todo_lists"]["type"] == "fulltext"
+    assert rows_by_table["todo_items"]["type"] == "fulltext"
@@ -0,0 +1,52 @@
+import anyio.to_thread
+from fastapi.testclient import TestClient
+
+from app import const, server
+from app.main import app
+
+
+def test_worker_count(monkeypatch) -> None:
+    """WEB_CONCURRENCY が0ならCPUのコア数、指定されていればその数のワーカーを起動すること."""
+    monkeypatch.setattr(const, "WEB_CONCURRENCY", 0)
+    assert server.worker_count() >= 1
+
+    monkeypatch.setattr(const, "WEB_CONCURRENCY", 3)
+    assert server.worker_count() == 3
+
+
+def test_shared_state_warnings(monkeypatch) -> None:
+    """複数ワーカーでプロセス内のバックエンドを使う設定を警告し、Redisにすれば警告しないこと."""
+    monkeypatch.setattr(const, "CACHE_BACKEND", "none")
+    monkeypatch.setattr(const, "EVENTS_BACKEND", "memory")
+    monkeypatch.setattr(const, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(const, "RATE_LIMIT_BACKEND", "memory")
+    assert server.shared_state_warnings(1) == []
+    assert len(server.shared_state_warnings(4)) == 3
+
+    monkeypatch.setattr(const, "CACHE_BACKEND", "redis")
+    monkeypatch.setattr(const, "EVENTS_BACKEND", "redis")
+    monkeypatch.setattr(const, "RATE_LIMIT_BACKEND", "redis")
+    assert server.shared_state_warnings(4) == []
+
+
+def test_threadpool_size(monkeypatch) -> None:
+    """起動時にスレッドプールの大きさが THREADPOOL_SIZE になること."""
+    monkeypatch.setattr(const, "THREADPOOL_SIZE", 7)
+
+    # with で使うと lifespan が実行される
+    with TestClient(app) as client:
+        total_tokens = client.portal.call(lambda: anyio.to_thread.current_default_thread_limiter().total_tokens)
+
+    assert total_tokens == 7
+
+
+def test_forwarded_allow_ips(monkeypatch) -> None:
+    """X-Forwarded-* は FORWARDED_ALLOW_IPS のプロキシからだけ信用すること."""
+    calls = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(const, "FORWARDED_ALLOW_IPS", "10.0.0.1,10.0.0.2")
+
+    server.main()
+
+    assert calls[0]["proxy_headers"] is True
+    assert calls[0]["forwarded_allow_ips"] == "10.0.0.1,10.0.0.2"
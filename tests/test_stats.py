@@ -0,0 +1,129 @@
+from datetime import date
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app import cache, const
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def stats_cache(monkeypatch):
+    """テストごとに空の集計キャッシュを使う."""
+    stats_cache = cache.LRUCache(max_bytes=cache.STATS_CACHE_MAX_BYTES, ttl=60)
+    monkeypatch.setattr(cache, "stats_cache", stats_cache)
+    return stats_cache
+
+
+def _create_items(todo_list_id: int) -> None:
+    """期限切れ2件・期限前1件・期限なし1件・期限切れだが完了済み1件の項目を作る."""
+    due_ats = ["2000-01-01T00:00:00", "2000-01-02T00:00:00", "2999-01-01T00:00:00", None, "2000-01-01T00:00:00"]
+    todo_item_ids = [
+        client.post(f"/lists/{todo_list_id}/items", json={"title": f"stats_test_{i}", "due_at": due_at}).json()["id"]
+        for i, due_at in enumerate(due_ats)
+    ]
+    client.put(f"/lists/{todo_list_id}/items/{todo_item_ids[-1]}", json={"complete": True})
+
+
+def test_get_todo_list_stats(db_session) -> None:
+    """TODOリストのステータスごとの件数・期限切れの件数・日別の完了件数を返すこと."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_id = client.post("/lists", json={"title": "stats_test"}).json()["id"]
+    other_todo_list_id = client.post("/lists", json={"title": "stats_test_other"}).json()["id"]
+    _create_items(todo_list_id)
+    # 別のリストの項目は数えない
+    client.post(f"/lists/{other_todo_list_id}/items", json={"title": "stats_test", "due_at": "2000-01-01T00:00:00"})
+
+    # ******************
+    # テスト実行
+    # ******************
+    response = client.get(f"/lists/{todo_list_id}/stats", params={"days": 7})
+
+    # ******************
+    # 検証
+    # ******************
+    assert response.status_code == status.HTTP_200_OK
+    response_body = response.json()
+    assert response_body["todo_list_id"] == todo_list_id
+    assert response_body["item_count"] == 5
+    assert response_body["items_by_status"] == [{"status_code": 1, "count": 4}, {"status_code": 2, "count": 1}]
+    assert response_body["overdue_count"] == 2
+    # 今日までの7日分を古い順に返す
+    completed_per_day = response_body["completed_per_day"]
+    assert len(completed_per_day) == 7
+    assert completed_per_day[-1] == {"day": date.today().isoformat(), "count": 1}
+    assert sum(day["count"] for day in completed_per_day) == 1
+
+
+def test_get_todo_list_stats_empty(db_session) -> None:
+    """項目が無いTODOリストでも全てのステータスと日を0件で返すこと."""
+    todo_list_id = client.post("/lists", json={"title": "stats_test"}).json()["id"]
+
+    response_body = client.get(f"/lists/{todo_list_id}/stats").json()
+
+    assert response_body["item_count"] == 0
+    assert response_body["items_by_status"] == [{"status_code": 1, "count": 0}, {"status_code": 2, "count": 0}]
+    assert response_body["overdue_count"] == 0
+    assert len(response_body["completed_per_day"]) == 30
+    assert all(day["count"] == 0 for day in response_body["completed_per_day"])
+
+
+def test_get_todo_list_stats_not_found(db_session) -> None:
+    """存在しないTODOリストの集計は404を返すこと."""
+    response = client.get("/lists/999999/stats")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_stats(db_session) -> None:
+    """全てのTODOリストの集計を返すこと."""
+    # ******************
+    # 事前準備
+    # ******************
+    todo_list_ids = [client.post("/lists", json={"title": f"stats_test_{i}"}).json()["id"] for i in range(2)]
+    for todo_list_id in todo_list_ids:
+        _create_items(todo_list_id)
+
+    # ******************
+    # テスト実行・検証
+    # ******************
+    response = client.get("/stats", params={"days": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    response_body = response.json()
+    assert response_body["list_count"] == 2
+    assert response_body["item_count"] == 10
+    assert response_body["items_by_status"] == [{"status_code": 1, "count": 8}, {"status_code": 2, "count": 2}]
+    assert response_body["overdue_count"] == 4
+    assert response_body["completed_per_day"] == [{"day": date.today().isoformat(), "count": 2}]
+
+
+def test_stats_are_cached(db_session, count_queries, stats_cache) -> None:
+    """有効期限の間は同じ集計をDBに問い合わせずに返すこと."""
+    todo_list_id = client.post("/lists", json={"title": "stats_test"}).json()["id"]
+    first = client.get(f"/lists/{todo_list_id}/stats")
+
+    count_queries.clear()
+    second = client.get(f"/lists/{todo_list_id}/stats")
+
+    assert second.json() == first.json()
+    assert count_queries == []
+    assert second.headers["Cache-Control"] == f"max-age={int(const.STATS_CACHE_TTL)}"
+    # 期限切れまでは書き込みがあっても前の集計を返す
+    client.post(f"/lists/{todo_list_id}/items", json={"title": "stats_test"})
+    assert client.get(f"/lists/{todo_list_id}/stats").json()["item_count"] == 0
+    stats_cache.clear()
+    assert client.get(f"/lists/{todo_list_id}/stats").json()["item_count"] == 1
+
+
+@pytest.mark.parametrize("days", [0, 367])
+def test_stats_days_out_of_range(db_session, days) -> None:
+    """日数が範囲外なら422を返すこと."""
+    response = client.get("/stats", params={"days": days})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY